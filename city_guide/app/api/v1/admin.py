@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+import hmac
+
+from ...core.config import settings
+from ...core.profiling import ProfilerBusy, request_profiler, stack_sampler
+from ...db import database
+from ...db.profiler import sql_profiler
+from ...http import Application, HTTPException, Request, Response, json_response
+
+MAX_SAMPLE_SECONDS = 60.0
+TEXT_CONTENT_TYPE = "text/plain; charset=utf-8"
+
+
+def _require_admin(request: Request) -> None:
+    if not settings.admin_token:
+        # Admin endpoints do not exist unless a token is configured.
+        raise HTTPException(404, "Not Found")
+    token = request.headers.get("x-admin-token", "")
+    if not hmac.compare_digest(token.encode(), settings.admin_token.encode()):
+        raise HTTPException(403, "Forbidden")
+
+
+def _float_param(request: Request, name: str, default: float) -> float:
+    try:
+        return float(request.params.get(name, default))
+    except ValueError as exc:
+        raise HTTPException(422, f"{name} must be a number") from exc
+
+
+def register_routes(app: Application) -> None:
+    @app.route("POST", "/v1/admin/profile/stacks", summary="Sample Stacks", include_in_schema=False)
+    async def sample_stacks(request: Request):
+        _require_admin(request)
+        seconds = min(max(_float_param(request, "seconds", 5.0), 0.1), MAX_SAMPLE_SECONDS)
+        interval = _float_param(request, "intervalMs", 5.0) / 1000
+        try:
+            # The sampler runs in a thread so this worker keeps serving the
+            # requests being sampled.
+            stacks = await asyncio.to_thread(stack_sampler.sample, seconds, interval)
+        except ProfilerBusy as exc:
+            raise HTTPException(409, str(exc)) from exc
+        return Response(200, stack_sampler.render(stacks), {"content-type": TEXT_CONTENT_TYPE})
+
+    @app.route("POST", "/v1/admin/profile/requests", summary="Profile Request", include_in_schema=False)
+    def arm_request_profile(request: Request):
+        _require_admin(request)
+        request_id = (request.json or {}).get("requestId")
+        if not isinstance(request_id, str) or not request_id:
+            raise HTTPException(422, "requestId is required")
+        request_profiler.arm(request_id)
+        return json_response({"requestId": request_id, "status": "armed"}, status_code=202)
+
+    @app.route(
+        "GET",
+        "/v1/admin/profile/requests/{request_id}",
+        summary="Request Profile",
+        include_in_schema=False,
+    )
+    def get_request_profile(request: Request):
+        _require_admin(request)
+        result = request_profiler.result(request.path_params["request_id"])
+        if result is None:
+            raise HTTPException(404, "Profile not captured yet")
+        return Response(200, result, {"content-type": TEXT_CONTENT_TYPE})
+
+    @app.route("GET", "/v1/admin/sql", summary="SQL Statistics", include_in_schema=False)
+    def sql_statistics(request: Request):
+        _require_admin(request)
+        return json_response(
+            {
+                "enabled": sql_profiler.enabled,
+                "statements": sql_profiler.stats(),
+                "statementCache": database.statements.stats(),
+            }
+        )
@@ -3,8 +3,9 @@ from __future__ import annotations
 import uuid
 
 from ...core import security
+from ...core.passwords import password_hasher
 from ...db.repo import UserProfileRepository, UserRepository
-from ...http import Application, HTTPException, Request, json_response
+from ...http import Application, HTTPException, Request, Response, json_response
 from .profile import build_default_profile, persist_profile
 
 
@@ -19,7 +20,7 @@ def register_routes(app: Application) -> None:
     profile_repo = UserProfileRepository()
 
     @app.route("POST", "/v1/register", summary="Register")
-    def register(request: Request):
+    async def register(request: Request):
         payload = request.json or {}
         email = (payload.get("email") or "").strip().lower()
         password = payload.get("password")
@@ -29,7 +30,7 @@ def register_routes(app: Application) -> None:
             raise HTTPException(400, "Email already registered")
         user = user_repo.create_user(
             email=email,
-            password_hash=security.hash_password(password),
+            password_hash=await password_hasher.hash_async(password),
             first_name=payload.get("firstName"),
             last_name=payload.get("lastName"),
             phone=payload.get("phoneNumber"),
@@ -43,13 +44,19 @@ def register_routes(app: Application) -> None:
         return json_response({**tokens, "user": profile}, status_code=201)
 
     @app.route("POST", "/v1/login", summary="Login")
-    def login(request: Request):
+    async def login(request: Request):
         payload = request.json or {}
         email = (payload.get("email") or "").strip().lower()
         password = payload.get("password") or ""
         user = user_repo.get_by_email(email)
-        if user is None or not security.verify_password(password, user.password_hash):
+        # Unknown emails still pay for a derivation so they cannot be told
+        # apart from wrong passwords by response time.
+        stored_hash = user.password_hash if user is not None else password_hasher.dummy_hash
+        if not await password_hasher.verify_async(password, stored_hash) or user is None:
             raise HTTPException(401, "Invalid credentials")
+        if password_hasher.needs_rehash(user.password_hash):
+            # Upgrade legacy or outdated hashes while the password is at hand.
+            user_repo.set_password_hash(user.id, await password_hasher.hash_async(password))
         stored = profile_repo.get_profile(user.id)
         profile = build_default_profile(user)
         if stored:
@@ -68,8 +75,12 @@ def register_routes(app: Application) -> None:
             raise HTTPException(400, "refreshToken is required")
         try:
             decoded = security.decode_refresh_token(token)
-        except security.InvalidToken as exc:  # pragma: no cover
+        except security.InvalidToken as exc:
             raise HTTPException(401, "Invalid refresh token") from exc
+        # Refresh tokens are single use: of two concurrent refreshes with the
+        # same token only the one that revokes its session gets new tokens.
+        if not security.revoke_refresh_token(token):
+            raise HTTPException(401, "Invalid refresh token")
         user_id = uuid.UUID(decoded["sub"])
         user = user_repo.get_by_id(user_id)
         if user is None or not user.is_active:
@@ -77,3 +88,12 @@ def register_routes(app: Application) -> None:
         access, refresh_token = _issue_tokens(user.id)
         tokens = {"access_token": access, "refresh_token": refresh_token, "accessToken": access, "refreshToken": refresh_token}
         return json_response(tokens)
+
+    @app.route("POST", "/v1/logout", summary="Logout")
+    def logout(request: Request):
+        payload = request.json or {}
+        token = payload.get("refreshToken")
+        if not token:
+            raise HTTPException(400, "refreshToken is required")
+        security.revoke_refresh_token(token)
+        return Response(204, None)
@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from ...core.metrics import registry
+from ...http import Application, Request, Response
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def register_routes(app: Application) -> None:
+    @app.route("GET", "/metrics", summary="Prometheus Metrics", include_in_schema=False)
+    def metrics(_: Request):
+        return Response(200, registry.render(), {"content-type": PROMETHEUS_CONTENT_TYPE})
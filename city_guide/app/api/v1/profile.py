@@ -4,8 +4,17 @@ import uuid
 
 from ...api.dependencies import build_default_context
 from ...core import deps, security
+from ...db.entities import UserProfile
 from ...db.repo import UserProfileRepository, UserRepository
-from ...http import Application, HTTPException, Request, json_response
+from ...http import (
+    Application,
+    HTTPException,
+    Request,
+    cache_validators,
+    json_response,
+    make_etag,
+    not_modified,
+)
 
 PROFILE_KEY = "profile"
 
@@ -43,12 +52,12 @@ def load_profile_from_context(context: dict | None, user) -> dict:
     return merged
 
 
-def persist_profile(repo: UserProfileRepository, user_id: uuid.UUID, profile: dict) -> None:
+def persist_profile(repo: UserProfileRepository, user_id: uuid.UUID, profile: dict) -> UserProfile:
     current = repo.get_profile(user_id)
     snapshot = dict(current.context if current else {})
     snapshot.setdefault("user_context", build_default_context(user_id))
     snapshot[PROFILE_KEY] = profile
-    repo.upsert_profile(user_id, snapshot)
+    return repo.upsert_profile(user_id, snapshot)
 
 
 def register_routes(app: Application) -> None:
@@ -56,18 +65,28 @@ def register_routes(app: Application) -> None:
     user_repo = UserRepository()
 
     def _ensure_user(request: Request):
-        authorization = request.headers.get("authorization")
-        return deps.get_current_user(authorization)
+        return deps.get_request_user(request)
 
     @app.route("GET", "/v1/profile", summary="Get Profile")
     def get_profile(request: Request):
         user = _ensure_user(request)
+        updated_at = profile_repo.get_updated_at(user.id)
+        if updated_at is not None:
+            # The body merges the stored profile with fields of the user row.
+            last_modified = max(updated_at, user.updated_at)
+            etag = make_etag("profile", user.id, updated_at, user.updated_at)
+            cached = not_modified(request, etag, last_modified)
+            if cached is not None:
+                return cached
         stored = profile_repo.get_profile(user.id)
         if stored is None:
             profile = build_default_profile(user)
-            persist_profile(profile_repo, user.id, profile)
-            return json_response(profile)
-        return json_response(load_profile_from_context(stored.context, user))
+            stored = persist_profile(profile_repo, user.id, profile)
+        else:
+            profile = load_profile_from_context(stored.context, user)
+        etag = make_etag("profile", user.id, stored.updated_at, user.updated_at)
+        headers = cache_validators(etag, max(stored.updated_at, user.updated_at))
+        return json_response(profile, headers=headers)
 
     @app.route("PUT", "/v1/profile", summary="Update Profile")
     def update_profile(request: Request):
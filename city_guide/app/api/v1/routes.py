@@ -1,20 +1,52 @@
 from __future__ import annotations
+
+import asyncio
 import logging
 import uuid
-from typing import Any
+from typing import Any, Callable
 
 from ...core import deps
+from ...core.circuit_breaker import OPEN, get_breaker
 from ...core.config import settings
+from ...core.tracing import set_span_attributes, start_trace, traced
+from ...db.entities import RoutePointBatch
 from ...db.repo import RouteDraftRepository, UserProfileRepository
-from ...http import Application, HTTPException, Request, json_response
+from ...domain.candidate_selector import IncrementalSelector
+from ...http import (
+    Application,
+    HTTPException,
+    Request,
+    StreamingResponse,
+    cache_validators,
+    json_response,
+    json_stream_response,
+    make_etag,
+    not_modified,
+)
 from ...schemas.places import Location
 from ...schemas.poi import BrainstormPOIRequest
+from ...schemas.trip import TripStatus
 from ...services import google_poi
+from ...services.events import Event, generation_events
 from ...services.gpt_client import GPTClient
+from ...services.jobs import Job, job_queue
+from ...services.pipeline import Channel, cancel_tasks, pump
 
 logger = logging.getLogger(__name__)
 
 MAX_WAYPOINTS = 3
+# Stop looking for more POIs once this many high-priority ones fit the trip.
+EARLY_STOP_CANDIDATES = MAX_WAYPOINTS * 2
+PIPELINE_QUEUE_SIZE = 8
+GENERATE_TRIP_JOB = "generate_trip"
+# Seconds between SSE keep-alive comments while generation is quiet.
+EVENTS_KEEPALIVE_SEC = 15.0
+
+Progress = Callable[[str, dict[str, Any]], None]
+
+
+def _no_progress(name: str, data: dict[str, Any]) -> None:
+    return None
 
 
 def _normalize_waypoint(payload: dict[str, Any]) -> dict[str, Any]:
@@ -44,12 +76,73 @@ def _serialize_point(point) -> dict[str, Any]:
     }
 
 
-def _serialize_draft(draft) -> dict:
+def _serialize_points(points) -> list[dict[str, Any]]:
+    """``_serialize_point`` for each point, reading a batch column by column."""
+
+    if not isinstance(points, RoutePointBatch):
+        return [_serialize_point(point) for point in points]
+    columns = zip(
+        points.ids,
+        points.poi_ids,
+        points.names,
+        points.lat,
+        points.lng,
+        points.decode(points.category_codes),
+        points.order_index,
+        points.optional_ints(points.eta_min_walk),
+        points.optional_ints(points.eta_min_drive),
+        points.optional_ints(points.listen_sec),
+        points.decode(points.source_codes),
+        strict=True,
+    )
+    return [
+        {
+            "id": point_id,
+            "poi_id": poi_id,
+            "name": name,
+            "lat": lat,
+            "lng": lng,
+            "location": {"lat": lat, "lng": lng},
+            "category": category,
+            "order_index": order_index,
+            "order": order_index,
+            "eta_min_walk": eta_min_walk,
+            "eta_min_drive": eta_min_drive,
+            "listen_sec": listen_sec,
+            "source_poi_id": source_poi_id,
+        }
+        for (
+            point_id,
+            poi_id,
+            name,
+            lat,
+            lng,
+            category,
+            order_index,
+            eta_min_walk,
+            eta_min_drive,
+            listen_sec,
+            source_poi_id,
+        ) in columns
+    ]
+
+
+def _serialize_draft(draft, *, current: bool = False) -> dict:
+    """The stored payload with the draft's columns filled in.
+
+    ``current`` makes the row's status and points win over the ones the
+    payload recorded.
+    """
+
     data = dict(draft.payload_json)
     data.setdefault("id", str(draft.id))
     data.setdefault("title", data.get("name", "Untitled"))
-    data.setdefault("status", draft.status)
-    data.setdefault("waypoints", [_serialize_point(point) for point in draft.points])
+    if current:
+        data["status"] = draft.status
+    else:
+        data.setdefault("status", draft.status)
+    if current or "waypoints" not in data:
+        data["waypoints"] = _serialize_points(draft.points)
     data.setdefault("createdAt", draft.created_at.isoformat())
     data.setdefault("updatedAt", draft.updated_at.isoformat())
     data.setdefault("encodedPolyline", data.get("encodedPolyline", ""))
@@ -118,35 +211,138 @@ def _candidate_to_waypoint(candidate: google_poi.CandidatePOI, order_index: int)
     }
 
 
+async def _brainstorm_items(gpt: GPTClient, request: BrainstormPOIRequest):
+    stream_brainstorm = getattr(gpt, "stream_brainstorm_poi", None)
+    if stream_brainstorm is not None:
+        async for poi in stream_brainstorm(request):
+            yield poi
+        return
+    try:
+        response = await gpt.brainstorm_poi(request)
+    except AttributeError:
+        response = None
+    for poi in response.items if response else []:
+        yield poi
+
+
+async def _validation_stage(
+    http_client: Any,
+    items: Channel,
+    validated: Channel,
+    language: str,
+) -> None:
+    emitted: set[int] = set()
+
+    async def _emit(candidate: google_poi.CandidatePOI) -> None:
+        emitted.add(id(candidate))
+        await validated.send(candidate)
+
+    try:
+        result = await google_poi.validate_brainstormed_poi(
+            client=http_client,
+            api_key=settings.google_maps_api_key,
+            items=items,
+            language=language,
+            on_candidate=_emit,
+        )
+        for candidate in result:
+            if id(candidate) not in emitted:
+                await validated.send(candidate)
+    finally:
+        validated.close()
+
+
+async def _run_candidate_pipeline(
+    draft,
+    payload: dict[str, Any],
+    gpt: GPTClient,
+    request: BrainstormPOIRequest,
+    http_client: Any,
+    progress: Progress = _no_progress,
+) -> tuple[list[google_poi.CandidatePOI], int]:
+    """Run brainstorm -> Places validation -> selection as concurrent stages.
+
+    Stages are connected by bounded channels. The selector consumes validated
+    candidates as they resolve and, once enough high-priority POIs fit into the
+    trip duration, cancels the outstanding brainstorm and lookup work.
+    """
+
+    brainstormed = 0
+
+    async def _counted():
+        nonlocal brainstormed
+        async for poi in _brainstorm_items(gpt, request):
+            brainstormed += 1
+            yield poi
+
+    start = _start_location_from_payload(payload)
+    selector = IncrementalSelector(
+        target=EARLY_STOP_CANDIDATES,
+        duration_min=draft.duration_min,
+        transport_mode=draft.transport_mode,
+        start=(start.lat, start.lng) if start else None,
+        min_priority=settings.generation_min_priority,
+    )
+    items: Channel = Channel(PIPELINE_QUEUE_SIZE)
+    validated: Channel = Channel(PIPELINE_QUEUE_SIZE)
+    brainstorm_task = asyncio.ensure_future(pump(_counted(), items))
+    validation_task = asyncio.ensure_future(
+        _validation_stage(http_client, items, validated, draft.language or "en")
+    )
+    try:
+        async for candidate in validated:
+            if selector.offer(candidate):
+                progress(
+                    "candidate",
+                    {"waypoint": _candidate_to_waypoint(candidate, len(selector.candidates) - 1)},
+                )
+            if selector.satisfied:
+                logger.info(
+                    "Route %s: selection satisfied early, cancelling remaining lookups",
+                    str(draft.id),
+                )
+                break
+        else:
+            # Surface failures of the producer stages. Validation may stop
+            # reading ``items`` early (max queries, open Places circuit), which
+            # leaves the brainstorm blocked on a full channel; only a brainstorm
+            # that already finished has a result worth surfacing.
+            await validation_task
+            if brainstorm_task.done():
+                await brainstorm_task
+    finally:
+        await cancel_tasks(brainstorm_task, validation_task)
+    return selector.ranked(), brainstormed
+
+
+@traced("brainstorm_candidates")
 async def _brainstorm_candidates(
     draft,
     payload: dict[str, Any],
     user_context: dict[str, Any] | None,
     gpt: GPTClient,
+    progress: Progress = _no_progress,
 ) -> tuple[list[google_poi.CandidatePOI], int, int]:
     request = _build_brainstorm_request(draft, payload, user_context)
-    try:
-        response = await gpt.brainstorm_poi(request)
-    except AttributeError:
-        response = None
-    brainstorm_count = len(response.items) if response else 0
-
-    validated: list[google_poi.CandidatePOI] = []
+    progress("stage", {"stage": "brainstorm"})
     httpx_module = getattr(google_poi, "httpx", None)
-    if (
-        response
-        and response.items
-        and settings.use_google_sources
+    google_enabled = bool(
+        settings.use_google_sources
         and settings.google_maps_api_key
         and httpx_module is not None
-    ):
+        and get_breaker(google_poi.PLACES_BREAKER).state != OPEN
+    )
+
+    validated: list[google_poi.CandidatePOI] = []
+    if google_enabled:
         async with httpx_module.AsyncClient(timeout=10) as http_client:
-            validated = await google_poi.validate_brainstormed_poi(
-                client=http_client,
-                api_key=settings.google_maps_api_key,
-                items=response.items,
-                language=draft.language or "en",
+            validated, brainstorm_count = await _run_candidate_pipeline(
+                draft, payload, gpt, request, http_client, progress
             )
+    else:
+        brainstorm_count = 0
+        async for _ in _brainstorm_items(gpt, request):
+            brainstorm_count += 1
 
     logger.info(
         "Route %s: GPT brainstorm produced %d POIs", str(draft.id), brainstorm_count
@@ -154,6 +350,7 @@ async def _brainstorm_candidates(
     logger.info(
         "Route %s: %d POIs validated via Google", str(draft.id), len(validated)
     )
+    set_span_attributes(brainstormed=brainstorm_count, validated=len(validated))
 
     if validated:
         return validated, brainstorm_count, len(validated)
@@ -164,6 +361,7 @@ async def _brainstorm_candidates(
     return fallback, brainstorm_count, len(validated)
 
 
+@traced("select_and_order")
 async def _select_and_order(
     gpt: GPTClient,
     user_context: dict[str, Any] | None,
@@ -173,6 +371,7 @@ async def _select_and_order(
     if not candidates:
         return []
     k = min(limit, len(candidates))
+    set_span_attributes(candidates=len(candidates), limit=k)
     try:
         selected_ids = await gpt.select_poi(user_context or {}, candidates, k)
     except AttributeError:
@@ -214,9 +413,14 @@ async def _run_generation(
     payload: dict[str, Any],
     user_context: dict[str, Any] | None,
     gpt: GPTClient,
+    progress: Progress = _no_progress,
 ) -> list[dict[str, Any]]:
     candidates, brainstorm_count, validated_count = await _brainstorm_candidates(
-        draft, payload, user_context, gpt
+        draft, payload, user_context, gpt, progress
+    )
+    progress(
+        "stage",
+        {"stage": "select", "brainstormed": brainstorm_count, "candidates": len(candidates)},
     )
     ordered_candidates = await _select_and_order(gpt, user_context, candidates)
     waypoints = [
@@ -231,15 +435,100 @@ async def _run_generation(
     return waypoints
 
 
+def _transition(
+    repo: RouteDraftRepository,
+    draft,
+    status: TripStatus,
+    waypoints: list[dict[str, Any]] | None = None,
+) -> None:
+    payload = dict(draft.payload_json)
+    payload["status"] = status.value
+    if waypoints is not None:
+        payload["waypoints"] = waypoints
+    draft.payload_json = payload
+    draft.status = status.value
+    repo.update_draft(draft.id, status=status.value, payload_json=payload)
+
+
+def _status_event(route_id: str) -> Event:
+    draft = RouteDraftRepository().get_draft(uuid.UUID(route_id))
+    job = job_queue.latest_for(route_id)
+    data: dict[str, Any] = {
+        "status": draft.status if draft else None,
+        "job": job.to_dict() if job else None,
+    }
+    # The draft leaves ``inProgress`` before the job itself is marked finished,
+    # so either signal means no further events are coming.
+    generating = draft is not None and draft.status == TripStatus.in_progress.value
+    if not generating:
+        data["waypoints"] = _serialize_points(draft.points) if draft else []
+    return Event("status", data, terminal=not generating or job is None or not job.active)
+
+
+async def _generate_trip(route_id: str, progress: Progress) -> list[dict[str, Any]]:
+    repo = RouteDraftRepository()
+    draft = repo.get_draft(uuid.UUID(route_id))
+    if draft is None:
+        raise LookupError(f"Trip {route_id} no longer exists")
+    try:
+        payload = dict(draft.payload_json)
+        profile = UserProfileRepository().get_profile(draft.user_id)
+        user_context = profile.context if profile else None
+        gpt = get_gpt_client()
+        waypoints = await _run_generation(draft, payload, user_context, gpt, progress)
+        if not waypoints:
+            fallback = _fallback_candidates(draft.city, payload)
+            waypoints = [
+                _candidate_to_waypoint(candidate, idx) for idx, candidate in enumerate(fallback)
+            ]
+        progress("stage", {"stage": "persist", "waypoints": len(waypoints)})
+        repo.replace_points(draft.id, waypoints)
+        _transition(repo, draft, TripStatus.success, waypoints)
+    except asyncio.CancelledError:
+        # A durable queue re-runs the job after restart, so the draft stays
+        # in progress; otherwise nothing will ever finish it.
+        if not job_queue.store.durable:
+            _transition(repo, draft, TripStatus.failed)
+        raise
+    except Exception:
+        logger.exception("Route generation failed for %s", route_id)
+        _transition(repo, draft, TripStatus.failed)
+        raise
+    return waypoints
+
+
+async def _generate_trip_job(job: Job) -> None:
+    route_id = job.payload["route_id"]
+
+    def progress(name: str, data: dict[str, Any]) -> None:
+        generation_events.publish(route_id, name, data)
+
+    # Every exit, including cancellation, ends the event stream of subscribers.
+    outcome: dict[str, Any] = {"status": TripStatus.failed.value, "error": "cancelled"}
+    try:
+        with start_trace("generate_trip", route_id=route_id, attempt=job.attempts):
+            waypoints = await _generate_trip(route_id, progress)
+        outcome = {"status": TripStatus.success.value, "waypoints": waypoints}
+    except asyncio.CancelledError:
+        if job_queue.store.durable:
+            outcome = {"status": TripStatus.in_progress.value, "error": "interrupted"}
+        raise
+    except Exception as exc:
+        outcome = {"status": TripStatus.failed.value, "error": str(exc) or exc.__class__.__name__}
+        raise
+    finally:
+        generation_events.publish(route_id, "status", outcome, terminal=True)
+
+
 def register_routes(app: Application) -> None:
     repo = RouteDraftRepository()
-    profiles = UserProfileRepository()
+    job_queue.register(GENERATE_TRIP_JOB, _generate_trip_job)
 
     def _require_user(request: Request):
         authorization = request.headers.get("authorization")
         if not authorization:
             raise HTTPException(401, "Not authenticated")
-        return deps.get_current_user(authorization)
+        return deps.get_request_user(request)
 
     @app.route("POST", "/v1/routes", summary="Create Trip")
     def create_route(request: Request):
@@ -272,45 +561,95 @@ def register_routes(app: Application) -> None:
     @app.route("GET", "/v1/routes", summary="List Trips")
     def list_routes(request: Request):
         user = _require_user(request)
-        drafts = repo.list_drafts_for_user(user.id)
-        return json_response([_serialize_draft(draft) for draft in drafts])
+        total, last_updated = repo.get_list_version(user.id)
+        etag = make_etag("routes", user.id, total, last_updated)
+        cached = not_modified(request, etag, last_updated)
+        if cached is not None:
+            return cached
+        drafts = repo.iter_drafts_for_user(user.id)
+        # Streamed so memory stays flat however many trips the user has.
+        return json_stream_response(
+            drafts, headers=cache_validators(etag, last_updated), serialize=_serialize_draft
+        )
 
     @app.route("GET", "/v1/routes/{route_id}", summary="Get Trip")
     def get_route(request: Request):
         user = _require_user(request)
         route_id = request.path_params.get("route_id")
+        version = repo.get_draft_version(uuid.UUID(route_id))
+        if version is None or version[0] != user.id:
+            raise HTTPException(404, "Trip not found")
+        updated_at = version[1]
+        # The embedded job status changes without touching the draft row.
+        job = job_queue.latest_for(route_id)
+        etag = make_etag(route_id, updated_at, job.id if job else None, job.status if job else None)
+        cached = not_modified(request, etag, None if job else updated_at)
+        if cached is not None:
+            return cached
         draft = repo.get_draft(uuid.UUID(route_id))
-        if draft is None or draft.user_id != user.id:
+        if draft is None:
             raise HTTPException(404, "Trip not found")
-        data = _serialize_draft(draft)
-        data["status"] = draft.status
-        data["waypoints"] = [_serialize_point(point) for point in draft.points]
-        return json_response(data)
+        data = _serialize_draft(draft, current=True)
+        data["job"] = job.to_dict() if job else None
+        return json_response(data, headers=cache_validators(etag, None if job else updated_at))
 
     @app.route("POST", "/v1/routes/{route_id}/generate", summary="Generate Trip")
-    async def generate_route(request: Request):
+    def generate_route(request: Request):
         user = _require_user(request)
         route_id = request.path_params.get("route_id")
         draft = repo.get_draft(uuid.UUID(route_id))
         if draft is None or draft.user_id != user.id:
             raise HTTPException(404, "Trip not found")
-        payload = dict(draft.payload_json)
-        profile = profiles.get_profile(user.id)
-        user_context = profile.context if profile else None
-        gpt = get_gpt_client()
+        active = job_queue.active_for(str(draft.id))
+        if active is not None:
+            return json_response(
+                {"message": "Generation already in progress", "jobId": str(active.id)}
+            )
+        previous = TripStatus(draft.status)
+        _transition(repo, draft, TripStatus.in_progress)
         try:
-            waypoints = await _run_generation(draft, payload, user_context, gpt)
-        except Exception as exc:  # noqa: BLE001
-            logger.exception("Route generation failed for %s: %s", route_id, exc)
-            raise HTTPException(500, "Failed to generate trip") from exc
-        if not waypoints:
-            fallback = _fallback_candidates(draft.city, payload)
-            waypoints = [
-                _candidate_to_waypoint(candidate, idx) for idx, candidate in enumerate(fallback)
-            ]
-        repo.replace_points(draft.id, waypoints)
-        updated_payload = dict(draft.payload_json)
-        updated_payload["status"] = "draft"
-        updated_payload["waypoints"] = waypoints
-        repo.update_draft(draft.id, status="draft", payload_json=updated_payload)
-        return json_response({"message": "Generation started"})
+            job = job_queue.enqueue(
+                GENERATE_TRIP_JOB,
+                str(draft.id),
+                {"route_id": str(draft.id), "user_id": str(user.id)},
+            )
+        except Exception:
+            _transition(repo, draft, previous)
+            raise
+        generation_events.publish(str(draft.id), "stage", {"stage": "queued", "jobId": str(job.id)})
+        return json_response({"message": "Generation started", "jobId": str(job.id)})
+
+    @app.route("GET", "/v1/routes/{route_id}/events", summary="Trip Generation Events")
+    def route_events(request: Request):
+        user = _require_user(request)
+        route_id = request.path_params.get("route_id")
+        draft = repo.get_draft(uuid.UUID(route_id))
+        if draft is None or draft.user_id != user.id:
+            raise HTTPException(404, "Trip not found")
+        key = str(draft.id)
+
+        async def stream():
+            # Subscribe before taking the snapshot so no transition is lost
+            # between reading the current state and listening for changes.
+            subscription = generation_events.subscribe(key)
+            try:
+                snapshot = _status_event(key)
+                yield snapshot.encode()
+                if snapshot.terminal:
+                    return
+                while True:
+                    event = await subscription.get(EVENTS_KEEPALIVE_SEC)
+                    if event is None:
+                        yield b": keep-alive\n\n"
+                        continue
+                    yield event.encode()
+                    if event.terminal:
+                        return
+            finally:
+                subscription.close()
+
+        return StreamingResponse(
+            stream(),
+            headers={"cache-control": "no-cache", "x-accel-buffering": "no"},
+            media_type="text/event-stream",
+        )
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import zlib
+from typing import Any, AsyncIterator, Callable
+
+try:  # pragma: no cover - optional dependency
+    import brotli
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    brotli = None  # type: ignore[assignment]
+
+GZIP = "gzip"
+BROTLI = "br"
+IDENTITY = "identity"
+
+# Content that is already compressed (or must not be buffered) is sent as is.
+_SKIP_PREFIXES = ("image/", "video/", "audio/", "font/woff", "text/event-stream")
+_SKIP_TYPES = frozenset(
+    {
+        "application/gzip",
+        "application/x-gzip",
+        "application/zip",
+        "application/x-brotli",
+        "application/octet-stream",
+        "application/pdf",
+    }
+)
+
+
+def supported_encodings() -> tuple[str, ...]:
+    """Encodings we can produce, in server preference order."""
+
+    return (BROTLI, GZIP) if brotli is not None else (GZIP,)
+
+
+def parse_accept_encoding(header: str | None) -> dict[str, float]:
+    """Map each coding in an ``Accept-Encoding`` header to its q-value."""
+
+    weights: dict[str, float] = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = max(0.0, min(1.0, float(value)))
+                except ValueError:
+                    quality = 0.0
+        weights[coding] = quality
+    return weights
+
+
+def negotiate(header: str | None, available: tuple[str, ...] | None = None) -> str | None:
+    """Pick the best supported coding for ``header`` or ``None`` for identity.
+
+    Highest q-value wins; ties go to the server's preference order. ``*``
+    covers codings that are not listed explicitly and ``q=0`` forbids one.
+    """
+
+    weights = parse_accept_encoding(header)
+    if not weights:
+        return None
+    wildcard = weights.get("*", 0.0)
+    best: str | None = None
+    best_quality = 0.0
+    for coding in available or supported_encodings():
+        quality = weights.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def is_compressible(content_type: str | None) -> bool:
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if media_type in _SKIP_TYPES:
+        return False
+    return not media_type.startswith(_SKIP_PREFIXES)
+
+
+def compress(data: bytes, encoding: str, *, gzip_level: int = 6, brotli_quality: int = 5) -> bytes:
+    if encoding == BROTLI:
+        return brotli.compress(data, quality=brotli_quality)
+    compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+async def compress_async(data: bytes, encoding: str, *, offload_size: int, **options: Any) -> bytes:
+    """Compress ``data``, in a worker thread when it is at least ``offload_size`` bytes."""
+
+    if len(data) >= offload_size:
+        return await asyncio.to_thread(compress, data, encoding, **options)
+    return compress(data, encoding, **options)
+
+
+def _stream_compressor(
+    encoding: str, gzip_level: int, brotli_quality: int
+) -> tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    if encoding == BROTLI:
+        compressor = brotli.Compressor(quality=brotli_quality)
+
+        def step(chunk: bytes) -> bytes:
+            return compressor.process(chunk) + compressor.flush()
+
+        return step, compressor.finish
+    deflate = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def gzip_step(chunk: bytes) -> bytes:
+        # Sync-flush every chunk so streamed data reaches the client promptly.
+        return deflate.compress(chunk) + deflate.flush(zlib.Z_SYNC_FLUSH)
+
+    return gzip_step, deflate.flush
+
+
+async def compress_stream(
+    chunks: AsyncIterator[bytes],
+    encoding: str,
+    *,
+    offload_size: int,
+    gzip_level: int = 6,
+    brotli_quality: int = 5,
+) -> AsyncIterator[bytes]:
+    step, finish = _stream_compressor(encoding, gzip_level, brotli_quality)
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            if len(chunk) >= offload_size:
+                compressed = await asyncio.to_thread(step, chunk)
+            else:
+                compressed = step(chunk)
+            if compressed:
+                yield compressed
+        tail = finish()
+        if tail:
+            yield tail
+    finally:
+        aclose = getattr(chunks, "aclose", None)
+        if aclose is not None:
+            await aclose()
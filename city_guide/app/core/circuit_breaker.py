@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, TypeVar
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"Circuit '{name}' is open")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker over a sliding window of recent calls.
+
+    The breaker stays ``closed`` while the share of failed calls among the last
+    ``window_size`` outcomes is below ``failure_rate_threshold`` (once at least
+    ``minimum_calls`` were observed). When tripped it goes ``open`` and rejects
+    calls with :class:`CircuitOpenError` for ``open_seconds``; afterwards up to
+    ``half_open_max_calls`` trial calls are let through and the first outcome
+    decides whether the circuit closes again or re-opens.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_rate_threshold: float = 0.5,
+        window_size: int = 20,
+        minimum_calls: int = 5,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.window_size = max(1, window_size)
+        self.minimum_calls = max(1, minimum_calls)
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes: deque[bool] = deque(maxlen=self.window_size)
+        self._failures = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._half_open_calls = 0
+        return self._state
+
+    def before_call(self) -> None:
+        """Reserve a call slot or raise :class:`CircuitOpenError`."""
+
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return
+            retry_after = max(0.0, self.open_seconds - (self._clock() - self._opened_at))
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                logger.info("Circuit %s closed after successful trial call", self.name)
+                self._close()
+                return
+            self._push(False)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._open()
+                return
+            if self._state == OPEN:
+                return
+            self._push(True)
+            if len(self._outcomes) < self.minimum_calls:
+                return
+            if self._failures / len(self._outcomes) >= self.failure_rate_threshold:
+                self._open()
+
+    def record_outcome(
+        self,
+        exc: BaseException | None,
+        is_failure: Callable[[BaseException], bool] | None = None,
+    ) -> None:
+        """Settle a call reserved with :meth:`before_call` that ended with ``exc``."""
+
+        if exc is None:
+            self.record_success()
+        elif not isinstance(exc, Exception):
+            self.release()
+        elif is_failure is None or is_failure(exc):
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def release(self) -> None:
+        """Give back a slot whose call ended without an outcome (e.g. cancelled)."""
+
+        with self._lock:
+            if self._state == HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def _push(self, failed: bool) -> None:
+        if len(self._outcomes) == self._outcomes.maxlen and self._outcomes[0]:
+            self._failures -= 1
+        self._outcomes.append(failed)
+        if failed:
+            self._failures += 1
+
+    def _open(self) -> None:
+        logger.warning("Circuit %s opened for %.1fs", self.name, self.open_seconds)
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._half_open_calls = 0
+
+    def _close(self) -> None:
+        self._state = CLOSED
+        self._outcomes.clear()
+        self._failures = 0
+        self._half_open_calls = 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._close()
+
+    async def call(
+        self,
+        func: Callable[..., Awaitable[T]],
+        *args: Any,
+        is_failure: Callable[[BaseException], bool] | None = None,
+        **kwargs: Any,
+    ) -> T:
+        """Await ``func`` through the breaker.
+
+        ``is_failure`` decides which exceptions count against the provider;
+        other exceptions are propagated without affecting the window. A
+        cancelled call records nothing but releases its half-open slot.
+        """
+
+        self.before_call()
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException as exc:
+            self.record_outcome(exc, is_failure)
+            raise
+        self.record_success()
+        return result
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Return the process-wide breaker for ``name``, configured from settings."""
+
+    with _registry_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name,
+                failure_rate_threshold=settings.circuit_breaker_failure_rate,
+                window_size=settings.circuit_breaker_window,
+                minimum_calls=settings.circuit_breaker_min_calls,
+                open_seconds=settings.circuit_breaker_open_seconds,
+            )
+            _breakers[name] = breaker
+        return breaker
+
+
+def reset_breakers() -> None:
+    with _registry_lock:
+        for breaker in _breakers.values():
+            breaker.reset()
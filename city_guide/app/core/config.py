@@ -50,8 +50,41 @@ class Settings:
     )
     testing: bool = _bool("CITY_GUIDE_TESTING", False)
     require_postgres: bool = _bool("REQUIRE_POSTGRES", True)
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "8"))
+    db_prepare_statements: bool = _bool("DB_PREPARE_STATEMENTS", True)
+    sqlite_cached_statements: int = int(os.getenv("SQLITE_CACHED_STATEMENTS", "256"))
 
     jwt_secret_key: str = os.getenv("JWT_SECRET_KEY", "super-secret-key")
+    jwt_key_id: str = os.getenv("JWT_KEY_ID", "primary")
+    jwt_previous_keys: str = os.getenv("JWT_PREVIOUS_KEYS", "")
+    jwt_leeway_seconds: float = float(os.getenv("JWT_LEEWAY_SECONDS", "10"))
+
+    user_cache_size: int = int(os.getenv("USER_CACHE_SIZE", "10000"))
+    user_cache_ttl_seconds: float = float(os.getenv("USER_CACHE_TTL_SECONDS", "5"))
+
+    password_hash_algorithm: str = os.getenv("PASSWORD_HASH_ALGORITHM", "scrypt").lower()
+    password_scrypt_n: int = int(os.getenv("PASSWORD_SCRYPT_N", str(2**15)))
+    password_pbkdf2_iterations: int = int(os.getenv("PASSWORD_PBKDF2_ITERATIONS", "600000"))
+    password_hash_workers: int = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+
+    rate_limit_enabled: bool = _bool("RATE_LIMIT_ENABLED", True)
+    rate_limit_routes: str = os.getenv("RATE_LIMIT_ROUTES", "POST /v1/login,POST /v1/register")
+    rate_limit_ip_per_minute: float = float(os.getenv("RATE_LIMIT_IP_PER_MINUTE", "60"))
+    rate_limit_email_per_minute: float = float(os.getenv("RATE_LIMIT_EMAIL_PER_MINUTE", "10"))
+    rate_limit_max_keys: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+    rate_limit_backend: str = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+    rate_limit_sqlite_path: str = os.getenv("RATE_LIMIT_SQLITE_PATH", "rate_limit.sqlite3")
+    rate_limit_trust_forwarded: bool = _bool("RATE_LIMIT_TRUST_FORWARDED", False)
+
+    # The memory store is per process: refresh tokens issued by one worker are
+    # unknown to the others, so it is only the default for tests.
+    session_store: str = os.getenv(
+        "SESSION_STORE", "memory" if _bool("CITY_GUIDE_TESTING", False) else "database"
+    ).lower()
+    session_max: int = int(os.getenv("SESSION_MAX", "100000"))
+    session_purge_interval_seconds: float = float(os.getenv("SESSION_PURGE_INTERVAL_SECONDS", "60"))
+    session_purge_batch: int = int(os.getenv("SESSION_PURGE_BATCH", "1000"))
+    redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     access_token_exp_minutes: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
     refresh_token_exp_minutes: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES", str(60 * 24 * 7)))
 
@@ -62,9 +95,42 @@ class Settings:
         os.getenv("GPT_MODEL", "gpt-4o-mini"),
     )
     brainstorm_poi_max_items: int = int(os.getenv("BRAINSTORM_POI_MAX_ITEMS", "30"))
+    gpt_stream_brainstorm: bool = _bool("GPT_STREAM_BRAINSTORM", True)
+    gpt_max_attempts: int = int(os.getenv("GPT_MAX_ATTEMPTS", "3"))
+    gpt_latency_budget_sec: float = float(os.getenv("GPT_LATENCY_BUDGET_SECONDS", "25"))
+    gpt_retry_initial_wait_sec: float = float(os.getenv("GPT_RETRY_INITIAL_WAIT_SECONDS", "0.5"))
+    gpt_retry_max_wait_sec: float = float(os.getenv("GPT_RETRY_MAX_WAIT_SECONDS", "8"))
+    gpt_retry_jitter_sec: float = float(os.getenv("GPT_RETRY_JITTER_SECONDS", "0.5"))
+
+    circuit_breaker_failure_rate: float = float(os.getenv("CIRCUIT_BREAKER_FAILURE_RATE", "0.5"))
+    circuit_breaker_window: int = int(os.getenv("CIRCUIT_BREAKER_WINDOW", "20"))
+    circuit_breaker_min_calls: int = int(os.getenv("CIRCUIT_BREAKER_MIN_CALLS", "5"))
+    circuit_breaker_open_seconds: float = float(os.getenv("CIRCUIT_BREAKER_OPEN_SECONDS", "30"))
 
     use_google_sources: bool = _bool("USE_GOOGLE_SOURCES", False)
     google_maps_api_key: str | None = os.getenv("GOOGLE_MAPS_API_KEY")
+    generation_max_concurrency: int = int(os.getenv("GENERATION_MAX_CONCURRENCY", "2"))
+    job_queue_durable: bool = _bool("JOB_QUEUE_DURABLE", False)
+    job_lease_seconds: float = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+    job_miss_cache_seconds: float = float(os.getenv("JOB_MISS_CACHE_SECONDS", "5"))
+    generation_min_priority: float = float(os.getenv("GENERATION_MIN_PRIORITY", "0.7"))
+    places_max_concurrency: int = int(os.getenv("PLACES_MAX_CONCURRENCY", "5"))
+
+    compression_enabled: bool = _bool("COMPRESSION_ENABLED", True)
+    compression_min_size: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    compression_offload_size: int = int(os.getenv("COMPRESSION_OFFLOAD_SIZE", "65536"))
+
+    admin_token: str | None = os.getenv("ADMIN_TOKEN") or None
+
+    sql_profile: bool = _bool("SQL_PROFILE", False)
+    sql_slow_ms: float = float(os.getenv("SQL_SLOW_MS", "200"))
+    sql_explain_slow: bool = _bool("SQL_EXPLAIN_SLOW", True)
+    sql_n_plus_one_threshold: int = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "10"))
+
+    tracing_exporter: str = os.getenv("TRACING_EXPORTER", "").lower()
+    tracing_sample_rate: float = float(os.getenv("TRACING_SAMPLE_RATE", "0.1"))
+    tracing_jsonl_path: str = os.getenv("TRACING_JSONL_PATH", "traces.jsonl")
+    tracing_otlp_endpoint: str = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
 
     def __post_init__(self) -> None:
         if self.testing:
@@ -4,15 +4,30 @@ import os
 import uuid
 
 from ..db import database
-from ..db.repo import UserRepository
-from . import security
+from ..db.profiler import sql_profiler
+from ..db.repo import UserRepository, user_cache
+from ..http import Request
+from ..services.events import generation_events
+from ..services.jobs import job_queue
+from . import circuit_breaker, metrics, security
 from .config import settings
+from .profiling import request_profiler
+from .ratelimit import reset_limiters
+from .sessions import session_store
 
 
 def reset_state() -> None:
-    security.reset_tokens()
+    circuit_breaker.reset_breakers()
+    job_queue.reset()
+    generation_events.reset()
+    metrics.registry.reset()
+    sql_profiler.reset()
+    request_profiler.reset()
+    user_cache.clear()
+    reset_limiters()
     if settings.testing or os.getenv("PYTEST_CURRENT_TEST"):
         database.reset()
+    session_store.clear()
 
 
 def get_db():  # compatibility shim
@@ -25,10 +40,10 @@ def override_engine(_: str) -> None:  # pragma: no cover - kept for API compatib
 
 def _extract_token(header: str | None) -> str:
     if not header:
-        raise security.InvalidToken
+        raise security.InvalidToken("Not authenticated")
     parts = header.split()
     if len(parts) != 2 or parts[0].lower() != "bearer":
-        raise security.InvalidToken
+        raise security.InvalidToken("Expected a bearer token")
     return parts[1]
 
 
@@ -37,7 +52,16 @@ def get_current_user(authorization: str | None):
     payload = security.decode_access_token(token)
     user_id = uuid.UUID(payload["sub"])
     repo = UserRepository()
-    user = repo.get_by_id(user_id)
+    user = repo.get_by_id_cached(user_id)
     if user is None or not user.is_active:
-        raise security.InvalidToken
+        raise security.InvalidToken("Inactive user")
+    return user
+
+
+def get_request_user(request: Request):
+    """:func:`get_current_user` for ``request``, loaded at most once per request."""
+
+    user = request.state.get("user")
+    if user is None:
+        user = request.state["user"] = get_current_user(request.headers.get("authorization"))
     return user
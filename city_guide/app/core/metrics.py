@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Sequence
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+OUTBOUND_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 60.0)
+
+
+class _Shards:
+    """Fixed-size float arrays, one per thread, summed when collected.
+
+    Writers only touch the array of their own thread, so recording takes no
+    lock; the lock is held only when a thread records for the first time and
+    while collecting.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: list[array] = []
+
+    def local(self) -> array:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = array("d", bytes(8 * self._size))
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def totals(self) -> list[float]:
+        totals = [0.0] * self._size
+        with self._lock:
+            for shard in self._shards:
+                for idx, value in enumerate(shard):
+                    totals[idx] += value
+        return totals
+
+
+class _CounterChild:
+    __slots__ = ("_shards",)
+
+    def __init__(self) -> None:
+        self._shards = _Shards(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        self._shards.local()[0] += amount
+
+    def value(self) -> float:
+        return self._shards.totals()[0]
+
+
+class _GaugeChild:
+    __slots__ = ("_base", "_function", "_shards")
+
+    def __init__(self) -> None:
+        self._shards = _Shards(1)
+        self._base = 0.0
+        self._function: Callable[[], float] | None = None
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._shards.local()[0] += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._shards.local()[0] -= amount
+
+    def set(self, value: float) -> None:
+        self._base = value - self._shards.totals()[0]
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the value from ``function`` at collection time instead."""
+
+        self._function = function
+
+    def value(self) -> float:
+        if self._function is not None:
+            return float(self._function())
+        return self._base + self._shards.totals()[0]
+
+
+class _HistogramChild:
+    __slots__ = ("_buckets", "_shards")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self._buckets = buckets
+        # One slot per bucket, one for +Inf and one for the sum.
+        self._shards = _Shards(len(buckets) + 2)
+
+    def observe(self, value: float) -> None:
+        shard = self._shards.local()
+        shard[bisect_left(self._buckets, value)] += 1
+        shard[-1] += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def snapshot(self) -> tuple[list[float], float, float]:
+        """Cumulative bucket counts (ending with +Inf), sum and count."""
+
+        totals = self._shards.totals()
+        cumulative: list[float] = []
+        running = 0.0
+        for count in totals[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, totals[-1], running
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def labels(self, *values: Any) -> Any:
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def children(self) -> list[tuple[tuple[str, ...], Any]]:
+        with self._lock:
+            return list(self._children.items())
+
+    def reset(self) -> None:
+        with self._lock:
+            self._children.clear()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets if bound != math.inf))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class MetricsRegistry:
+    """Process-wide collection of metrics rendered in Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name!r} is already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> _Metric | None:
+        return self._metrics.get(name)
+
+    def reset(self) -> None:
+        """Drop all recorded values, keeping the metric definitions."""
+
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines: list[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for values, child in sorted(metric.children(), key=lambda item: item[0]):
+                labels = _format_labels(metric.labelnames, values)
+                if isinstance(child, _HistogramChild):
+                    cumulative, total, count = child.snapshot()
+                    bounds = (*metric.buckets, math.inf)
+                    for bound, bucket_count in zip(bounds, cumulative, strict=True):
+                        bucket_labels = _format_labels(
+                            (*metric.labelnames, "le"), (*values, _format_value(bound))
+                        )
+                        lines.append(f"{metric.name}_bucket{bucket_labels} {_format_value(bucket_count)}")
+                    lines.append(f"{metric.name}_sum{labels} {_format_value(total)}")
+                    lines.append(f"{metric.name}_count{labels} {_format_value(count)}")
+                else:
+                    lines.append(f"{metric.name}{labels} {_format_value(child.value())}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "Time spent handling HTTP requests, per route template.",
+    ("method", "route"),
+)
+http_requests = registry.counter(
+    "http_requests_total",
+    "HTTP responses by route template and status code.",
+    ("method", "route", "status"),
+)
+db_statement_duration = registry.histogram(
+    "db_statement_duration_seconds",
+    "Time spent executing SQL statements, per statement type.",
+    ("operation",),
+)
+outbound_request_duration = registry.histogram(
+    "outbound_request_duration_seconds",
+    "Latency of calls to external providers.",
+    ("service", "operation", "outcome"),
+    buckets=OUTBOUND_BUCKETS,
+)
+jobs_running = registry.gauge("background_jobs_running", "Background jobs being executed.")
+rate_limited_requests = registry.counter(
+    "http_rate_limited_total",
+    "Requests rejected with 429 by the rate limiter.",
+    ("method", "route"),
+)
+
+
+def observe_request(request: Any, response: Any, elapsed: float) -> None:
+    """``TimingMiddleware`` hook recording per-route latency and status codes."""
+
+    route = request.state.get("route", "unmatched")
+    http_request_duration.labels(request.method, route).observe(elapsed)
+    http_requests.labels(request.method, route, response.status_code).inc()
+
+
+@contextmanager
+def track_outbound(service: str, operation: str) -> Iterator[None]:
+    """Time a call to an external provider, labelled with its outcome."""
+
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        elapsed = time.perf_counter() - started
+        outbound_request_duration.labels(service, operation, outcome).observe(elapsed)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from .config import settings
+
+SCRYPT = "scrypt"
+PBKDF2 = "pbkdf2_sha256"
+
+_LEGACY_SHA256 = re.compile(r"[0-9a-f]{64}")
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.b64decode(value + "=" * (-len(value) % 4))
+
+
+class PasswordHasher:
+    """Salted password hashing with scrypt or PBKDF2 from :mod:`hashlib`.
+
+    Hashes record their algorithm and cost next to a per-password salt::
+
+        scrypt$n=32768,r=8,p=1$<salt>$<hash>
+        pbkdf2_sha256$600000$<salt>$<hash>
+
+    so costs can be raised later without invalidating stored hashes;
+    :meth:`needs_rehash` tells which ones to upgrade. Unsalted hex SHA-256
+    hashes from earlier releases still verify.
+
+    The ``*_async`` methods run the key derivation in a pool of ``workers``
+    threads. ``hashlib`` releases the GIL while deriving, so the event loop
+    keeps serving requests meanwhile and at most ``workers`` derivations run
+    at once. With ``workers=0`` they run inline.
+    """
+
+    def __init__(
+        self,
+        algorithm: str = SCRYPT,
+        *,
+        scrypt_n: int = 2**15,
+        scrypt_r: int = 8,
+        scrypt_p: int = 1,
+        pbkdf2_iterations: int = 600_000,
+        workers: int = 4,
+    ) -> None:
+        if algorithm not in (SCRYPT, PBKDF2):
+            raise ValueError(f"Unsupported password hash algorithm {algorithm!r}")
+        self.algorithm = algorithm
+        self.scrypt_n = scrypt_n
+        self.scrypt_r = scrypt_r
+        self.scrypt_p = scrypt_p
+        self.pbkdf2_iterations = pbkdf2_iterations
+        self.workers = workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._dummy: str | None = None
+
+    @staticmethod
+    def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+        # scrypt needs 128 * n * r bytes; leave headroom over OpenSSL's 32 MiB default.
+        maxmem = 128 * n * r + 1024 * 1024
+        return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p, maxmem=maxmem, dklen=32)
+
+    @staticmethod
+    def _pbkdf2(password: str, salt: bytes, iterations: int) -> bytes:
+        return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+
+    def params(self) -> str:
+        if self.algorithm == SCRYPT:
+            return f"n={self.scrypt_n},r={self.scrypt_r},p={self.scrypt_p}"
+        return str(self.pbkdf2_iterations)
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(16)
+        if self.algorithm == SCRYPT:
+            digest = self._scrypt(password, salt, self.scrypt_n, self.scrypt_r, self.scrypt_p)
+        else:
+            digest = self._pbkdf2(password, salt, self.pbkdf2_iterations)
+        return f"{self.algorithm}${self.params()}${_b64encode(salt)}${_b64encode(digest)}"
+
+    def verify(self, password: str, encoded: str | None) -> bool:
+        if not encoded:
+            return False
+        if _LEGACY_SHA256.fullmatch(encoded):
+            legacy = hashlib.sha256(password.encode("utf-8")).hexdigest()
+            return hmac.compare_digest(legacy, encoded)
+        try:
+            algorithm, params, salt, expected = encoded.split("$")
+            if algorithm == SCRYPT:
+                cost = dict(item.split("=", 1) for item in params.split(","))
+                digest = self._scrypt(password, _b64decode(salt), int(cost["n"]), int(cost["r"]), int(cost["p"]))
+            elif algorithm == PBKDF2:
+                digest = self._pbkdf2(password, _b64decode(salt), int(params))
+            else:
+                return False
+        except (KeyError, ValueError):
+            return False
+        return hmac.compare_digest(digest, _b64decode(expected))
+
+    def needs_rehash(self, encoded: str) -> bool:
+        """Whether ``encoded`` was made with another algorithm or cost than configured."""
+
+        return not encoded.startswith(f"{self.algorithm}${self.params()}$")
+
+    @property
+    def dummy_hash(self) -> str:
+        """A well-formed hash no password matches.
+
+        Verifying against it costs a full derivation, so logins for unknown
+        emails take as long to reject as wrong passwords.
+        """
+
+        if self._dummy is None:
+            salt, digest = os.urandom(16), os.urandom(32)
+            self._dummy = f"{self.algorithm}${self.params()}${_b64encode(salt)}${_b64encode(digest)}"
+        return self._dummy
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self.workers <= 0:
+            return func(*args)
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="password-hash")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def hash_async(self, password: str) -> str:
+        return await self._run(self.hash, password)
+
+    async def verify_async(self, password: str, encoded: str | None) -> bool:
+        return await self._run(self.verify, password, encoded)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+password_hasher = PasswordHasher(
+    settings.password_hash_algorithm,
+    scrypt_n=settings.password_scrypt_n,
+    pbkdf2_iterations=settings.password_pbkdf2_iterations,
+    workers=settings.password_hash_workers,
+)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from types import FrameType
+from typing import Any, Awaitable, Callable
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a profiling session is already running."""
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def _collapse(frame: FrameType | None, thread_name: str, max_depth: int) -> str:
+    labels: list[str] = []
+    while frame is not None and len(labels) < max_depth:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(thread_name)
+    labels.reverse()
+    return ";".join(labels)
+
+
+class StackSampler:
+    """Wall-clock sampler of every thread's Python stack.
+
+    A background thread reads ``sys._current_frames()`` every ``interval``
+    seconds, so no signal handlers or external tools are involved and the
+    sampled workers keep serving requests. The result is in the collapsed
+    ("folded") format understood by flamegraph tools: one
+    ``thread;outer;...;inner count`` line per distinct stack.
+    """
+
+    def __init__(self, *, max_depth: int = 128) -> None:
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+
+    def sample(self, duration: float, interval: float = 0.005) -> Counter[str]:
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A sampling session is already running")
+        try:
+            return self._sample(duration, max(interval, 0.001))
+        finally:
+            self._lock.release()
+
+    def _sample(self, duration: float, interval: float) -> Counter[str]:
+        own_id = threading.get_ident()
+        stacks: Counter[str] = Counter()
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                name = names.get(thread_id, f"thread-{thread_id}")
+                stacks[_collapse(frame, name, self.max_depth)] += 1
+            time.sleep(interval)
+        return stacks
+
+    @staticmethod
+    def render(stacks: Counter[str]) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class RequestProfiler:
+    """Run individual requests, picked by request id, under ``cProfile``.
+
+    An id is armed first; the next request carrying it is profiled and its
+    statistics are kept (the most recent ``keep`` of them). ``cProfile``
+    sees the whole event loop thread, so work of concurrent requests on the
+    same worker can show up in the result.
+    """
+
+    def __init__(self, *, keep: int = 20, limit: int = 50) -> None:
+        self.keep = keep
+        self.limit = limit
+        self._armed: set[str] = set()
+        self._results: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._active = False
+
+    def arm(self, request_id: str) -> None:
+        with self._lock:
+            self._armed.add(request_id)
+            self._results.pop(request_id, None)
+
+    def is_armed(self, request_id: str | None) -> bool:
+        return bool(self._armed) and request_id in self._armed
+
+    def result(self, request_id: str) -> str | None:
+        with self._lock:
+            return self._results.get(request_id)
+
+    async def profile(self, request_id: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        with self._lock:
+            if self._active or request_id not in self._armed:
+                start = False
+            else:
+                self._armed.discard(request_id)
+                self._active = start = True
+        if not start:
+            return await call()
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return await call()
+        finally:
+            profiler.disable()
+            output = io.StringIO()
+            pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(self.limit)
+            with self._lock:
+                self._active = False
+                self._results[request_id] = output.getvalue()
+                while len(self._results) > self.keep:
+                    self._results.popitem(last=False)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._armed.clear()
+            self._results.clear()
+
+
+stack_sampler = StackSampler()
+request_profiler = RequestProfiler()
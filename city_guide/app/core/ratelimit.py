@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Protocol
+
+from .config import settings
+
+
+class Limiter(Protocol):
+    def acquire(self, key: str) -> float:
+        """Take a token for ``key``; ``0`` when allowed, else seconds until one is available."""
+
+    async def acquire_async(self, key: str) -> float:
+        """:meth:`acquire` without blocking the event loop."""
+
+    def reset(self) -> None: ...
+
+
+def _check_rate(rate: float) -> float:
+    if rate <= 0:
+        raise ValueError(f"Rate limit rate must be positive, got {rate!r}")
+    return rate
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets holding up to ``burst`` tokens, refilled at ``rate`` per second.
+
+    A bucket is two floats, and only the ``max_keys`` most recently used
+    buckets are kept. A bucket evicted for lack of space comes back full, which
+    a full bucket would be anyway once ``burst / rate`` seconds passed.
+    """
+
+    def __init__(self, rate: float, burst: float, *, max_keys: int = 100_000) -> None:
+        self.rate = _check_rate(rate)
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def acquire(self, key: str) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.burst, now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / self.rate
+
+    async def acquire_async(self, key: str) -> float:
+        # In memory and under a short lock: cheaper than a thread hop.
+        return self.acquire(key)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class SqliteTokenBucketLimiter:
+    """Token buckets in a SQLite file, shared by the workers of one host.
+
+    Each acquire is one ``BEGIN IMMEDIATE`` transaction, so concurrent workers
+    never spend the same token. Buckets that would be full again are deleted
+    every ``prune_every`` acquires to keep the table small. The transaction
+    may wait on other workers' locks, so :meth:`acquire_async` runs it in a
+    thread; connections are per thread.
+    """
+
+    def __init__(self, path: str | Path, rate: float, burst: float, *, prune_every: int = 1000) -> None:
+        self.path = Path(path)
+        self.rate = _check_rate(rate)
+        self.burst = burst
+        self.prune_every = prune_every
+        self._local = threading.local()
+        self._calls = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.connection = connection
+        return connection
+
+    def acquire(self, key: str) -> float:
+        # Wall clock, not monotonic: the timestamps are compared across processes.
+        now = time.time()
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens = self.burst if row is None else min(self.burst, row[0] + max(0.0, now - row[1]) * self.rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+            if not wait:
+                tokens -= 1
+            connection.execute(
+                "INSERT INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                (key, tokens, now),
+            )
+            self._calls += 1
+            if self._calls % self.prune_every == 0:
+                connection.execute(
+                    "DELETE FROM rate_limit_buckets WHERE updated_at < ?",
+                    (now - self.burst / self.rate,),
+                )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return wait
+
+    async def acquire_async(self, key: str) -> float:
+        return await asyncio.to_thread(self.acquire, key)
+
+    def reset(self) -> None:
+        self._connection().execute("DELETE FROM rate_limit_buckets")
+
+
+def build_limiter(per_minute: float) -> Limiter:
+    """A limiter allowing bursts of ``per_minute`` requests, refilled over a minute."""
+
+    if settings.rate_limit_backend == "sqlite":
+        return SqliteTokenBucketLimiter(settings.rate_limit_sqlite_path, per_minute / 60, per_minute)
+    return TokenBucketLimiter(per_minute / 60, per_minute, max_keys=settings.rate_limit_max_keys)
+
+
+def parse_routes(spec: str) -> frozenset[tuple[str, str]]:
+    """Parse ``METHOD /path, METHOD /path`` into ``(method, path)`` pairs."""
+
+    routes = set()
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        method, _, path = item.partition(" ")
+        if not path.strip():
+            raise ValueError(f"Invalid rate limited route {item!r}, expected 'METHOD /path'")
+        routes.add((method.upper(), path.strip()))
+    return frozenset(routes)
+
+
+# Both limiters may share one SQLite table: their keys are prefixed apart.
+ip_limiter = build_limiter(settings.rate_limit_ip_per_minute)
+email_limiter = build_limiter(settings.rate_limit_email_per_minute)
+
+
+def reset_limiters() -> None:
+    ip_limiter.reset()
+    email_limiter.reset()
+
@@ -1,57 +1,183 @@
 from __future__ import annotations
 
+import base64
 import hashlib
+import hmac
+import json
+import os
+import time
 import uuid
 from typing import Any
 
+from .config import settings
+from .passwords import password_hasher
+from .sessions import session_store
+
 
 class InvalidToken(Exception):
     """Raised when a token cannot be validated."""
 
 
 def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode("utf-8")).hexdigest()
+    return password_hasher.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    if not hashed_password:
-        return False
-    return hash_password(plain_password) == hashed_password
-
-
-_access_tokens: dict[str, uuid.UUID] = {}
-_refresh_tokens: dict[str, uuid.UUID] = {}
+    return password_hasher.verify(plain_password, hashed_password)
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def parse_keys(spec: str) -> dict[str, str]:
+    """Parse a ``kid=secret,kid=secret`` list of signing keys."""
+
+    keys: dict[str, str] = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        kid, _, secret = (value.strip() for value in item.partition("="))
+        if not kid or not secret:
+            raise ValueError(f"Invalid key entry {item!r}, expected kid=secret")
+        keys[kid] = secret
+    return keys
+
+
+class TokenSigner:
+    """HS256 JSON Web Tokens signed with one of several keys.
+
+    The header names the key (``kid``) a token was signed with. New tokens
+    use ``active_kid`` while every key in ``keys`` still verifies, so a key is
+    rotated by activating a new one and dropping the old one once the tokens
+    it signed have expired. Verification needs no storage, so any worker can
+    check any token.
+    """
+
+    algorithm = "HS256"
+
+    def __init__(self, keys: dict[str, str], active_kid: str, *, leeway: float = 0.0) -> None:
+        if active_kid not in keys:
+            raise ValueError(f"Unknown active key id {active_kid!r}")
+        self.active_kid = active_kid
+        self.leeway = leeway
+        self._macs = {
+            kid: hmac.new(secret.encode("utf-8"), digestmod=hashlib.sha256)
+            for kid, secret in keys.items()
+        }
+        # Tokens issued here carry one of these exact header segments, which
+        # saves decoding the header JSON on every verification.
+        self._headers = {self._header(kid): kid for kid in keys}
+        self._active_header = self._header(active_kid)
+
+    def _header(self, kid: str) -> str:
+        header = {"alg": self.algorithm, "typ": "JWT", "kid": kid}
+        return _b64encode(json.dumps(header, separators=(",", ":")).encode())
+
+    def _signature(self, kid: str, signing_input: str) -> str:
+        mac = self._macs[kid].copy()
+        mac.update(signing_input.encode("ascii"))
+        return _b64encode(mac.digest())
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        signing_input = f"{self._active_header}.{payload}"
+        return f"{signing_input}.{self._signature(self.active_kid, signing_input)}"
+
+    def decode(self, token: str, *, token_type: str | None = None) -> dict[str, Any]:
+        """Verify ``token`` and return its claims.
+
+        Raises :class:`InvalidToken` for a bad signature, an unknown key, an
+        expired token or, when ``token_type`` is given, a token of another type.
+        """
+
+        if not token.isascii() or token.count(".") != 2:
+            raise InvalidToken("Malformed token")
+        header, payload, signature = token.split(".")
+        kid = self._headers.get(header) or self._kid_from_header(header)
+        expected = self._signature(kid, token[: len(header) + len(payload) + 1])
+        if not hmac.compare_digest(signature, expected):
+            raise InvalidToken("Bad signature")
+        try:
+            claims = json.loads(_b64decode(payload))
+        except ValueError as exc:
+            raise InvalidToken("Malformed payload") from exc
+        if not isinstance(claims, dict):
+            raise InvalidToken("Malformed payload")
+        expires = claims.get("exp")
+        if not isinstance(expires, (int, float)) or expires + self.leeway < time.time():
+            raise InvalidToken("Token expired")
+        if token_type is not None and claims.get("type") != token_type:
+            raise InvalidToken("Unexpected token type")
+        return claims
+
+    def _kid_from_header(self, header: str) -> str:
+        try:
+            fields = json.loads(_b64decode(header))
+        except ValueError as exc:
+            raise InvalidToken("Malformed header") from exc
+        if not isinstance(fields, dict) or fields.get("alg") != self.algorithm:
+            raise InvalidToken("Unsupported algorithm")
+        kid = fields.get("kid", self.active_kid)
+        if kid not in self._macs:
+            raise InvalidToken("Unknown key id")
+        return kid
+
+
+def build_signer() -> TokenSigner:
+    keys = parse_keys(settings.jwt_previous_keys)
+    keys[settings.jwt_key_id] = settings.jwt_secret_key
+    return TokenSigner(keys, settings.jwt_key_id, leeway=settings.jwt_leeway_seconds)
+
+
+signer = build_signer()
+
+
+def _claims(subject: uuid.UUID, token_type: str, lifetime_minutes: int) -> dict[str, Any]:
+    now = int(time.time())
+    return {
+        "sub": str(subject),
+        "type": token_type,
+        "iat": now,
+        "exp": now + lifetime_minutes * 60,
+        "jti": os.urandom(8).hex(),
+    }
 
 
-def reset_tokens() -> None:
-    _access_tokens.clear()
-    _refresh_tokens.clear()
+def create_access_token(subject: uuid.UUID) -> str:
+    return signer.encode(_claims(subject, "access", settings.access_token_exp_minutes))
 
 
-def _store_token(store: dict[str, uuid.UUID], subject: uuid.UUID) -> str:
-    token = uuid.uuid4().hex
-    store[token] = subject
-    return token
+def create_refresh_token(subject: uuid.UUID) -> str:
+    """Issue a refresh token backed by a revocable session."""
 
+    claims = _claims(subject, "refresh", settings.refresh_token_exp_minutes)
+    session_store.add(claims["jti"], claims["sub"], claims["exp"])
+    return signer.encode(claims)
 
-def create_access_token(subject: uuid.UUID) -> str:
-    return _store_token(_access_tokens, subject)
 
+def decode_access_token(token: str) -> dict[str, Any]:
+    return signer.decode(token, token_type="access")
 
-def create_refresh_token(subject: uuid.UUID) -> str:
-    return _store_token(_refresh_tokens, subject)
 
+def decode_refresh_token(token: str) -> dict[str, Any]:
+    """Verify a refresh token and check that its session was not revoked."""
 
-def _decode_token(token: str, store: dict[str, uuid.UUID]) -> dict[str, Any]:
-    user_id = store.get(token)
-    if user_id is None:
-        raise InvalidToken
-    return {"sub": str(user_id)}
+    claims = signer.decode(token, token_type="refresh")
+    if session_store.get(str(claims.get("jti"))) != claims.get("sub"):
+        raise InvalidToken("Session revoked")
+    return claims
 
 
-def decode_access_token(token: str) -> dict[str, Any]:
-    return _decode_token(token, _access_tokens)
+def revoke_refresh_token(token: str) -> bool:
+    try:
+        claims = signer.decode(token, token_type="refresh")
+    except InvalidToken:
+        return False
+    return session_store.revoke(str(claims.get("jti")))
 
 
-def decode_refresh_token(token: str) -> dict[str, Any]:
-    return _decode_token(token, _refresh_tokens)
+def revoke_user_sessions(user_id: uuid.UUID) -> int:
+    return session_store.revoke_user(str(user_id))
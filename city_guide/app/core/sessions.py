@@ -0,0 +1,373 @@
+from __future__ import annotations
+
+import logging
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Protocol
+from urllib.parse import urlparse
+
+from ..db import database
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore(Protocol):
+    """Server-side record of issued refresh tokens, keyed by token id."""
+
+    def add(self, session_id: str, user_id: str, expires_at: float) -> None: ...
+
+    def get(self, session_id: str) -> str | None: ...
+
+    def revoke(self, session_id: str) -> bool: ...
+
+    def revoke_user(self, user_id: str) -> int: ...
+
+    def purge(self, now: float | None = None) -> int: ...
+
+    def clear(self) -> None: ...
+
+
+class MemorySessionStore:
+    """Process-local sessions expired through a hashed timing wheel.
+
+    Each session sits in the wheel bucket of its expiry second. :meth:`purge`
+    visits only the buckets whose time passed since the previous purge, so a
+    purge costs the buckets it crosses rather than a scan of every session.
+    At most ``max_sessions`` are kept; when full, the oldest session goes first.
+    """
+
+    def __init__(self, *, max_sessions: int = 100_000, resolution: float = 1.0, slots: int = 3600) -> None:
+        self.max_sessions = max_sessions
+        self.resolution = resolution
+        self._sessions: dict[str, tuple[str, float]] = {}
+        self._by_user: dict[str, set[str]] = {}
+        self._wheel: list[set[str]] = [set() for _ in range(slots)]
+        self._cursor = self._tick(time.time())
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _tick(self, timestamp: float) -> int:
+        return int(timestamp // self.resolution)
+
+    def _bucket(self, expires_at: float) -> set[str]:
+        return self._wheel[self._tick(expires_at) % len(self._wheel)]
+
+    def add(self, session_id: str, user_id: str, expires_at: float) -> None:
+        with self._lock:
+            if session_id in self._sessions:
+                self._remove(session_id)
+            if len(self._sessions) >= self.max_sessions:
+                self._purge(time.time())
+            while len(self._sessions) >= self.max_sessions:
+                self._remove(next(iter(self._sessions)))
+            self._sessions[session_id] = (user_id, expires_at)
+            self._by_user.setdefault(user_id, set()).add(session_id)
+            self._bucket(expires_at).add(session_id)
+
+    def get(self, session_id: str) -> str | None:
+        entry = self._sessions.get(session_id)
+        if entry is None or entry[1] <= time.time():
+            return None
+        return entry[0]
+
+    def revoke(self, session_id: str) -> bool:
+        with self._lock:
+            if session_id not in self._sessions:
+                return False
+            self._remove(session_id)
+            return True
+
+    def revoke_user(self, user_id: str) -> int:
+        with self._lock:
+            session_ids = list(self._by_user.get(user_id, ()))
+            for session_id in session_ids:
+                self._remove(session_id)
+            return len(session_ids)
+
+    def purge(self, now: float | None = None) -> int:
+        with self._lock:
+            return self._purge(time.time() if now is None else now)
+
+    def _purge(self, now: float) -> int:
+        current = self._tick(now)
+        # After a long pause one full turn of the wheel covers every bucket.
+        first = max(self._cursor, current - len(self._wheel) + 1)
+        removed = 0
+        for tick in range(first, current + 1):
+            bucket = self._wheel[tick % len(self._wheel)]
+            # Buckets are shared by expiry times a whole turn apart.
+            expired = [session_id for session_id in bucket if self._sessions[session_id][1] <= now]
+            for session_id in expired:
+                self._remove(session_id)
+            removed += len(expired)
+        self._cursor = current
+        return removed
+
+    def _remove(self, session_id: str) -> None:
+        user_id, expires_at = self._sessions.pop(session_id)
+        self._bucket(expires_at).discard(session_id)
+        user_sessions = self._by_user.get(user_id)
+        if user_sessions is not None:
+            user_sessions.discard(session_id)
+            if not user_sessions:
+                del self._by_user[user_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+            self._by_user.clear()
+            for bucket in self._wheel:
+                bucket.clear()
+
+
+def _timestamp(value: float) -> str:
+    return datetime.fromtimestamp(value, timezone.utc).isoformat()
+
+
+class DatabaseSessionStore:
+    """Sessions in the ``refresh_sessions`` table, shared by every worker.
+
+    Lookups filter on ``expires_at`` so expired rows are never honoured;
+    :meth:`purge` deletes them through the expiry index in batches of
+    ``batch_size`` rows, keeping each delete transaction short.
+    """
+
+    def __init__(self, *, batch_size: int = 1000) -> None:
+        self.batch_size = batch_size
+
+    def add(self, session_id: str, user_id: str, expires_at: float) -> None:
+        database.execute(
+            """
+            INSERT INTO refresh_sessions (id, user_id, expires_at, created_at)
+            VALUES (:id, :user_id, :expires_at, :created_at)
+            """,
+            {
+                "id": session_id,
+                "user_id": user_id,
+                "expires_at": _timestamp(expires_at),
+                "created_at": _timestamp(time.time()),
+            },
+        )
+
+    def get(self, session_id: str) -> str | None:
+        row = database.execute(
+            "SELECT user_id FROM refresh_sessions WHERE id = :id AND expires_at > :now",
+            {"id": session_id, "now": _timestamp(time.time())},
+            fetchone=True,
+        )
+        return str(row["user_id"]) if row else None
+
+    def revoke(self, session_id: str) -> bool:
+        return database.execute("DELETE FROM refresh_sessions WHERE id = :id", {"id": session_id}) == 1
+
+    def revoke_user(self, user_id: str) -> int:
+        return database.execute("DELETE FROM refresh_sessions WHERE user_id = :user_id", {"user_id": user_id})
+
+    def purge(self, now: float | None = None) -> int:
+        params = {"now": _timestamp(time.time() if now is None else now), "batch": self.batch_size}
+        removed = 0
+        while True:
+            deleted = database.execute(
+                """
+                DELETE FROM refresh_sessions WHERE id IN (
+                    SELECT id FROM refresh_sessions WHERE expires_at <= :now LIMIT :batch
+                )
+                """,
+                params,
+            )
+            removed += deleted
+            if deleted < self.batch_size:
+                return removed
+
+    def clear(self) -> None:
+        database.execute("DELETE FROM refresh_sessions")
+
+
+class RespError(Exception):
+    """Error reply from a Redis-protocol server."""
+
+
+class RespClient:
+    """Minimal blocking client for servers speaking the Redis protocol (RESP2).
+
+    Enough for Redis, Valkey, KeyDB or a local stand-in without pulling in a
+    client library. One connection is shared under a lock and reopened once
+    when it breaks.
+    """
+
+    def __init__(self, url: str, *, timeout: float = 2.0) -> None:
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._sock: socket.socket | None = None
+        self._reader: Any = None
+        self._lock = threading.Lock()
+
+    def command(self, *args: Any) -> Any:
+        with self._lock:
+            try:
+                return self._roundtrip(args)
+            except OSError:
+                self._close()
+                return self._roundtrip(args)
+
+    def _roundtrip(self, args: tuple[Any, ...]) -> Any:
+        if self._sock is None:
+            self._connect()
+        assert self._sock is not None
+        self._sock.sendall(self._encode(args))
+        return self._read()
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection((self.host, self.port), self.timeout)
+        self._reader = self._sock.makefile("rb")
+        if self.password:
+            self._sock.sendall(self._encode(("AUTH", self.password)))
+            self._read()
+        if self.db:
+            self._sock.sendall(self._encode(("SELECT", self.db)))
+            self._read()
+
+    @staticmethod
+    def _encode(args: tuple[Any, ...]) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    def _read(self) -> Any:
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RespError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            size = int(payload)
+            if size < 0:
+                return None
+            return self._reader.read(size + 2)[:-2].decode()
+        if kind == b"*":
+            size = int(payload)
+            return None if size < 0 else [self._read() for _ in range(size)]
+        raise RespError(f"Unexpected reply {line!r}")
+
+    def _close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+        self._sock = None
+        self._reader = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+class RedisSessionStore:
+    """Sessions as expiring keys on a Redis-protocol server.
+
+    The server expires keys itself, so :meth:`purge` has nothing to do; a set
+    per user indexes that user's sessions for :meth:`revoke_user`.
+    """
+
+    def __init__(self, client: RespClient, *, prefix: str = "city_guide:session:") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    def _user_key(self, user_id: str) -> str:
+        return f"{self.prefix}user:{user_id}"
+
+    def add(self, session_id: str, user_id: str, expires_at: float) -> None:
+        ttl_ms = int((expires_at - time.time()) * 1000)
+        if ttl_ms <= 0:
+            return
+        self.client.command("SET", self.prefix + session_id, user_id, "PX", ttl_ms)
+        user_key = self._user_key(user_id)
+        self.client.command("SADD", user_key, session_id)
+        self.client.command("PEXPIRE", user_key, ttl_ms)
+
+    def get(self, session_id: str) -> str | None:
+        return self.client.command("GET", self.prefix + session_id)
+
+    def revoke(self, session_id: str) -> bool:
+        user_id = self.get(session_id)
+        if user_id is not None:
+            self.client.command("SREM", self._user_key(user_id), session_id)
+        return self.client.command("DEL", self.prefix + session_id) == 1
+
+    def revoke_user(self, user_id: str) -> int:
+        user_key = self._user_key(user_id)
+        session_ids = self.client.command("SMEMBERS", user_key) or []
+        removed = self.client.command("DEL", *(self.prefix + sid for sid in session_ids)) if session_ids else 0
+        self.client.command("DEL", user_key)
+        return removed
+
+    def purge(self, now: float | None = None) -> int:
+        return 0
+
+    def clear(self) -> None:
+        cursor = "0"
+        while True:
+            cursor, keys = self.client.command("SCAN", cursor, "MATCH", f"{self.prefix}*", "COUNT", 500)
+            if keys:
+                self.client.command("DEL", *keys)
+            if cursor == "0":
+                return
+
+
+class SessionPurger:
+    """Background thread calling ``store.purge()`` every ``interval`` seconds."""
+
+    def __init__(self, store: SessionStore, interval: float) -> None:
+        self.store = store
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self.interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="session-purge", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                removed = self.store.purge()
+            except Exception as exc:  # noqa: BLE001 - keep purging on the next tick
+                logger.warning("Purging expired sessions failed: %s", exc)
+                continue
+            if removed:
+                logger.debug("Purged %d expired sessions", removed)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+def build_session_store(kind: str) -> SessionStore:
+    if kind == "database":
+        return DatabaseSessionStore(batch_size=settings.session_purge_batch)
+    if kind == "redis":
+        return RedisSessionStore(RespClient(settings.redis_url))
+    return MemorySessionStore(max_sessions=settings.session_max)
+
+
+session_store = build_session_store(settings.session_store)
+session_purger = SessionPurger(session_store, settings.session_purge_interval_seconds)
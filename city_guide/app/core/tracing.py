@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from collections.abc import Callable, Sequence
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from .config import settings
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+SERVICE_NAME = "city-guide"
+
+_current: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation within a trace.
+
+    Spans are context managers: entering makes the span current for the code
+    (and the tasks it starts) inside the block, leaving ends it and records an
+    exception, if any.
+    """
+
+    __slots__ = (
+        "_token",
+        "_tracer",
+        "attributes",
+        "end_ns",
+        "error",
+        "name",
+        "parent_id",
+        "span_id",
+        "start_ns",
+        "start_unix_ns",
+        "trace_id",
+    )
+
+    def __init__(
+        self,
+        tracer: Tracer,
+        name: str,
+        trace_id: str,
+        parent_id: str | None,
+        attributes: dict[str, Any],
+    ) -> None:
+        self._tracer = tracer
+        self._token: Token | None = None
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.error: str | None = None
+        self.start_unix_ns = time.time_ns()
+        self.start_ns = time.monotonic_ns()
+        self.end_ns: int | None = None
+
+    @property
+    def duration_ns(self) -> int:
+        return (self.end_ns or time.monotonic_ns()) - self.start_ns
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.monotonic_ns()
+            self._tracer._finished(self)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_unix_ns": self.start_unix_ns,
+            "duration_ns": self.duration_ns,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+    def __enter__(self) -> Self:
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}" if str(exc) else exc_type.__name__
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+        self.end()
+
+
+class _NoopSpan:
+    """Stands in for spans outside of a sampled trace; does nothing."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class JsonLinesExporter:
+    """Append finished spans as one JSON object per line."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def export(self, spans: Sequence[Span]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as handle:
+            for span in spans:
+                handle.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_payload(spans: Sequence[Span]) -> dict[str, Any]:
+    """Encode ``spans`` as an OTLP/JSON ``ExportTraceServiceRequest``."""
+
+    encoded = []
+    for span in spans:
+        item: dict[str, Any] = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,
+            "startTimeUnixNano": str(span.start_unix_ns),
+            "endTimeUnixNano": str(span.start_unix_ns + span.duration_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()
+            ],
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+        }
+        if span.parent_id:
+            item["parentSpanId"] = span.parent_id
+        encoded.append(item)
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]
+                },
+                "scopeSpans": [{"scope": {"name": "city_guide"}, "spans": encoded}],
+            }
+        ]
+    }
+
+
+class OTLPHttpExporter:
+    """POST spans as OTLP/JSON to a collector (``/v1/traces``)."""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0) -> None:
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def export(self, spans: Sequence[Span]) -> None:
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(otlp_payload(spans), default=str).encode(),
+            headers={"content-type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class Tracer:
+    """Creates spans and hands finished ones to an exporter.
+
+    Sampling is decided once per trace by :meth:`start_trace`; spans started
+    outside a sampled trace are no-ops, so instrumented code costs a context
+    variable lookup when tracing is off. Export runs in a background thread
+    and batches whatever spans finished since the last export.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, exporter: Any | None = None) -> None:
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+        self._queue: queue.SimpleQueue[Span] = queue.SimpleQueue()
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._worker: threading.Thread | None = None
+        self._worker_lock = threading.Lock()
+
+    def start_trace(self, name: str, **attributes: Any) -> Span | _NoopSpan:
+        """Start a root span, subject to sampling.
+
+        Inside an existing trace this starts a child span instead.
+        """
+
+        parent = _current.get()
+        if parent is not None:
+            return Span(self, name, parent.trace_id, parent.span_id, attributes)
+        if self.exporter is None or self.sample_rate <= 0:
+            return NOOP_SPAN
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return NOOP_SPAN
+        return Span(self, name, os.urandom(16).hex(), None, attributes)
+
+    def start_span(self, name: str, **attributes: Any) -> Span | _NoopSpan:
+        parent = _current.get()
+        if parent is None:
+            return NOOP_SPAN
+        return Span(self, name, parent.trace_id, parent.span_id, attributes)
+
+    def _finished(self, span: Span) -> None:
+        if self.exporter is None:
+            return
+        with self._idle:
+            self._pending += 1
+        self._ensure_worker()
+        self._queue.put(span)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._export_loop, name="trace-export", daemon=True)
+                self._worker.start()
+
+    def _export_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                if self.exporter is not None:
+                    self.exporter.export(batch)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Exporting %d spans failed: %s", len(batch), exc)
+            with self._idle:
+                self._pending -= len(batch)
+                self._idle.notify_all()
+
+    def flush(self, timeout: float | None = 5.0) -> bool:
+        """Wait until every finished span has been exported."""
+
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+def set_span_attributes(**attributes: Any) -> None:
+    """Add attributes to the current span, if there is one."""
+
+    span = _current.get()
+    if span is not None:
+        span.attributes.update(attributes)
+
+
+def build_exporter(kind: str, *, path: str, endpoint: str) -> Any | None:
+    if kind == "jsonl":
+        return JsonLinesExporter(path)
+    if kind == "otlp":
+        return OTLPHttpExporter(endpoint)
+    return None
+
+
+tracer = Tracer(
+    settings.tracing_sample_rate,
+    build_exporter(
+        settings.tracing_exporter,
+        path=settings.tracing_jsonl_path,
+        endpoint=settings.tracing_otlp_endpoint,
+    ),
+)
+
+
+def start_trace(name: str, **attributes: Any) -> Span | _NoopSpan:
+    return tracer.start_trace(name, **attributes)
+
+
+def start_span(name: str, **attributes: Any) -> Span | _NoopSpan:
+    return tracer.start_span(name, **attributes)
+
+
+def traced(name: str | None = None) -> Callable[[F], F]:
+    """Run the decorated function (sync or async) inside a span."""
+
+    def decorator(func: F) -> F:
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with tracer.start_span(span_name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with tracer.start_span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -1,9 +1,10 @@
-from .entities import RouteDraft, RoutePoint, User, UserProfile
+from .entities import RouteDraft, RoutePoint, RoutePointBatch, User, UserProfile
 from .storage import database
 
 __all__ = [
     "RouteDraft",
     "RoutePoint",
+    "RoutePointBatch",
     "User",
     "UserProfile",
     "database",
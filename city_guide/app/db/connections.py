@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import contextlib
+import threading
+from collections import Counter
+from typing import Any, Callable
+
+from .profiler import normalize_sql
+
+
+class PooledConnection:
+    """A driver connection plus the statements it has already prepared."""
+
+    __slots__ = ("connection", "statements")
+
+    def __init__(self, connection: Any) -> None:
+        self.connection = connection
+        self.statements: set[str] = set()
+
+    def close(self) -> None:
+        # The connection is being dropped; a failing close changes nothing.
+        with contextlib.suppress(Exception):
+            self.connection.close()
+
+
+class ConnectionPool:
+    """Keeps up to ``size`` idle connections for reuse.
+
+    Connections are opened on demand, so concurrent callers never wait for
+    one; only ``size`` of them are kept once released. The most recently
+    released connection is handed out first, as its statement cache is the
+    warmest.
+    """
+
+    def __init__(self, connect: Callable[[], Any], size: int) -> None:
+        self._connect = connect
+        self.size = size
+        self._idle: list[PooledConnection] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._idle)
+
+    def acquire(self) -> PooledConnection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return PooledConnection(self._connect())
+
+    def release(self, pooled: PooledConnection) -> None:
+        if getattr(pooled.connection, "closed", False):
+            return
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(pooled)
+                return
+        pooled.close()
+
+    def clear(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            pooled.close()
+
+
+class StatementCache:
+    """Driver-ready SQL per statement text, and per-statement reuse counts.
+
+    ``prepare`` rewrites a statement once and returns the memoized text
+    afterwards. ``record`` counts, per statement, executions on connections
+    that had already prepared it (hits) and first executions (misses).
+    """
+
+    def __init__(self, rewrite: Callable[[str], str]) -> None:
+        self._rewrite = rewrite
+        self._prepared: dict[str, str] = {}
+        self.hits: Counter[str] = Counter()
+        self.misses: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def prepare(self, sql: str) -> str:
+        prepared = self._prepared.get(sql)
+        if prepared is None:
+            # Racing threads compute the same text; the last write wins harmlessly.
+            prepared = self._prepared[sql] = self._rewrite(sql)
+        return prepared
+
+    def record(self, pooled: PooledConnection, sql: str) -> bool:
+        """Count an execution of ``sql`` on ``pooled``; ``True`` when it was prepared there already."""
+
+        hit = sql in pooled.statements
+        if not hit:
+            pooled.statements.add(sql)
+        with self._lock:
+            (self.hits if hit else self.misses)[sql] += 1
+        return hit
+
+    def stats(self) -> list[dict[str, Any]]:
+        """Statements by executions, most executed first."""
+
+        with self._lock:
+            rows = [
+                {"sql": normalize_sql(sql), "hits": self.hits[sql], "misses": self.misses[sql]}
+                for sql in set(self.hits) | set(self.misses)
+            ]
+        return sorted(rows, key=lambda row: row["hits"] + row["misses"], reverse=True)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits.clear()
+            self.misses.clear()
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
 import uuid
+from array import array
+from collections.abc import Iterator, Mapping, Sequence
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from operator import itemgetter
 from typing import Any
 
+# Stands for NULL in the integer columns of ``RoutePointBatch``.
+_NULL_INT = -(2**63)
 
-@dataclass
+
+@dataclass(slots=True)
 class User:
     id: uuid.UUID
     email: str
@@ -22,14 +28,14 @@ class User:
     updated_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
 
 
-@dataclass
+@dataclass(slots=True)
 class UserProfile:
     user_id: uuid.UUID
     context: dict[str, Any]
     updated_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
 
 
-@dataclass
+@dataclass(slots=True)
 class RoutePoint:
     id: uuid.UUID
     route_id: uuid.UUID
@@ -45,7 +51,155 @@ class RoutePoint:
     source_poi_id: str | None = None
 
 
-@dataclass
+def _from_optional(value: int | None) -> int:
+    return _NULL_INT if value is None else value
+
+
+def _to_optional(value: int) -> int | None:
+    return None if value == _NULL_INT else value
+
+
+class RoutePointBatch:
+    """Route points stored column by column.
+
+    Coordinates, order and timings live in :mod:`array` columns of machine
+    numbers, ids and names stay the strings the database returned, and the
+    route id, category and source POI id columns are codes into a shared
+    string table, as few distinct values repeat across points. Iterating
+    yields :class:`RoutePoint` instances for code that wants objects; list
+    endpoints read the columns directly.
+    """
+
+    __slots__ = (
+        "_codes",
+        "category_codes",
+        "eta_min_drive",
+        "eta_min_walk",
+        "ids",
+        "lat",
+        "listen_sec",
+        "lng",
+        "names",
+        "order_index",
+        "poi_ids",
+        "route_codes",
+        "source_codes",
+        "strings",
+    )
+
+    def __init__(self) -> None:
+        self.ids: list[str] = []
+        self.poi_ids: list[str] = []
+        self.names: list[str] = []
+        self.lat = array("d")
+        self.lng = array("d")
+        self.order_index = array("q")
+        self.eta_min_walk = array("q")
+        self.eta_min_drive = array("q")
+        self.listen_sec = array("q")
+        self.route_codes = array("l")
+        self.category_codes = array("l")
+        self.source_codes = array("l")
+        self.strings: list[str] = []
+        self._codes: dict[str, int] = {}
+
+    @classmethod
+    def from_rows(cls, rows: Iterator[Mapping[str, Any]] | list[Mapping[str, Any]]) -> RoutePointBatch:
+        batch = cls()
+        for row in rows:
+            batch.append(row)
+        return batch
+
+    @classmethod
+    def from_tuples(cls, columns: tuple[str, ...], rows: Sequence[tuple]) -> RoutePointBatch:
+        """Build a batch column by column from cursor tuples.
+
+        Matches the :class:`~city_guide.app.db.mapping.Mapper` signature, so
+        it can be passed to ``Database.execute(..., mapper=...)``.
+        """
+
+        index = {column: position for position, column in enumerate(columns)}
+
+        def column(name: str) -> list[Any]:
+            return list(map(itemgetter(index[name]), rows))
+
+        batch = cls()
+        batch.ids = [str(value) for value in column("id")]
+        batch.poi_ids = column("poi_id")
+        batch.names = column("name")
+        batch.lat = array("d", column("lat"))
+        batch.lng = array("d", column("lng"))
+        batch.order_index = array("q", column("order_index"))
+        batch.eta_min_walk = array("q", map(_from_optional, column("eta_min_walk")))
+        batch.eta_min_drive = array("q", map(_from_optional, column("eta_min_drive")))
+        batch.listen_sec = array("q", map(_from_optional, column("listen_sec")))
+        batch.route_codes = array("l", map(batch._code, column("route_id")))
+        batch.category_codes = array("l", map(batch._code, column("category")))
+        batch.source_codes = array("l", map(batch._code, column("source_poi_id")))
+        return batch
+
+    def _code(self, value: Any) -> int:
+        if value is None:
+            return -1
+        value = str(value)
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+    def append(self, row: Mapping[str, Any]) -> None:
+        """Add a point from a ``route_points`` row."""
+
+        self.ids.append(str(row["id"]))
+        self.poi_ids.append(row["poi_id"])
+        self.names.append(row["name"])
+        self.lat.append(row["lat"])
+        self.lng.append(row["lng"])
+        self.order_index.append(row["order_index"])
+        self.eta_min_walk.append(_from_optional(row.get("eta_min_walk")))
+        self.eta_min_drive.append(_from_optional(row.get("eta_min_drive")))
+        self.listen_sec.append(_from_optional(row.get("listen_sec")))
+        self.route_codes.append(self._code(row["route_id"]))
+        self.category_codes.append(self._code(row["category"]))
+        self.source_codes.append(self._code(row.get("source_poi_id")))
+
+    def optional_ints(self, column: array) -> list[int | None]:
+        """Values of an integer column with NULLs restored to ``None``."""
+
+        return [None if value == _NULL_INT else value for value in column]
+
+    def decode(self, codes: array) -> list[str | None]:
+        """Values of a string-table column."""
+
+        strings = self.strings
+        return [None if code < 0 else strings[code] for code in codes]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: int) -> RoutePoint:
+        source = self.source_codes[index]
+        return RoutePoint(
+            id=uuid.UUID(self.ids[index]),
+            route_id=uuid.UUID(self.strings[self.route_codes[index]]),
+            poi_id=self.poi_ids[index],
+            name=self.names[index],
+            lat=self.lat[index],
+            lng=self.lng[index],
+            category=self.strings[self.category_codes[index]],
+            order_index=self.order_index[index],
+            eta_min_walk=_to_optional(self.eta_min_walk[index]),
+            eta_min_drive=_to_optional(self.eta_min_drive[index]),
+            listen_sec=_to_optional(self.listen_sec[index]),
+            source_poi_id=None if source < 0 else self.strings[source],
+        )
+
+    def __iter__(self) -> Iterator[RoutePoint]:
+        return (self[index] for index in range(len(self)))
+
+
+@dataclass(slots=True)
 class RouteDraft:
     id: uuid.UUID
     user_id: uuid.UUID
@@ -57,12 +211,13 @@ class RouteDraft:
     payload_json: dict[str, Any]
     created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
-    points: list[RoutePoint] = field(default_factory=list)
+    points: list[RoutePoint] | RoutePointBatch = field(default_factory=list)
 
 
 __all__ = [
     "RouteDraft",
     "RoutePoint",
+    "RoutePointBatch",
     "User",
     "UserProfile",
 ]
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import dataclasses
+import operator
+import threading
+import uuid
+from collections.abc import Callable, Sequence
+from datetime import datetime
+from typing import Any, Generic, Protocol, TypeVar
+
+T = TypeVar("T")
+T_co = TypeVar("T_co", covariant=True)
+
+
+class Mapper(Protocol[T_co]):
+    """Turns the rows of one result into objects.
+
+    ``columns`` are the result's column names and ``rows`` plain tuples in
+    that order, as the cursor returned them.
+    """
+
+    def __call__(self, columns: tuple[str, ...], rows: Sequence[tuple]) -> Sequence[T_co]: ...
+
+
+def parse_datetime(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def parse_uuid(value: Any) -> uuid.UUID:
+    if isinstance(value, uuid.UUID):
+        return value
+    return uuid.UUID(str(value))
+
+
+class _LazyField:
+    """Slot wrapper that parses a raw text value on first read and keeps the result.
+
+    Only ``str`` values are parsed, so values assigned after mapping are kept
+    as they are.
+    """
+
+    __slots__ = ("parse", "slot")
+
+    def __init__(self, slot: Any, parse: Callable[[str], Any]) -> None:
+        self.slot = slot
+        self.parse = parse
+
+    def __get__(self, instance: Any, owner: type | None = None) -> Any:
+        if instance is None:
+            return self
+        value = self.slot.__get__(instance, owner)
+        if isinstance(value, str):
+            value = self.parse(value)
+            self.slot.__set__(instance, value)
+        return value
+
+    def __set__(self, instance: Any, value: Any) -> None:
+        self.slot.__set__(instance, value)
+
+
+def _slot(target: type, name: str) -> Any:
+    descriptor = target.__dict__.get(name)
+    if descriptor is None or not hasattr(descriptor, "__set__"):
+        raise TypeError(f"{target.__name__} must be a slots dataclass to be mapped from rows")
+    return descriptor
+
+
+_lazy_classes: dict[tuple[type, tuple[tuple[str, Callable[[str], Any]], ...]], type] = {}
+_lazy_classes_lock = threading.Lock()
+
+
+def _lazy_class(target: type, parsers: tuple[tuple[str, Callable[[str], Any]], ...]) -> type:
+    """Subclass of ``target`` whose ``parsers`` fields are parsed on first read.
+
+    The entity class itself is left alone. Mappers with the same lazy fields
+    share one subclass, and its instances compare equal to ``target``
+    instances with the same field values, as the dataclass would.
+    """
+
+    key = (target, parsers)
+    with _lazy_classes_lock:
+        lazy = _lazy_classes.get(key)
+        if lazy is not None:
+            return lazy
+        compared = [item.name for item in dataclasses.fields(target) if item.compare]
+        values = operator.attrgetter(*compared) if compared else (lambda instance: ())
+
+        def __eq__(self: Any, other: Any) -> bool:
+            if other.__class__ is not self.__class__ and other.__class__ is not target:
+                return NotImplemented
+            return values(self) == values(other)
+
+        namespace: dict[str, Any] = {
+            name: _LazyField(_slot(target, name), parse) for name, parse in parsers
+        }
+        namespace.update(
+            __slots__=(),
+            __module__=target.__module__,
+            __qualname__=target.__qualname__,
+            __eq__=__eq__,
+            __hash__=target.__hash__,
+        )
+        lazy = _lazy_classes[key] = type(target.__name__, (target,), namespace)
+        return lazy
+
+
+def _base_type(annotation: Any) -> str:
+    """``'uuid.UUID | None'`` -> ``'uuid.UUID'``; annotations are strings here."""
+
+    text = annotation if isinstance(annotation, str) else getattr(annotation, "__name__", str(annotation))
+    members = [member.strip() for member in text.split("|") if member.strip() != "None"]
+    return members[0] if len(members) == 1 else text
+
+
+_LAZY_TYPES: dict[str, Callable[[Any], Any]] = {
+    "uuid.UUID": parse_uuid,
+    "UUID": parse_uuid,
+    "datetime": parse_datetime,
+}
+_EAGER_TYPES: dict[str, Callable[[Any], Any]] = {"bool": bool}
+
+
+class RowMapper(Generic[T]):
+    """Builds slots dataclass instances straight from cursor tuples.
+
+    For every distinct column list the mapper compiles a plan once: which
+    tuple index feeds which slot, with which converter, and which fields fall
+    back to their defaults. Mapping a row is then a walk over that plan with
+    no per-row dicts or name lookups.
+
+    ``UUID`` and ``datetime`` fields are stored as the text the database
+    returned and parsed on first access (``lazy=True``), so columns a caller
+    never reads are never parsed. Such rows are built as a generated subclass
+    of ``target``; ``target`` itself is never modified. ``converters``
+    override the converter of a field, e.g. to decode JSON text.
+    """
+
+    def __init__(
+        self,
+        target: type[T],
+        *,
+        converters: dict[str, Callable[[Any], Any]] | None = None,
+        lazy: bool = True,
+    ) -> None:
+        self.target = target
+        self.converters = converters or {}
+        self.lazy = lazy
+        self._plans: dict[tuple[str, ...], Callable[[tuple], T]] = {}
+        self._cls: type[T] = target
+        if lazy:
+            parsers = tuple(
+                (item.name, _LAZY_TYPES[base])
+                for item in dataclasses.fields(target)
+                if (base := _base_type(item.type)) in _LAZY_TYPES and item.name not in self.converters
+            )
+            if parsers:
+                self._cls = _lazy_class(target, parsers)
+
+    def _converter(self, item: dataclasses.Field) -> Callable[[Any], Any] | None:
+        if item.name in self.converters:
+            return self.converters[item.name]
+        base = _base_type(item.type)
+        if base in _LAZY_TYPES:
+            return None if self.lazy else _LAZY_TYPES[base]
+        return _EAGER_TYPES.get(base)
+
+    def _compile(self, columns: tuple[str, ...]) -> Callable[[tuple], T]:
+        index_of = {column: index for index, column in enumerate(columns)}
+        copied: list[tuple[Callable[[Any, Any], None], int]] = []
+        converted: list[tuple[Callable[[Any, Any], None], int, Callable[[Any], Any]]] = []
+        defaults: list[tuple[Callable[[Any, Any], None], Any]] = []
+        factories: list[tuple[Callable[[Any, Any], None], Callable[[], Any]]] = []
+        for item in dataclasses.fields(self.target):
+            assign = _slot(self.target, item.name).__set__
+            if item.name in index_of:
+                convert = self._converter(item)
+                if convert is None:
+                    copied.append((assign, index_of[item.name]))
+                else:
+                    converted.append((assign, index_of[item.name], convert))
+            elif item.default is not dataclasses.MISSING:
+                defaults.append((assign, item.default))
+            elif item.default_factory is not dataclasses.MISSING:
+                factories.append((assign, item.default_factory))
+            else:
+                raise ValueError(f"Result has no column for {self.target.__name__}.{item.name}")
+
+        new = object.__new__
+        target = self._cls
+
+        def build(row: tuple) -> T:
+            instance = new(target)
+            for assign, index in copied:
+                assign(instance, row[index])
+            for assign, index, convert in converted:
+                value = row[index]
+                assign(instance, None if value is None else convert(value))
+            for assign, value in defaults:
+                assign(instance, value)
+            for assign, factory in factories:
+                assign(instance, factory())
+            return instance
+
+        return build
+
+    def __call__(self, columns: tuple[str, ...], rows: Sequence[tuple]) -> list[T]:
+        build = self._plans.get(columns)
+        if build is None:
+            build = self._plans[columns] = self._compile(columns)
+        return [build(row) for row in rows]
@@ -105,4 +105,44 @@ class RoutePoint(Base):
 Index("ix_route_points_route_order", RoutePoint.route_id, RoutePoint.order_index)
 
 
-__all__ = ["Base", "RouteDraft", "RoutePoint", "User", "UserProfile"]
+class BackgroundJob(Base):
+    __tablename__ = "background_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind: Mapped[str] = mapped_column(String(64), nullable=False)
+    resource_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    payload_json: Mapped[dict] = mapped_column(JSONType, default=dict, nullable=False)
+    status: Mapped[str] = mapped_column(String(32), default="queued", nullable=False)
+    error: Mapped[str | None] = mapped_column(Text)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+
+Index("ix_background_jobs_resource", BackgroundJob.resource_id, BackgroundJob.created_at)
+Index("ix_background_jobs_status", BackgroundJob.status)
+
+
+class RefreshSession(Base):
+    __tablename__ = "refresh_sessions"
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False
+    )
+
+
+Index("ix_refresh_sessions_expires_at", RefreshSession.expires_at)
+Index("ix_refresh_sessions_user_id", RefreshSession.user_id)
+
+
+__all__ = ["BackgroundJob", "Base", "RefreshSession", "RouteDraft", "RoutePoint", "User", "UserProfile"]
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from collections import deque
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Protocol
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w:])-?\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace and replace inline literals with ``?``.
+
+    Statements that differ only in literal values normalize to the same text,
+    so they aggregate together. Named parameters (``:id``) are kept.
+    """
+
+    text = _STRING_LITERAL.sub("?", sql)
+    text = _NUMBER_LITERAL.sub("?", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def params_shape(params: dict[str, Any] | None) -> str:
+    """Parameter names and value types, without the values themselves."""
+
+    if not params:
+        return ""
+    return ", ".join(f"{name}:{type(value).__name__}" for name, value in sorted(params.items()))
+
+
+class _Explainer(Protocol):
+    def explain(self, sql: str, params: dict[str, Any] | None = None) -> list[str]: ...
+
+
+@dataclass
+class StatementRecord:
+    sql: str
+    params: str
+    duration: float
+    rows: int
+
+
+@dataclass
+class StatementStats:
+    sql: str
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    rows: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "sql": self.sql,
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+            "rows": self.rows,
+        }
+
+
+@dataclass
+class RequestStatements:
+    """Statements executed while handling one request."""
+
+    label: str
+    count: int = 0
+    duration: float = 0.0
+    per_statement: dict[str, int] = field(default_factory=dict)
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        return {sql: count for sql, count in self.per_statement.items() if count >= threshold}
+
+
+_request_statements: ContextVar[RequestStatements | None] = ContextVar(
+    "request_statements", default=None
+)
+
+
+class SQLProfiler:
+    """Opt-in profiling of the statements run through :class:`Database`.
+
+    Every statement is aggregated by its normalized text. Statements slower
+    than ``slow_ms`` are logged and, with ``explain_slow``, their query plan
+    is logged once per normalized statement. Within a request scope (see
+    :meth:`begin_request`) statement counts are kept per request, and a
+    statement repeated ``n_plus_one_threshold`` times is reported as a likely
+    N+1 query.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = False,
+        slow_ms: float = 200.0,
+        explain_slow: bool = True,
+        n_plus_one_threshold: int = 10,
+        history: int = 200,
+    ) -> None:
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.explain_slow = explain_slow
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._lock = threading.Lock()
+        self._stats: dict[str, StatementStats] = {}
+        self._explained: set[str] = set()
+        self.recent: deque[StatementRecord] = deque(maxlen=history)
+
+    def record(
+        self,
+        database: _Explainer,
+        sql: str,
+        params: dict[str, Any] | None,
+        duration: float,
+        rows: int,
+    ) -> None:
+        normalized = normalize_sql(sql)
+        record = StatementRecord(normalized, params_shape(params), duration, rows)
+        with self._lock:
+            stats = self._stats.get(normalized)
+            if stats is None:
+                stats = self._stats[normalized] = StatementStats(normalized)
+            stats.count += 1
+            stats.total += duration
+            stats.max = max(stats.max, duration)
+            stats.rows += max(rows, 0)
+            self.recent.append(record)
+        scope = _request_statements.get()
+        if scope is not None:
+            scope.count += 1
+            scope.duration += duration
+            scope.per_statement[normalized] = scope.per_statement.get(normalized, 0) + 1
+        if duration * 1000 >= self.slow_ms:
+            self._report_slow(database, sql, params, record)
+
+    def _report_slow(
+        self,
+        database: _Explainer,
+        sql: str,
+        params: dict[str, Any] | None,
+        record: StatementRecord,
+    ) -> None:
+        logger.warning(
+            "Slow SQL (%.1f ms, %d rows): %s [%s]",
+            record.duration * 1000,
+            record.rows,
+            record.sql,
+            record.params,
+        )
+        if not self.explain_slow or not record.sql.upper().startswith(("SELECT", "WITH")):
+            return
+        with self._lock:
+            if record.sql in self._explained:
+                return
+            self._explained.add(record.sql)
+        try:
+            plan = database.explain(sql, params)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("EXPLAIN failed for %s: %s", record.sql, exc)
+            return
+        logger.warning("Query plan for %s:\n%s", record.sql, "\n".join(plan))
+
+    def begin_request(self, label: str) -> tuple[RequestStatements, Token]:
+        scope = RequestStatements(label)
+        return scope, _request_statements.set(scope)
+
+    def end_request(self, token: Token) -> None:
+        _request_statements.reset(token)
+
+    def finish_request(self, scope: RequestStatements) -> None:
+        """Report statements that ran suspiciously often in one request."""
+
+        for sql, count in scope.repeated(self.n_plus_one_threshold).items():
+            logger.warning(
+                "Possible N+1 in %s: %d executions of %s", scope.label, count, sql
+            )
+
+    def stats(self, limit: int = 20) -> list[dict[str, Any]]:
+        """Aggregates of the statements with the highest total time."""
+
+        with self._lock:
+            ranked = sorted(self._stats.values(), key=lambda item: item.total, reverse=True)
+            return [item.to_dict() for item in ranked[:limit]]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._explained.clear()
+            self.recent.clear()
+
+
+def current_request_statements() -> RequestStatements | None:
+    return _request_statements.get()
+
+
+sql_profiler = SQLProfiler(
+    enabled=settings.sql_profile,
+    slow_ms=settings.sql_slow_ms,
+    explain_slow=settings.sql_explain_slow,
+    n_plus_one_threshold=settings.sql_n_plus_one_threshold,
+)
@@ -1,24 +1,23 @@
 from __future__ import annotations
 
+import dataclasses
 import json
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Sequence
+from typing import Any, Iterator, Sequence
 
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..core.tracing import traced
 from . import database
-from .entities import RouteDraft, RoutePoint, User, UserProfile
+from .entities import RouteDraft, RoutePoint, RoutePointBatch, User, UserProfile
+from .mapping import RowMapper, parse_datetime, parse_uuid
 
 
 def _now() -> datetime:
     return datetime.now(timezone.utc)
 
 
-def _parse_datetime(value) -> datetime:
-    if isinstance(value, datetime):
-        return value
-    return datetime.fromisoformat(str(value))
-
-
 def _parse_json(value):
     if isinstance(value, (dict, list)):
         return value
@@ -27,42 +26,50 @@ def _parse_json(value):
     return json.loads(value)
 
 
+_user_mapper = RowMapper(User)
+_profile_mapper = RowMapper(UserProfile, converters={"context": _parse_json})
+# ``points`` is no column; repositories attach a ``RoutePointBatch`` after mapping.
+_draft_mapper = RowMapper(RouteDraft, converters={"payload_json": _parse_json})
+
+# Users by id for authenticated requests. ``save_user`` invalidates its own
+# entry; other workers see a change after at most ``user_cache_ttl_seconds``.
+user_cache: TTLCache[uuid.UUID, User] = TTLCache(
+    maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl_seconds
+)
+
+
 class UserRepository:
+    @traced()
     def get_by_email(self, email: str) -> User | None:
-        row = database.execute(
+        return database.execute(
             "SELECT * FROM users WHERE email = :email",
             {"email": email.lower()},
             fetchone=True,
+            mapper=_user_mapper,
         )
-        if row is None:
-            return None
-        return self._row_to_user(row)
 
+    @traced()
     def get_by_id(self, user_id: uuid.UUID) -> User | None:
-        row = database.execute(
+        return database.execute(
             "SELECT * FROM users WHERE id = :id",
             {"id": str(user_id)},
             fetchone=True,
+            mapper=_user_mapper,
         )
-        if row is None:
-            return None
-        return self._row_to_user(row)
-
-    def _row_to_user(self, row: dict) -> User:
-        return User(
-            id=uuid.UUID(row["id"]),
-            email=row["email"],
-            password_hash=row["password_hash"],
-            first_name=row.get("first_name"),
-            last_name=row.get("last_name"),
-            phone=row.get("phone"),
-            country=row.get("country"),
-            city=row.get("city"),
-            language=row.get("language", "en"),
-            is_active=bool(row.get("is_active", True)),
-            created_at=_parse_datetime(row.get("created_at")),
-            updated_at=_parse_datetime(row.get("updated_at")),
-        )
+
+    def get_by_id_cached(self, user_id: uuid.UUID) -> User | None:
+        """:meth:`get_by_id` through :data:`user_cache`.
+
+        Callers get their own copy, so mutating it leaves the cache intact.
+        """
+
+        user = user_cache.get(user_id)
+        if user is None:
+            user = self.get_by_id(user_id)
+            if user is None:
+                return None
+            user_cache.put(user_id, user)
+        return dataclasses.replace(user)
 
     def _verify_user_persisted(self, user_id: uuid.UUID) -> None:
         row = database.execute(
@@ -73,6 +80,7 @@ class UserRepository:
         if row is None:
             raise RuntimeError("Database write verification failed for user %s" % user_id)
 
+    @traced()
     def create_user(
         self,
         *,
@@ -118,6 +126,7 @@ class UserRepository:
             raise RuntimeError("Failed to load persisted user %s" % user_id)
         return created
 
+    @traced()
     def save_user(self, user: User) -> User:
         now = _now().isoformat()
         database.execute(
@@ -147,13 +156,23 @@ class UserRepository:
                 "updated_at": now,
             },
         )
+        user_cache.invalidate(user.id)
         updated = self.get_by_id(user.id)
         if updated is None:
             raise RuntimeError("Failed to update user %s" % user.id)
         return updated
 
+    @traced()
+    def set_password_hash(self, user_id: uuid.UUID, password_hash: str) -> None:
+        database.execute(
+            "UPDATE users SET password_hash = :password_hash, updated_at = :updated_at WHERE id = :id",
+            {"id": str(user_id), "password_hash": password_hash, "updated_at": _now().isoformat()},
+        )
+        user_cache.invalidate(user_id)
+
 
 class UserProfileRepository:
+    @traced()
     def upsert_profile(self, user_id: uuid.UUID, context: dict) -> UserProfile:
         payload = json.dumps(context)
         now = _now().isoformat()
@@ -179,22 +198,29 @@ class UserProfileRepository:
             raise RuntimeError("Failed to persist profile for %s" % user_id)
         return stored
 
-    def get_profile(self, user_id: uuid.UUID) -> UserProfile | None:
+    @traced()
+    def get_updated_at(self, user_id: uuid.UUID) -> datetime | None:
+        """``updated_at`` of the user's profile, without loading its context."""
+
         row = database.execute(
-            "SELECT * FROM user_profiles WHERE user_id = :user_id",
+            "SELECT updated_at FROM user_profiles WHERE user_id = :user_id",
             {"user_id": str(user_id)},
             fetchone=True,
         )
-        if row is None:
-            return None
-        return UserProfile(
-            user_id=uuid.UUID(row["user_id"]),
-            context=_parse_json(row.get("context")),
-            updated_at=_parse_datetime(row.get("updated_at")),
+        return parse_datetime(row["updated_at"]) if row else None
+
+    @traced()
+    def get_profile(self, user_id: uuid.UUID) -> UserProfile | None:
+        return database.execute(
+            "SELECT * FROM user_profiles WHERE user_id = :user_id",
+            {"user_id": str(user_id)},
+            fetchone=True,
+            mapper=_profile_mapper,
         )
 
 
 class RouteDraftRepository:
+    @traced()
     def create_draft(
         self,
         *,
@@ -266,69 +292,75 @@ class RouteDraftRepository:
                 },
             )
 
-    def _row_to_draft(self, row: dict, points: list[RoutePoint]) -> RouteDraft:
-        return RouteDraft(
-            id=uuid.UUID(row["id"]),
-            user_id=uuid.UUID(row["user_id"]),
-            city=row["city"],
-            language=row["language"],
-            duration_min=int(row["duration_min"]),
-            transport_mode=row["transport_mode"],
-            status=row["status"],
-            payload_json=_parse_json(row.get("payload_json")),
-            created_at=_parse_datetime(row.get("created_at")),
-            updated_at=_parse_datetime(row.get("updated_at")),
-            points=points,
-        )
-
-    def _fetch_points(self, route_id: uuid.UUID) -> list[RoutePoint]:
-        rows = database.execute(
+    def _fetch_points(self, route_id: uuid.UUID) -> RoutePointBatch:
+        return database.execute(
             "SELECT * FROM route_points WHERE route_id = :route_id ORDER BY order_index",
             {"route_id": str(route_id)},
             fetchall=True,
+            mapper=RoutePointBatch.from_tuples,
         )
-        return [
-            RoutePoint(
-                id=uuid.UUID(row["id"]),
-                route_id=uuid.UUID(row["route_id"]),
-                poi_id=row["poi_id"],
-                name=row["name"],
-                lat=float(row["lat"]),
-                lng=float(row["lng"]),
-                category=row["category"],
-                order_index=int(row["order_index"]),
-                eta_min_walk=row.get("eta_min_walk"),
-                eta_min_drive=row.get("eta_min_drive"),
-                listen_sec=row.get("listen_sec"),
-                source_poi_id=row.get("source_poi_id"),
-            )
-            for row in rows
-        ]
 
+    @traced()
     def get_draft(self, route_id: uuid.UUID) -> RouteDraft | None:
-        row = database.execute(
+        draft = database.execute(
             "SELECT * FROM route_drafts WHERE id = :id",
             {"id": str(route_id)},
             fetchone=True,
+            mapper=_draft_mapper,
+        )
+        if draft is None:
+            return None
+        draft.points = self._fetch_points(route_id)
+        return draft
+
+    @traced()
+    def get_draft_version(self, route_id: uuid.UUID) -> tuple[uuid.UUID, datetime] | None:
+        """Owner and ``updated_at`` of a draft, without loading payload or points."""
+
+        row = database.execute(
+            "SELECT user_id, updated_at FROM route_drafts WHERE id = :id",
+            {"id": str(route_id)},
+            fetchone=True,
         )
         if row is None:
             return None
-        points = self._fetch_points(route_id)
-        return self._row_to_draft(row, points)
+        return parse_uuid(row["user_id"]), parse_datetime(row["updated_at"])
 
-    def list_drafts_for_user(self, user_id: uuid.UUID) -> list[RouteDraft]:
-        rows = database.execute(
+    @traced()
+    def get_list_version(self, user_id: uuid.UUID) -> tuple[int, datetime | None]:
+        """Number of the user's drafts and the latest ``updated_at`` among them."""
+
+        row = database.execute(
+            """
+            SELECT COUNT(*) AS total, MAX(updated_at) AS last_updated
+            FROM route_drafts WHERE user_id = :user_id
+            """,
+            {"user_id": str(user_id)},
+            fetchone=True,
+        ) or {}
+        last_updated = row.get("last_updated")
+        return int(row.get("total") or 0), parse_datetime(last_updated) if last_updated else None
+
+    def iter_drafts_for_user(self, user_id: uuid.UUID) -> Iterator[RouteDraft]:
+        """Yield the user's drafts one at a time from a database cursor."""
+
+        drafts = database.iterate(
             "SELECT * FROM route_drafts WHERE user_id = :user_id ORDER BY created_at DESC",
             {"user_id": str(user_id)},
-            fetchall=True,
+            mapper=_draft_mapper,
         )
-        drafts: list[RouteDraft] = []
-        for row in rows:
-            route_id = uuid.UUID(row["id"])
-            points = self._fetch_points(route_id)
-            drafts.append(self._row_to_draft(row, points))
-        return drafts
+        try:
+            for draft in drafts:
+                draft.points = self._fetch_points(draft.id)
+                yield draft
+        finally:
+            drafts.close()
+
+    @traced()
+    def list_drafts_for_user(self, user_id: uuid.UUID) -> list[RouteDraft]:
+        return list(self.iter_drafts_for_user(user_id))
 
+    @traced()
     def update_draft(
         self,
         route_id: uuid.UUID,
@@ -370,6 +402,7 @@ class RouteDraftRepository:
         )
         return self.get_draft(route_id)
 
+    @traced()
     def replace_points(self, route_id: uuid.UUID, points: Sequence[dict]) -> None:
         database.execute(
             "DELETE FROM route_points WHERE route_id = :route_id",
@@ -378,5 +411,6 @@ class RouteDraftRepository:
         if points:
             self._insert_points(route_id, points)
 
+    @traced()
     def list_points(self, route_id: uuid.UUID) -> list[RoutePoint]:
-        return self._fetch_points(route_id)
+        return list(self._fetch_points(route_id))
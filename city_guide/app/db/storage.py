@@ -1,19 +1,37 @@
 from __future__ import annotations
 
+import contextlib
 import os
 import re
 import sqlite3
+import time
+import uuid
 from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 from urllib.parse import urlparse
 
 from ..core.config import settings
+from ..core.metrics import db_statement_duration
+from .connections import ConnectionPool, PooledConnection, StatementCache
+from .mapping import Mapper
+from .profiler import sql_profiler
 
 _PARAM_PATTERN = re.compile(r":([a-zA-Z_][a-zA-Z0-9_]*)")
 _BASE_DIR = Path(__file__).resolve().parents[2]
 
 
+@lru_cache(maxsize=512)
+def _statement_kind(sql: str) -> str:
+    words = sql.split(None, 1)
+    return words[0].upper() if words else "UNKNOWN"
+
+
+def _columns(cursor) -> tuple[str, ...]:
+    return tuple(column[0] for column in cursor.description)
+
+
 class Database:
     def __init__(self, url: str, testing: bool) -> None:
         self._url = url
@@ -21,6 +39,9 @@ class Database:
         self._parsed = urlparse(url)
         self._is_sqlite = self._parsed.scheme.startswith("sqlite")
         self._postgres_driver: Any | None = None
+        self._server_prepare: bool | None = None
+        self.statements = StatementCache(self._rewrite_sql)
+        self._pool = ConnectionPool(self._connect, settings.db_pool_size)
         if self._is_sqlite and self._parsed.path and self._parsed.path != ":memory:":
             self._ensure_sqlite_path()
 
@@ -59,17 +80,36 @@ class Database:
                 continue
         raise RuntimeError("psycopg or psycopg2 must be installed to use PostgreSQL")
 
-    def _prepare_sql(self, sql: str) -> str:
+    def _rewrite_sql(self, sql: str) -> str:
         if self._is_sqlite:
             return sql
         return _PARAM_PATTERN.sub(lambda match: f"%({match.group(1)})s", sql)
 
+    def _prepare_sql(self, sql: str) -> str:
+        return self.statements.prepare(sql)
+
+    def _prepares_server_side(self) -> bool:
+        """Whether statements are prepared on the server (psycopg 3 only)."""
+
+        if self._server_prepare is None:
+            self._server_prepare = bool(
+                settings.db_prepare_statements
+                and not self._is_sqlite
+                and self._load_postgres_driver().__name__ == "psycopg"
+            )
+        return self._server_prepare
+
+    def _connect(self):
+        return self._connect_sqlite() if self._is_sqlite else self._connect_postgres()
+
     def _connect_sqlite(self):
         path = self._sqlite_path()
+        # Pooled connections keep their compiled statements between requests.
+        cached = settings.sqlite_cached_statements
         if str(path) == ":memory:":
-            conn = sqlite3.connect(":memory:", check_same_thread=False)
+            conn = sqlite3.connect(":memory:", check_same_thread=False, cached_statements=cached)
         else:
-            conn = sqlite3.connect(path, check_same_thread=False)
+            conn = sqlite3.connect(path, check_same_thread=False, cached_statements=cached)
         conn.row_factory = sqlite3.Row
         return conn
 
@@ -87,36 +127,175 @@ class Database:
             return connection.cursor()
         return connection.cursor(cursor_factory=driver.extras.RealDictCursor)
 
+    def _tuple_cursor(self, connection):
+        """A cursor returning plain tuples, for results handed to a mapper."""
+
+        if self._is_sqlite:
+            cursor = connection.cursor()
+            cursor.row_factory = None
+            return cursor
+        driver = self._load_postgres_driver()
+        if driver.__name__ == "psycopg":
+            return connection.cursor(row_factory=driver.rows.tuple_row)
+        return connection.cursor()
+
+    def _server_cursor(self, connection, batch_size: int, *, tuples: bool = False):
+        if self._is_sqlite:
+            # SQLite steps through the result set lazily on ``fetchmany``.
+            cursor = connection.cursor()
+            if tuples:
+                cursor.row_factory = None
+            return cursor
+        driver = self._load_postgres_driver()
+        name = f"stream_{uuid.uuid4().hex}"
+        if driver.__name__ == "psycopg":
+            if tuples:
+                cursor = connection.cursor(name=name, row_factory=driver.rows.tuple_row)
+            else:
+                cursor = connection.cursor(name=name)
+        elif tuples:
+            cursor = connection.cursor(name=name)
+        else:
+            cursor = connection.cursor(name=name, cursor_factory=driver.extras.RealDictCursor)
+        cursor.itersize = batch_size
+        return cursor
+
     @contextmanager
-    def _cursor(self):
-        connection = self._connect_sqlite() if self._is_sqlite else self._connect_postgres()
-        cursor = self._cursor_factory(connection)
+    def _cursor(self, *, tuples: bool = False) -> Iterator[tuple[Any, PooledConnection]]:
+        pooled = self._pool.acquire()
+        connection = pooled.connection
+        cursor = self._tuple_cursor(connection) if tuples else self._cursor_factory(connection)
+        reusable = False
         try:
-            yield cursor
+            yield cursor, pooled
             connection.commit()
+            reusable = True
         except Exception:
-            connection.rollback()
+            with contextlib.suppress(Exception):
+                connection.rollback()
+                reusable = True
             raise
         finally:
             cursor.close()
-            connection.close()
+            if reusable:
+                self._pool.release(pooled)
+            else:
+                pooled.close()
+
+    def _run(self, cursor, pooled: PooledConnection, sql: str, params: dict[str, Any] | None) -> None:
+        prepared = self._prepare_sql(sql)
+        self.statements.record(pooled, sql)
+        if self._prepares_server_side():
+            cursor.execute(prepared, params or {}, prepare=True)
+        else:
+            cursor.execute(prepared, params or {})
+
+    def execute(
+        self,
+        sql: str,
+        params: dict[str, Any] | None = None,
+        *,
+        fetchone: bool = False,
+        fetchall: bool = False,
+        mapper: Mapper[Any] | None = None,
+    ):
+        """Run ``sql``; fetched rows come back as dicts, or as ``mapper`` builds them.
+
+        With a mapper the cursor returns plain tuples and ``mapper`` turns
+        them into objects directly, skipping the per-row dict.
+        """
+
+        started = time.perf_counter()
+        row_count = -1
+        try:
+            with self._cursor(tuples=mapper is not None) as (cursor, pooled):
+                self._run(cursor, pooled, sql, params)
+                if fetchone:
+                    row = cursor.fetchone()
+                    row_count = int(row is not None)
+                    if row is None:
+                        return None
+                    return mapper(_columns(cursor), [row])[0] if mapper else dict(row)
+                if fetchall:
+                    rows = cursor.fetchall()
+                    row_count = len(rows)
+                    return mapper(_columns(cursor), rows) if mapper else [dict(row) for row in rows]
+                row_count = cursor.rowcount
+                return row_count
+        finally:
+            elapsed = time.perf_counter() - started
+            db_statement_duration.labels(_statement_kind(sql)).observe(elapsed)
+            if sql_profiler.enabled:
+                sql_profiler.record(self, sql, params, elapsed, row_count)
+
+    def explain(self, sql: str, params: dict[str, Any] | None = None) -> list[str]:
+        """Query plan of ``sql`` as text lines (``EXPLAIN QUERY PLAN`` on SQLite)."""
+
+        prefix = "EXPLAIN QUERY PLAN " if self._is_sqlite else "EXPLAIN "
+        with self._cursor() as (cursor, _):
+            cursor.execute(prefix + self._prepare_sql(sql), params or {})
+            rows = [dict(row) for row in cursor.fetchall()]
+        if self._is_sqlite:
+            return [row["detail"] for row in rows]
+        return [str(next(iter(row.values()))) for row in rows]
+
+    def iterate(
+        self,
+        sql: str,
+        params: dict[str, Any] | None = None,
+        *,
+        batch_size: int = 100,
+        mapper: Mapper[Any] | None = None,
+    ) -> Iterator[Any]:
+        """Yield rows one at a time without materializing the whole result.
+
+        PostgreSQL uses a named (server-side) cursor that fetches ``batch_size``
+        rows per round trip. The connection stays open until the generator is
+        exhausted or closed. Rows are dicts unless a ``mapper`` builds them.
+        """
 
-    def execute(self, sql: str, params: dict[str, Any] | None = None, *, fetchone: bool = False, fetchall: bool = False):
         prepared = self._prepare_sql(sql)
-        with self._cursor() as cursor:
+        pooled = self._pool.acquire()
+        connection = pooled.connection
+        cursor = self._server_cursor(connection, batch_size, tuples=mapper is not None)
+        try:
+            # Only the query itself is timed; reading rows is paced by the consumer.
+            started = time.perf_counter()
+            self.statements.record(pooled, sql)
             cursor.execute(prepared, params or {})
-            if fetchone:
-                row = cursor.fetchone()
-                return dict(row) if row is not None else None
-            if fetchall:
-                rows = cursor.fetchall()
-                return [dict(row) for row in rows]
-            return cursor.rowcount
+            elapsed = time.perf_counter() - started
+            db_statement_duration.labels(_statement_kind(sql)).observe(elapsed)
+            if sql_profiler.enabled:
+                sql_profiler.record(self, sql, params, elapsed, -1)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                if mapper is not None:
+                    yield from mapper(_columns(cursor), rows)
+                    continue
+                for row in rows:
+                    yield dict(row)
+        finally:
+            cursor.close()
+            reusable = False
+            # Ends the transaction a server-side cursor reads in.
+            with contextlib.suppress(Exception):
+                connection.rollback()
+                reusable = True
+            if reusable:
+                self._pool.release(pooled)
+            else:
+                pooled.close()
 
     def reset(self) -> None:
         if not (self._testing and self._is_sqlite):
             return
+        # Pooled connections would re-prepare every statement against the new tables.
+        self._pool.clear()
         statements = [
+            "DROP TABLE IF EXISTS refresh_sessions",
+            "DROP TABLE IF EXISTS background_jobs",
             "DROP TABLE IF EXISTS route_points",
             "DROP TABLE IF EXISTS route_drafts",
             "DROP TABLE IF EXISTS user_profiles",
@@ -128,6 +307,12 @@ class Database:
             "CREATE INDEX IF NOT EXISTS ix_route_drafts_user_id ON route_drafts(user_id)",
             "CREATE TABLE IF NOT EXISTS route_points (\n                id TEXT PRIMARY KEY,\n                route_id TEXT NOT NULL,\n                poi_id TEXT NOT NULL,\n                name TEXT NOT NULL,\n                lat REAL NOT NULL,\n                lng REAL NOT NULL,\n                category TEXT NOT NULL,\n                order_index INTEGER NOT NULL,\n                eta_min_walk INTEGER,\n                eta_min_drive INTEGER,\n                listen_sec INTEGER,\n                source_poi_id TEXT\n            )",
             "CREATE INDEX IF NOT EXISTS ix_route_points_route_order ON route_points(route_id, order_index)",
+            "CREATE TABLE IF NOT EXISTS background_jobs (\n                id TEXT PRIMARY KEY,\n                kind TEXT NOT NULL,\n                resource_id TEXT NOT NULL,\n                payload_json TEXT NOT NULL,\n                status TEXT NOT NULL,\n                error TEXT,\n                attempts INTEGER NOT NULL DEFAULT 0,\n                created_at TEXT NOT NULL,\n                updated_at TEXT NOT NULL\n            )",
+            "CREATE INDEX IF NOT EXISTS ix_background_jobs_resource ON background_jobs(resource_id, created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_background_jobs_status ON background_jobs(status)",
+            "CREATE TABLE IF NOT EXISTS refresh_sessions (\n                id TEXT PRIMARY KEY,\n                user_id TEXT NOT NULL,\n                expires_at TEXT NOT NULL,\n                created_at TEXT NOT NULL\n            )",
+            "CREATE INDEX IF NOT EXISTS ix_refresh_sessions_expires_at ON refresh_sessions(expires_at)",
+            "CREATE INDEX IF NOT EXISTS ix_refresh_sessions_user_id ON refresh_sessions(user_id)",
         ]
         connection = self._connect_sqlite()
         try:
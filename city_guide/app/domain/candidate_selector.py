@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from typing import Any
+
+from .geo import estimate_travel_minutes, haversine_distance_km
+
+DEFAULT_VISIT_MINUTES = 20
+
+
+class IncrementalSelector:
+    """Accumulate validated POI candidates as they stream in.
+
+    Every distinct candidate (by ``poi_id``) is kept for the final selection.
+    Candidates whose ``priority`` reaches ``min_priority`` are additionally
+    chained into a tentative route, in arrival order, as long as travel plus
+    ``visit_minutes`` per stop fits into ``duration_min``. Once ``target`` of
+    them fit the selector is :attr:`satisfied` and the producer stages can be
+    stopped early. :meth:`ranked` puts that tentative route first, so the
+    final selection starts from the POIs that justified stopping.
+    """
+
+    def __init__(
+        self,
+        *,
+        target: int,
+        duration_min: int,
+        transport_mode: str = "walking",
+        start: tuple[float, float] | None = None,
+        min_priority: float = 0.7,
+        visit_minutes: int = DEFAULT_VISIT_MINUTES,
+    ) -> None:
+        self.target = target
+        self.duration_min = duration_min
+        self.transport_mode = transport_mode
+        self.min_priority = min_priority
+        self.visit_minutes = visit_minutes
+        self._position = start
+        self._route_minutes = 0.0
+        self._seen: set[Any] = set()
+        self._candidates: list[dict[str, Any]] = []
+        self._picks: list[dict[str, Any]] = []
+
+    @property
+    def candidates(self) -> list[dict[str, Any]]:
+        return list(self._candidates)
+
+    @property
+    def picks(self) -> list[dict[str, Any]]:
+        """High-priority candidates chained into the tentative route, in route order."""
+
+        return list(self._picks)
+
+    @property
+    def satisfied(self) -> bool:
+        return self.target > 0 and len(self._picks) >= self.target
+
+    def ranked(self) -> list[dict[str, Any]]:
+        """Picks first, then the other candidates by descending priority.
+
+        Ties keep arrival order; candidates without a priority go last.
+        """
+
+        picked = {id(candidate) for candidate in self._picks}
+        rest = [candidate for candidate in self._candidates if id(candidate) not in picked]
+        rest.sort(key=lambda candidate: -(candidate.get("priority") or 0.0))
+        return self.picks + rest
+
+    def offer(self, candidate: dict[str, Any]) -> bool:
+        """Record ``candidate``; return ``False`` if it duplicates a known POI."""
+
+        key = candidate.get("poi_id")
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        self._candidates.append(candidate)
+
+        priority = candidate.get("priority")
+        if priority is None or priority < self.min_priority:
+            return True
+        lat = candidate.get("lat")
+        lng = candidate.get("lng")
+        if lat is None or lng is None:
+            return True
+        leg = 0.0
+        if self._position is not None:
+            distance = haversine_distance_km(self._position[0], self._position[1], lat, lng)
+            leg = estimate_travel_minutes(distance, self.transport_mode)
+        total = self._route_minutes + leg + self.visit_minutes
+        if total <= self.duration_min:
+            self._route_minutes = total
+            self._position = (lat, lng)
+            self._picks.append(candidate)
+        return True
@@ -2,11 +2,19 @@ from __future__ import annotations
 
 import json
 import asyncio
+import hashlib
+import contextvars
 import inspect
-from dataclasses import dataclass
-from typing import Any, Callable, Dict, List
+import threading
+import functools
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Iterable, List
 from urllib.parse import parse_qs
 
+from . import compression
+
 
 @dataclass
 class Request:
@@ -16,6 +24,8 @@ class Request:
     params: Dict[str, str]
     json: Any
     path_params: Dict[str, str]
+    state: Dict[str, Any] = field(default_factory=dict)
+    client: str | None = None
 
 
 @dataclass
@@ -28,10 +38,195 @@ class Response:
         return self.body
 
 
+class StreamingResponse(Response):
+    """Response whose body is sent chunk by chunk.
+
+    ``content`` is an async iterable or a plain iterable of ``bytes``/``str``
+    chunks. Plain iterables usually do blocking work (e.g. reading a database
+    cursor), so they are advanced in a worker thread, within the context the
+    response was created in (request id, tracing and profiling scopes).
+    Callbacks registered with :meth:`call_on_close` run once the body is done.
+    """
+
+    def __init__(
+        self,
+        content: AsyncIterable[bytes] | Iterable[bytes],
+        status_code: int = 200,
+        headers: Dict[str, str] | None = None,
+        media_type: str | None = None,
+    ) -> None:
+        merged = {k.lower(): v for k, v in (headers or {}).items()}
+        if media_type:
+            merged.setdefault("content-type", media_type)
+        super().__init__(status_code, content, merged)
+        self.context = contextvars.copy_context()
+        self._on_close: List[Callable[[], Any]] = []
+
+    def call_on_close(self, callback: Callable[[], Any]) -> None:
+        self._on_close.append(callback)
+
+    def chunks(self) -> AsyncIterator[bytes]:
+        if hasattr(self.body, "__aiter__"):
+            chunks = _encode_chunks(self.body)
+        else:
+            chunks = _iterate_in_thread(self.body, self.context)
+        if self._on_close:
+            return _closing(chunks, self._on_close)
+        return chunks
+
+
+async def _closing(chunks: AsyncIterator[bytes], callbacks: List[Callable[[], Any]]) -> AsyncIterator[bytes]:
+    try:
+        async for chunk in chunks:
+            yield chunk
+    finally:
+        await chunks.aclose()
+        for callback in callbacks:
+            callback()
+
+
+async def _encode_chunks(content: AsyncIterable[bytes | str]) -> AsyncIterator[bytes]:
+    iterator = content.__aiter__()
+    try:
+        async for chunk in iterator:
+            yield chunk.encode() if isinstance(chunk, str) else chunk
+    finally:
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+_EXHAUSTED = object()
+
+
+async def _iterate_in_thread(
+    content: Iterable[bytes | str], context: contextvars.Context | None = None
+) -> AsyncIterator[bytes]:
+    iterator = iter(content)
+    context = context or contextvars.copy_context()
+    # A cancelled ``to_thread`` keeps running; the lock makes ``close`` wait
+    # for it instead of failing on a generator that is still executing. It
+    # also keeps ``context`` from being entered by two threads at once.
+    lock = threading.Lock()
+
+    def step() -> Any:
+        with lock:
+            return context.run(next, iterator, _EXHAUSTED)
+
+    def close() -> None:
+        with lock:
+            closer = getattr(iterator, "close", None)
+            if closer is not None:
+                context.run(closer)
+
+    try:
+        while True:
+            chunk = await asyncio.to_thread(step)
+            if chunk is _EXHAUSTED:
+                return
+            yield chunk.encode() if isinstance(chunk, str) else chunk
+    finally:
+        # Releases whatever the generator holds open (cursors, files).
+        await asyncio.to_thread(close)
+
+
+def _json_array_chunks(
+    items: Iterable[Any], serialize: Callable[[Any], Any] | None
+) -> Iterable[bytes]:
+    try:
+        yield b"["
+        for idx, item in enumerate(items):
+            if serialize is not None:
+                item = serialize(item)
+            yield (b"," if idx else b"") + json.dumps(item).encode()
+        yield b"]"
+    finally:
+        close = getattr(items, "close", None)
+        if close is not None:
+            close()
+
+
 def json_response(body: Any, status_code: int = 200, headers: Dict[str, str] | None = None) -> Response:
     return Response(status_code, body, headers)
 
 
+def json_stream_response(
+    items: Iterable[Any],
+    status_code: int = 200,
+    headers: Dict[str, str] | None = None,
+    *,
+    serialize: Callable[[Any], Any] | None = None,
+) -> StreamingResponse:
+    """Stream ``items`` as a JSON array, serializing one element at a time.
+
+    ``items`` is closed when streaming stops, so generators holding a
+    database cursor release it even if the client disconnects midway.
+    """
+
+    return StreamingResponse(
+        _json_array_chunks(items, serialize), status_code, headers, media_type="application/json"
+    )
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over the string form of ``parts`` (e.g. id and ``updated_at``)."""
+
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def cache_validators(etag: str | None = None, last_modified: datetime | None = None) -> Dict[str, str]:
+    headers: Dict[str, str] = {}
+    if etag:
+        headers["etag"] = etag
+    if last_modified is not None:
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        headers["last-modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison: ``W/"x"`` matches ``"x"``.
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def not_modified(
+    request: Request, etag: str | None = None, last_modified: datetime | None = None
+) -> Response | None:
+    """Return a ``304`` response if the client's cached copy is still current.
+
+    Handlers call this with validators read cheaply from the database before
+    building the body. ``If-None-Match`` takes precedence over
+    ``If-Modified-Since``, as in RFC 9110.
+    """
+
+    if request.method not in ("GET", "HEAD"):
+        return None
+    validators = cache_validators(etag, last_modified)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag and _etag_matches(if_none_match, etag):
+            return Response(304, None, validators)
+        return None
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return None
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        if last_modified.replace(microsecond=0) <= since:
+            return Response(304, None, validators)
+    return None
+
+
 class HTTPException(Exception):
     def __init__(self, status_code: int, detail: str) -> None:
         super().__init__(detail)
@@ -54,6 +249,47 @@ class Application:
         self.routes: List[Route] = []
         self.openapi_paths: dict[str, dict[str, Any]] = {}
         self.components: dict[str, Any] = {}
+        self.startup_handlers: List[Callable[[], Any]] = []
+        self.shutdown_handlers: List[Callable[[], Any]] = []
+        self.compression: dict[str, int] | None = None
+        self.middleware: List[Callable[..., Awaitable[Response]]] = []
+        self._entry: Callable[[Request], Awaitable[Response]] = self._dispatch
+
+    def add_middleware(self, middleware: Callable[..., Awaitable[Response]]) -> None:
+        """Append ``middleware`` (see :mod:`app.middleware`) to the chain.
+
+        The first middleware added is the outermost. The chain is composed
+        once here, so a request costs one call per middleware and nothing
+        when there is none.
+        """
+
+        self.middleware.append(middleware)
+        entry: Callable[[Request], Awaitable[Response]] = self._dispatch
+        for layer in reversed(self.middleware):
+            entry = functools.partial(layer, call_next=entry)
+        self._entry = entry
+
+    def enable_compression(
+        self,
+        *,
+        min_size: int = 1024,
+        offload_size: int = 64 * 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+    ) -> None:
+        """Compress responses for clients that accept gzip (or brotli, if installed).
+
+        Bodies smaller than ``min_size`` are sent as is; compressing bodies or
+        chunks of ``offload_size`` bytes and more runs in a worker thread.
+        Streaming responses are compressed chunk by chunk.
+        """
+
+        self.compression = {
+            "min_size": min_size,
+            "offload_size": offload_size,
+            "gzip_level": gzip_level,
+            "brotli_quality": brotli_quality,
+        }
 
     def _compile(self, path: str) -> List[str]:
         return [segment for segment in path.strip("/").split("/") if segment]
@@ -86,6 +322,20 @@ class Application:
     def set_components(self, components: dict[str, Any]) -> None:
         self.components = components
 
+    def add_event_handler(self, event: str, handler: Callable[[], Any]) -> None:
+        if event == "startup":
+            self.startup_handlers.append(handler)
+        elif event == "shutdown":
+            self.shutdown_handlers.append(handler)
+        else:
+            raise ValueError(f"Unknown event {event!r}")
+
+    async def _run_handlers(self, handlers: List[Callable[[], Any]]) -> None:
+        for handler in handlers:
+            result = handler()
+            if inspect.isawaitable(result):
+                await result
+
     async def __call__(self, scope: dict[str, Any], receive: Callable[..., Any], send: Callable[..., Any]) -> None:
         if scope["type"] == "lifespan":
             await self._handle_lifespan(receive, send)
@@ -110,37 +360,78 @@ class Application:
                 json_body = json.loads(body.decode())
             except json.JSONDecodeError:
                 json_body = body.decode()
+        client = scope.get("client")
         response = await self.handle_request(
             scope.get("method", "GET"),
             scope.get("path", "/"),
             json_body=json_body,
             headers=headers,
             params=params,
+            client=client[0] if client else None,
         )
-        await self._send_response(send, response)
+        await self._send_response(send, response, receive, headers.get("accept-encoding"))
 
     async def _handle_lifespan(self, receive: Callable[..., Any], send: Callable[..., Any]) -> None:
         while True:
             message = await receive()
             if message["type"] == "lifespan.startup":
+                try:
+                    await self._run_handlers(self.startup_handlers)
+                except Exception as exc:  # noqa: BLE001
+                    await send({"type": "lifespan.startup.failed", "message": str(exc)})
+                    return
                 await send({"type": "lifespan.startup.complete"})
             elif message["type"] == "lifespan.shutdown":
+                await self._run_handlers(self.shutdown_handlers)
                 await send({"type": "lifespan.shutdown.complete"})
                 return
 
-    def _add_cors_headers(self, headers: Dict[str, str] | None = None) -> Dict[str, str]:
-        base = {
-            "access-control-allow-origin": "*",
-            "access-control-allow-headers": "authorization, content-type",
-            "access-control-allow-methods": "GET, POST, PUT, OPTIONS",
-        }
-        if not headers:
-            return base
-        lower = {k.lower(): v for k, v in headers.items()}
-        return {**base, **lower}
-
-    async def _send_response(self, send: Callable[..., Any], response: Response) -> None:
-        headers = self._add_cors_headers(response.headers)
+    def _content_encoding(
+        self, status_code: int, headers: Dict[str, str], accept_encoding: str | None
+    ) -> str | None:
+        """Negotiate the coding for a response and add ``Vary`` when it may differ."""
+
+        if self.compression is None or status_code in (204, 304) or status_code < 200:
+            return None
+        if "content-encoding" in headers or not compression.is_compressible(headers.get("content-type")):
+            return None
+        vary = headers.get("vary")
+        if not vary:
+            headers["vary"] = "accept-encoding"
+        elif "accept-encoding" not in vary.lower():
+            headers["vary"] = f"{vary}, accept-encoding"
+        return compression.negotiate(accept_encoding)
+
+    async def _send_response(
+        self,
+        send: Callable[..., Any],
+        response: Response,
+        receive: Callable[..., Any] | None = None,
+        accept_encoding: str | None = None,
+    ) -> None:
+        headers = {k.lower(): v for k, v in (response.headers or {}).items()}
+        if isinstance(response, StreamingResponse):
+            chunks = response.chunks()
+            encoding = self._content_encoding(response.status_code, headers, accept_encoding)
+            if encoding is not None:
+                options = self.compression or {}
+                chunks = compression.compress_stream(
+                    chunks,
+                    encoding,
+                    offload_size=options["offload_size"],
+                    gzip_level=options["gzip_level"],
+                    brotli_quality=options["brotli_quality"],
+                )
+                headers["content-encoding"] = encoding
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": response.status_code,
+                    "headers": [(k.encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()],
+                }
+            )
+            await self._stream_body(send, receive, chunks)
+            return
         body = response.body
         if isinstance(body, (dict, list)):
             body_bytes = json.dumps(body).encode()
@@ -152,6 +443,17 @@ class Application:
             body_bytes = b""
         else:
             body_bytes = str(body).encode()
+        encoding = self._content_encoding(response.status_code, headers, accept_encoding)
+        options = self.compression or {}
+        if encoding is not None and len(body_bytes) >= options["min_size"]:
+            body_bytes = await compression.compress_async(
+                body_bytes,
+                encoding,
+                offload_size=options["offload_size"],
+                gzip_level=options["gzip_level"],
+                brotli_quality=options["brotli_quality"],
+            )
+            headers["content-encoding"] = encoding
         await send(
             {
                 "type": "http.response.start",
@@ -161,6 +463,43 @@ class Application:
         )
         await send({"type": "http.response.body", "body": body_bytes})
 
+    async def _stream_body(
+        self,
+        send: Callable[..., Any],
+        receive: Callable[..., Any] | None,
+        content: AsyncIterable[bytes],
+    ) -> None:
+        async def _wait_disconnect() -> None:
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    return
+
+        iterator = content.__aiter__()
+        watcher = asyncio.ensure_future(_wait_disconnect()) if receive is not None else None
+        try:
+            while True:
+                next_chunk = asyncio.ensure_future(iterator.__anext__())
+                if watcher is not None:
+                    await asyncio.wait({next_chunk, watcher}, return_when=asyncio.FIRST_COMPLETED)
+                    if watcher.done():
+                        # Client went away: stop producing instead of streaming into the void.
+                        next_chunk.cancel()
+                        await asyncio.gather(next_chunk, return_exceptions=True)
+                        return
+                try:
+                    chunk = await next_chunk
+                except StopAsyncIteration:
+                    break
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
     def match(self, method: str, path: str) -> tuple[Route, dict[str, str]]:
         method = method.upper()
         incoming = [segment for segment in path.strip("/").split("/") if segment]
@@ -189,25 +528,32 @@ class Application:
         json_body: Any = None,
         headers: Dict[str, str] | None = None,
         params: Dict[str, str] | None = None,
+        client: str | None = None,
     ) -> Response:
         headers = {k: v for k, v in (headers or {}).items()}
         params = {k: str(v) for k, v in (params or {}).items()}
-        if method.upper() == "OPTIONS":
-            return Response(204, None)
+        request = Request(method, path, headers, params, json_body, {}, client=client)
+        return await self._entry(request)
 
+    async def _dispatch(self, request: Request) -> Response:
         try:
-            route, path_params = self.match(method, path)
+            route, request.path_params = self.match(request.method, request.path)
         except HTTPException as exc:
             # Возвращаем корректный ответ (например, 404) вместо падения uvicorn
             # при обращении к неизвестным путям.
             return Response(exc.status_code, {"detail": exc.detail})
-        request = Request(method, path, headers, params, json_body, path_params)
+        request.state["route"] = route.path
         try:
             response = route.handler(request)
             if inspect.isawaitable(response):
                 response = await response
         except HTTPException as exc:  # pragma: no cover - exercised indirectly
             return Response(exc.status_code, {"detail": exc.detail})
+        if response.status_code == 200 and response.headers and "etag" in response.headers:
+            # Handlers that did not short-circuit still avoid resending the body.
+            cached = not_modified(request, response.headers["etag"])
+            if cached is not None:
+                return cached
         return response
 
     def openapi(self) -> dict[str, Any]:
@@ -220,6 +566,8 @@ class Application:
 
 
 class TestClient:
+    __test__ = False  # not a pytest test class
+
     def __init__(self, app: Application):
         self.app = app
 
@@ -242,8 +590,17 @@ class TestClient:
             )
         )
         response.headers = response.headers or {}
+        if isinstance(response, StreamingResponse):
+            response = asyncio.run(self._consume(response))
         return response
 
+    async def _consume(self, response: StreamingResponse) -> Response:
+        chunks = [chunk async for chunk in response.chunks()]
+        body: Any = b"".join(chunks)
+        if response.headers.get("content-type", "").startswith("application/json"):
+            body = json.loads(body.decode())
+        return Response(response.status_code, body, response.headers)
+
     def get(self, url: str, **kwargs: Any) -> Response:
         return self.request("GET", url, **kwargs)
 
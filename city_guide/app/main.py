@@ -1,11 +1,55 @@
 from __future__ import annotations
 
 from .http import Application, Request, json_response
-from .api.v1 import auth, health, places, poi, profile, prompts, quiz, routes
+from .db.profiler import sql_profiler
+from .middleware import (
+    CORSMiddleware,
+    ErrorMiddleware,
+    ProfilingMiddleware,
+    RateLimitMiddleware,
+    RequestIDMiddleware,
+    SQLProfilerMiddleware,
+    TimingMiddleware,
+)
+from .api.v1 import admin, auth, health, metrics, places, poi, profile, prompts, quiz, routes
+from .core.metrics import observe_request
+from .core.config import settings
+from .core.passwords import password_hasher
+from .core.ratelimit import email_limiter, ip_limiter, parse_routes
+from .core.security import InvalidToken
+from .core.sessions import session_purger
+from .services.jobs import job_queue
 
 app = Application()
+app.add_middleware(RequestIDMiddleware())
+app.add_middleware(ProfilingMiddleware())
+app.add_middleware(TimingMiddleware(on_timing=observe_request))
+app.add_middleware(CORSMiddleware())
+app.add_middleware(ErrorMiddleware({InvalidToken: 401}))
+# Inside ErrorMiddleware, so a failing limiter is answered like any other error.
+if settings.rate_limit_enabled:
+    app.add_middleware(
+        RateLimitMiddleware(
+            parse_routes(settings.rate_limit_routes),
+            ip_limiter=ip_limiter,
+            email_limiter=email_limiter,
+            trust_forwarded=settings.rate_limit_trust_forwarded,
+        )
+    )
+if sql_profiler.enabled:
+    app.add_middleware(SQLProfilerMiddleware())
+if settings.compression_enabled:
+    app.enable_compression(
+        min_size=settings.compression_min_size,
+        offload_size=settings.compression_offload_size,
+    )
+app.add_event_handler("startup", job_queue.start)
+app.add_event_handler("startup", session_purger.start)
+app.add_event_handler("shutdown", job_queue.shutdown)
+app.add_event_handler("shutdown", session_purger.stop)
+app.add_event_handler("shutdown", password_hasher.shutdown)
 
-for module in (health, auth, quiz, profile, prompts, routes, poi, places):
+for module in (health, metrics, admin, auth, quiz, profile, prompts, routes, poi, places):
     module.register_routes(app)
 
 OPENAPI_COMPONENTS = {
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import logging
+import math
+import os
+import re
+import time
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Iterable
+
+from .core.metrics import rate_limited_requests
+from .core.profiling import request_profiler
+from .core.ratelimit import Limiter
+from .db.profiler import sql_profiler
+from .http import HTTPException, Request, Response, StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+CallNext = Callable[[Request], Awaitable[Response]]
+Middleware = Callable[[Request, CallNext], Awaitable[Response]]
+"""An async callable ``(request, call_next) -> Response``.
+
+Middleware may short-circuit by returning a response without awaiting
+``call_next`` and may change the request before, or the response after, it.
+"""
+
+_request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+
+def current_request_id() -> str | None:
+    """Id of the request being handled, set by :class:`RequestIDMiddleware`."""
+
+    return _request_id.get()
+
+
+class CORSMiddleware:
+    def __init__(
+        self,
+        *,
+        allow_origins: Iterable[str] = ("*",),
+        allow_headers: Iterable[str] = ("authorization", "content-type"),
+        allow_methods: Iterable[str] = ("GET", "POST", "PUT", "OPTIONS"),
+    ) -> None:
+        self.allow_origins = frozenset(allow_origins)
+        self.allow_headers = ", ".join(allow_headers)
+        self.allow_methods = ", ".join(allow_methods)
+
+    def _headers(self, origin: str | None) -> dict[str, str]:
+        if "*" in self.allow_origins:
+            allowed = "*"
+        elif origin in self.allow_origins:
+            allowed = origin
+        else:
+            return {}
+        headers = {
+            "access-control-allow-origin": allowed,
+            "access-control-allow-headers": self.allow_headers,
+            "access-control-allow-methods": self.allow_methods,
+        }
+        if allowed != "*":
+            headers["vary"] = "origin"
+        return headers
+
+    async def __call__(self, request: Request, call_next: CallNext) -> Response:
+        cors = self._headers(request.headers.get("origin"))
+        if request.method.upper() == "OPTIONS":
+            # Preflight requests never reach the routes.
+            return Response(204, None, cors)
+        response = await call_next(request)
+        if cors:
+            # Headers set by the handler win over the defaults.
+            response.headers = {**cors, **(response.headers or {})}
+        return response
+
+
+class TimingMiddleware:
+    """Report handler time in a ``server-timing`` header and to ``on_timing``.
+
+    For streaming responses the time covers the handler only, not the body.
+    """
+
+    def __init__(
+        self,
+        *,
+        header: str | None = "server-timing",
+        on_timing: Callable[[Request, Response, float], None] | None = None,
+    ) -> None:
+        self.header = header
+        self.on_timing = on_timing
+
+    async def __call__(self, request: Request, call_next: CallNext) -> Response:
+        started = time.perf_counter()
+        response = await call_next(request)
+        elapsed = time.perf_counter() - started
+        if self.header:
+            headers = response.headers if response.headers is not None else {}
+            headers[self.header] = f"app;dur={elapsed * 1000:.3f}"
+            response.headers = headers
+        if self.on_timing is not None:
+            self.on_timing(request, response, elapsed)
+        return response
+
+
+class RequestIDMiddleware:
+    """Propagate the client's request id (or assign one) to the response.
+
+    The id is stored in ``request.state["request_id"]`` and available to the
+    rest of the request through :func:`current_request_id`.
+    """
+
+    def __init__(self, *, header: str = "x-request-id") -> None:
+        self.header = header
+
+    async def __call__(self, request: Request, call_next: CallNext) -> Response:
+        request_id = request.headers.get(self.header)
+        if not request_id or not _REQUEST_ID_PATTERN.match(request_id):
+            # Cheaper than uuid4() and just as unique for correlation.
+            request_id = os.urandom(16).hex()
+        request.state["request_id"] = request_id
+        token = _request_id.set(request_id)
+        try:
+            response = await call_next(request)
+        finally:
+            _request_id.reset(token)
+        headers = response.headers if response.headers is not None else {}
+        headers[self.header] = request_id
+        response.headers = headers
+        return response
+
+
+class SQLProfilerMiddleware:
+    """Count the SQL statements of each request and report likely N+1 queries.
+
+    Statements run while a streamed body is produced count towards the
+    request too; its report is made once the body is done.
+    """
+
+    async def __call__(self, request: Request, call_next: CallNext) -> Response:
+        scope, token = sql_profiler.begin_request(f"{request.method} {request.path}")
+        request.state["sql"] = scope
+        try:
+            response = await call_next(request)
+        finally:
+            sql_profiler.end_request(token)
+        if isinstance(response, StreamingResponse):
+            response.call_on_close(lambda: sql_profiler.finish_request(scope))
+        else:
+            sql_profiler.finish_request(scope)
+        return response
+
+
+class ProfilingMiddleware:
+    """Run requests whose id was armed in ``request_profiler`` under cProfile.
+
+    Install it inside :class:`RequestIDMiddleware`, which assigns the id.
+    """
+
+    async def __call__(self, request: Request, call_next: CallNext) -> Response:
+        request_id = request.state.get("request_id")
+        if not request_profiler.is_armed(request_id):
+            return await call_next(request)
+        return await request_profiler.profile(request_id, lambda: call_next(request))
+
+
+class RateLimitMiddleware:
+    """Throttle ``routes`` per client IP and per ``email`` of the JSON body.
+
+    Each request takes a token from both its IP and its email bucket; when
+    either is empty the request is answered with ``429`` and a
+    ``retry-after`` header. ``X-Forwarded-For`` is only trusted on request,
+    since clients can set it freely.
+    """
+
+    def __init__(
+        self,
+        routes: Iterable[tuple[str, str]],
+        *,
+        ip_limiter: Limiter,
+        email_limiter: Limiter,
+        trust_forwarded: bool = False,
+    ) -> None:
+        self.routes = frozenset(routes)
+        self.ip_limiter = ip_limiter
+        self.email_limiter = email_limiter
+        self.trust_forwarded = trust_forwarded
+
+    def _client(self, request: Request) -> str | None:
+        if self.trust_forwarded:
+            forwarded = request.headers.get("x-forwarded-for", "").split(",")[0].strip()
+            if forwarded:
+                return forwarded
+        return request.client
+
+    async def __call__(self, request: Request, call_next: CallNext) -> Response:
+        if (request.method, request.path) not in self.routes:
+            return await call_next(request)
+        wait = 0.0
+        client = self._client(request)
+        if client:
+            wait = await self.ip_limiter.acquire_async(f"ip:{request.path}:{client}")
+        email = request.json.get("email") if isinstance(request.json, dict) else None
+        if isinstance(email, str) and email.strip():
+            key = f"email:{request.path}:{email.strip().lower()}"
+            wait = max(wait, await self.email_limiter.acquire_async(key))
+        if wait:
+            rate_limited_requests.labels(request.method, request.path).inc()
+            return Response(429, {"detail": "Too many requests"}, {"retry-after": str(math.ceil(wait))})
+        return await call_next(request)
+
+
+class ErrorMiddleware:
+    """Turn exceptions escaping the handlers into JSON error responses.
+
+    ``status_codes`` maps exception types to status codes (subclasses match
+    too); anything else is logged and answered with ``500``.
+    """
+
+    def __init__(self, status_codes: dict[type[Exception], int] | None = None) -> None:
+        self.status_codes = dict(status_codes or {})
+
+    def _status_for(self, exc: Exception) -> int | None:
+        for cls in type(exc).__mro__:
+            status = self.status_codes.get(cls)
+            if status is not None:
+                return status
+        return None
+
+    async def __call__(self, request: Request, call_next: CallNext) -> Response:
+        try:
+            return await call_next(request)
+        except HTTPException as exc:
+            return Response(exc.status_code, {"detail": exc.detail})
+        except Exception as exc:
+            status = self._status_for(exc)
+            if status is not None:
+                return Response(status, {"detail": str(exc)})
+            logger.exception("Unhandled error in %s %s", request.method, request.path)
+            return Response(500, {"detail": "Internal Server Error"})
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass(slots=True)
+class Event:
+    name: str
+    data: dict[str, Any] = field(default_factory=dict)
+    terminal: bool = False
+
+    def encode(self) -> bytes:
+        """Render the event in ``text/event-stream`` wire format."""
+
+        payload = json.dumps(self.data, ensure_ascii=False)
+        return f"event: {self.name}\ndata: {payload}\n\n".encode()
+
+
+class Subscription:
+    """Per-subscriber buffer bound to the event loop that created it."""
+
+    def __init__(self, broker: "EventBroker", key: str, maxsize: int) -> None:
+        self._broker = broker
+        self.key = key
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue[Event] = asyncio.Queue(maxsize)
+        self.closed = False
+
+    def _deliver(self, event: Event) -> None:
+        # Runs on the subscriber's loop. Slow consumers lose the oldest
+        # progress events, never the newest (which carries the latest state).
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(event)
+
+    def push(self, event: Event) -> None:
+        if self.closed:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, event)
+        except RuntimeError:  # pragma: no cover - loop already closed
+            self.close()
+
+    async def get(self, timeout: float | None = None) -> Event | None:
+        """Return the next event, or ``None`` when ``timeout`` elapses first."""
+
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self._broker._unsubscribe(self)
+
+
+class EventBroker:
+    """In-process pub/sub keyed by resource id.
+
+    ``publish`` may be called from any thread (generation runs on the job
+    queue's loop); events are handed to each subscriber's own loop.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+        self._subscribers: dict[str, set[Subscription]] = defaultdict(set)
+
+    def subscribe(self, key: str) -> Subscription:
+        subscription = Subscription(self, key, self._maxsize)
+        with self._lock:
+            self._subscribers[key].add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.key)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.key]
+
+    def publish(self, key: str, name: str, data: dict[str, Any] | None = None, *, terminal: bool = False) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(key, ()))
+        if not subscribers:
+            return
+        event = Event(name, data or {}, terminal)
+        for subscription in subscribers:
+            subscription.push(event)
+
+    def subscriber_count(self, key: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(key, ()))
+
+    def reset(self) -> None:
+        with self._lock:
+            subscribers = [sub for subs in self._subscribers.values() for sub in subs]
+            self._subscribers.clear()
+        for subscription in subscribers:
+            subscription.closed = True
+
+
+generation_events = EventBroker()
@@ -1,7 +1,17 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import TYPE_CHECKING, Any, List, TypedDict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Iterable,
+    List,
+    TypedDict,
+)
 
 try:  # pragma: no cover - optional dependency
     import httpx
@@ -13,13 +23,23 @@ if TYPE_CHECKING:  # pragma: no cover - type checking helper
 else:  # pragma: no cover - runtime fallback
     AsyncClient = Any
 
+from city_guide.app.core.circuit_breaker import OPEN, CircuitOpenError, get_breaker
 from city_guide.app.core.config import settings
+from city_guide.app.core.metrics import track_outbound
+from city_guide.app.core.tracing import set_span_attributes, traced
 from city_guide.app.schemas.poi import BrainstormedPOI
 
 logger = logging.getLogger(__name__)
 
 TEXT_SEARCH_URL = "https://maps.googleapis.com/maps/api/place/textsearch/json"
 MAX_TEXT_SEARCH_QUERIES = settings.brainstorm_poi_max_items
+PLACES_BREAKER = "google_places"
+# Statuses signalling a provider-side problem rather than a bad query.
+_PROVIDER_FAILURE_STATUSES = frozenset({"OVER_QUERY_LIMIT", "UNKNOWN_ERROR"})
+
+
+class PlacesProviderError(Exception):
+    """Google Places answered with a provider-side failure status."""
 
 
 class CandidatePOI(TypedDict, total=False):
@@ -51,18 +71,49 @@ def _build_query(poi: BrainstormedPOI) -> str:
     return ", ".join(part for part in parts if part)
 
 
+def _is_provider_failure(exc: BaseException) -> bool:
+    if isinstance(exc, PlacesProviderError):
+        return True
+    return httpx is not None and isinstance(exc, httpx.HTTPError)
+
+
+async def _request_text_search(
+    client: AsyncClient,
+    api_key: str,
+    query: str,
+    language: str,
+) -> dict[str, Any]:
+    with track_outbound("google_places", "textsearch"):
+        response = await client.get(
+            TEXT_SEARCH_URL,
+            params={"query": query, "language": language, "key": api_key},
+        )
+        response.raise_for_status()
+        payload = response.json()
+        status = payload.get("status")
+        if status in _PROVIDER_FAILURE_STATUSES:
+            raise PlacesProviderError(status)
+    return payload
+
+
 async def _text_search(
     client: AsyncClient,
     api_key: str,
     query: str,
     language: str,
 ) -> list[dict[str, Any]]:
-    response = await client.get(
-        TEXT_SEARCH_URL,
-        params={"query": query, "language": language, "key": api_key},
-    )
-    response.raise_for_status()
-    payload = response.json()
+    try:
+        payload = await get_breaker(PLACES_BREAKER).call(
+            _request_text_search,
+            client,
+            api_key,
+            query,
+            language,
+            is_failure=_is_provider_failure,
+        )
+    except PlacesProviderError as exc:
+        logger.warning("Google Places text search returned status %s", exc)
+        return []
     status = payload.get("status")
     if status not in {"OK", "ZERO_RESULTS"}:
         logger.warning("Google Places text search returned status %s", status)
@@ -124,41 +175,94 @@ def _map_candidate(place: dict[str, Any], poi: BrainstormedPOI) -> CandidatePOI
     return candidate
 
 
+async def _iterate(items: Iterable[BrainstormedPOI] | AsyncIterable[BrainstormedPOI]):
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def _validate_one(
+    client: AsyncClient,
+    api_key: str,
+    poi: BrainstormedPOI,
+    query: str,
+    language: str,
+    semaphore: asyncio.Semaphore,
+    on_candidate: Callable[[CandidatePOI], Awaitable[Any]] | None,
+) -> CandidatePOI | None:
+    async with semaphore:
+        candidates = await _text_search(client, api_key, query, language)
+    best = _select_candidate(candidates)
+    if not best:
+        return None
+    candidate = _map_candidate(best, poi)
+    if candidate and on_candidate is not None:
+        await on_candidate(candidate)
+    return candidate
+
+
+@traced("places.validate")
 async def validate_brainstormed_poi(
     client: AsyncClient,
     api_key: str,
-    items: list[BrainstormedPOI],
+    items: Iterable[BrainstormedPOI] | AsyncIterable[BrainstormedPOI],
     language: str = "en",
     max_queries: int = MAX_TEXT_SEARCH_QUERIES,
+    max_concurrency: int | None = None,
+    on_candidate: Callable[[CandidatePOI], Awaitable[Any]] | None = None,
 ) -> list[CandidatePOI]:
-    """Validate GPT brainstormed POIs via Google Places Text Search."""
+    """Validate GPT brainstormed POIs via Google Places Text Search.
 
-    if not items or not api_key or not settings.use_google_sources or httpx is None:
-        return []
-
-    validated: list[CandidatePOI] = []
-    for idx, poi in enumerate(items):
-        if idx >= max_queries:
-            break
-
-        query = _build_query(poi)
-        if not query:
-            continue
-
-        try:
-            candidates = await _text_search(client, api_key, query, language)
-        except httpx.HTTPError as exc:  # pragma: no cover - network failure
-            logger.warning("Google Places text search failed for %s: %s", query, exc)
-            continue
+    ``items`` may be an async iterable (e.g. :meth:`GPTClient.stream_brainstorm_poi`),
+    in which case lookups start as soon as each item arrives instead of after
+    the whole brainstorm finished. At most ``max_concurrency`` lookups run at
+    once; results keep the order of the input items. ``on_candidate`` is awaited
+    with every candidate as soon as its lookup resolves, which lets a consumer
+    act on results before the whole batch is done.
+    """
 
-        best = _select_candidate(candidates)
-        if not best:
-            continue
-
-        candidate = _map_candidate(best, poi)
-        if not candidate:
-            continue
-
-        validated.append(candidate)
+    if not api_key or not settings.use_google_sources or httpx is None:
+        return []
 
-    return validated
+    semaphore = asyncio.Semaphore(max(1, max_concurrency or settings.places_max_concurrency))
+    breaker = get_breaker(PLACES_BREAKER)
+    tasks: list[asyncio.Task] = []
+    try:
+        idx = 0
+        async for poi in _iterate(items):
+            if idx >= max_queries:
+                break
+            idx += 1
+            if breaker.state == OPEN:
+                logger.warning("Google Places circuit is open, skipping remaining lookups")
+                break
+
+            query = _build_query(poi)
+            if not query:
+                continue
+            tasks.append(
+                asyncio.ensure_future(
+                    _validate_one(client, api_key, poi, query, language, semaphore, on_candidate)
+                )
+            )
+
+        validated: list[CandidatePOI] = []
+        for outcome in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(outcome, CircuitOpenError):
+                continue
+            if isinstance(outcome, httpx.HTTPError):  # pragma: no cover - network failure
+                logger.warning("Google Places text search failed: %s", outcome)
+                continue
+            if isinstance(outcome, BaseException):
+                raise outcome
+            if outcome:
+                validated.append(outcome)
+        set_span_attributes(lookups=len(tasks), validated=len(validated))
+        return validated
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -1,21 +1,118 @@
 from __future__ import annotations
 
+import asyncio
+import inspect
 import json
 import logging
-from typing import Any, Sequence
+import time
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Sequence
 
-from openai import AsyncOpenAI
-from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    AsyncOpenAI,
+    InternalServerError,
+    RateLimitError,
+)
+from pydantic import ValidationError
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception,
+    stop_after_attempt,
+    stop_before_delay,
+    wait_exponential_jitter,
+)
 
+from ..core.circuit_breaker import get_breaker
 from ..core.config import settings
+from ..core.metrics import track_outbound
+from ..core.tracing import set_span_attributes, traced
 from ..schemas.poi import (
     BrainstormPOIRequest,
     BrainstormPOIResponse,
     BrainstormedPOI,
 )
+from .json_stream import iter_array_items
 
 logger = logging.getLogger(__name__)
 
+_RETRYABLE_STATUS_CODES = frozenset({408, 409, 429})
+_TRANSIENT_ERRORS = (
+    asyncio.TimeoutError,
+    APIConnectionError,
+    RateLimitError,
+    InternalServerError,
+)
+_TEXT_DELTA_EVENT = "response.output_text.delta"
+_FAILURE_EVENTS = frozenset({"error", "response.failed"})
+
+BRAINSTORM_RESPONSE_FORMAT: dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "brainstorm_poi_response",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "items": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "title": {"type": "string"},
+                            "city": {"type": ["string", "null"]},
+                            "country": {"type": ["string", "null"]},
+                            "category": {"type": ["string", "null"]},
+                            "description": {"type": ["string", "null"]},
+                            "priority": {"type": ["number", "null"]},
+                        },
+                        "required": ["title"],
+                    },
+                }
+            },
+            "required": ["items"],
+        },
+        "strict": True,
+    },
+}
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """Return ``True`` for failures worth retrying (timeouts, throttling, 5xx)."""
+
+    if isinstance(exc, _TRANSIENT_ERRORS):
+        return True
+    if isinstance(exc, APIStatusError):
+        status = getattr(exc, "status_code", None) or 0
+        return status in _RETRYABLE_STATUS_CODES or status >= 500
+    return False
+
+
+class GPTStreamError(RuntimeError):
+    """The model reported a failure in the middle of a streamed response."""
+
+
+def _is_stream_failure(exc: BaseException) -> bool:
+    return isinstance(exc, GPTStreamError) or is_transient_error(exc)
+
+
+async def _close_stream(stream: Any) -> None:
+    close = getattr(stream, "aclose", None) or getattr(stream, "close", None)
+    if close is not None:
+        result = close()
+        if inspect.isawaitable(result):
+            await result
+
+
+def _validate_poi(item: Any) -> BrainstormedPOI | None:
+    """A brainstormed item as a model, or ``None`` when it is malformed."""
+
+    try:
+        return BrainstormedPOI.model_validate(item)
+    except ValidationError as exc:
+        logger.warning("Skipping malformed brainstormed POI %r: %s", item, exc)
+        return None
+
 
 class GPTClient:
     def __init__(self) -> None:
@@ -25,7 +122,43 @@ class GPTClient:
             self.client = None
         self.model = settings.gpt_model
         self.brainstorm_model = settings.gpt_brainstorm_poi_model or self.model
+        self.breaker = get_breaker("openai")
 
+    async def _create_response(
+        self,
+        messages: list[dict[str, str]],
+        response_format: dict | None,
+        model: str | None,
+        timeout: float,
+        stream: bool = False,
+    ) -> Any:
+        options: dict[str, Any] = {"stream": True} if stream else {}
+        # For streams this is the time until the response starts.
+        with track_outbound("openai", "responses.stream" if stream else "responses.create"):
+            return await asyncio.wait_for(
+                self.client.responses.create(
+                    model=model or self.model,
+                    input=messages,
+                    response_format=response_format or {"type": "json_object"},
+                    temperature=0.2,
+                    **options,
+                ),
+                timeout=timeout,
+            )
+
+    def _retrying(self, budget: float) -> AsyncRetrying:
+        return AsyncRetrying(
+            wait=wait_exponential_jitter(
+                initial=settings.gpt_retry_initial_wait_sec,
+                max=settings.gpt_retry_max_wait_sec,
+                jitter=settings.gpt_retry_jitter_sec,
+            ),
+            stop=stop_after_attempt(settings.gpt_max_attempts) | stop_before_delay(budget),
+            retry=retry_if_exception(is_transient_error),
+            reraise=True,
+        )
+
+    @traced("openai.completion")
     async def _completion(
         self,
         messages: list[dict[str, str]],
@@ -35,22 +168,100 @@ class GPTClient:
     ) -> dict:
         if not self.client:
             raise RuntimeError("OpenAI client not configured")
-        async for attempt in AsyncRetrying(
-            wait=wait_exponential(multiplier=1, max=10),
-            stop=stop_after_attempt(3),
-            retry=retry_if_exception_type(Exception),
-            reraise=True,
-        ):
+        budget = settings.gpt_latency_budget_sec
+        deadline = time.monotonic() + budget
+        attempts = 0
+        async for attempt in self._retrying(budget):
             with attempt:
-                response = await self.client.responses.create(
-                    model=model or self.model,
-                    input=messages,
-                    response_format=response_format or {"type": "json_object"},
-                    temperature=0.2,
+                attempts += 1
+                set_span_attributes(model=model or self.model, attempts=attempts)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError("GPT latency budget exhausted")
+                response = await self.breaker.call(
+                    self._create_response,
+                    messages,
+                    response_format,
+                    model,
+                    remaining,
+                    is_failure=is_transient_error,
                 )
                 return json.loads(response.output[0].content[0].text)
         raise RuntimeError("Failed to obtain completion")
 
+    async def _open_stream(
+        self,
+        messages: list[dict[str, str]],
+        response_format: dict | None,
+        model: str | None,
+        budget: float,
+        deadline: float,
+    ) -> Any:
+        """Open a streamed response, retrying like :meth:`_completion`.
+
+        The breaker slot stays reserved on success: the call is only settled
+        once the stream has been read to the end.
+        """
+
+        async for attempt in self._retrying(budget):
+            with attempt:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError("GPT latency budget exhausted")
+                self.breaker.before_call()
+                try:
+                    return await self._create_response(
+                        messages, response_format, model, remaining, stream=True
+                    )
+                except BaseException as exc:
+                    self.breaker.record_outcome(exc, _is_stream_failure)
+                    raise
+        raise RuntimeError("Failed to open completion stream")
+
+    async def _stream_completion(
+        self,
+        messages: list[dict[str, str]],
+        response_format: dict | None = None,
+        *,
+        model: str | None = None,
+    ) -> AsyncIterator[str]:
+        """Yield output text deltas of a streamed response.
+
+        Opening the stream is retried like :meth:`_completion`; once text has
+        been emitted a failure is propagated to the caller because the partial
+        output cannot be replayed. The latency budget covers the whole stream,
+        and failures or stalls while reading count against the circuit too.
+        """
+
+        if not self.client:
+            raise RuntimeError("OpenAI client not configured")
+        budget = settings.gpt_latency_budget_sec
+        deadline = time.monotonic() + budget
+        stream = await self._open_stream(messages, response_format, model, budget, deadline)
+        events = stream.__aiter__()
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError("GPT latency budget exhausted")
+                try:
+                    event = await asyncio.wait_for(events.__anext__(), timeout=remaining)
+                except StopAsyncIteration:
+                    break
+                event_type = getattr(event, "type", "")
+                if event_type == _TEXT_DELTA_EVENT:
+                    yield event.delta
+                elif event_type in _FAILURE_EVENTS:
+                    raise GPTStreamError(f"GPT stream failed: {event_type}")
+        except BaseException as exc:
+            # Includes GeneratorExit when the consumer stops early, which
+            # releases the slot without a verdict on the provider.
+            self.breaker.record_outcome(exc, _is_stream_failure)
+            raise
+        finally:
+            await _close_stream(stream)
+        self.breaker.record_success()
+
     async def select_poi(self, user_ctx: dict, candidates: Sequence[dict], k: int) -> list[str]:
         if not candidates:
             return []
@@ -100,12 +311,7 @@ class GPTClient:
             logger.exception("GPT ordering failed, using fallback: %s", exc)
             return [node["poi_id"] for node in nodes]
 
-    async def brainstorm_poi(self, req: BrainstormPOIRequest) -> BrainstormPOIResponse:
-        if not self.client:
-            logger.info("OpenAI not configured, skipping POI brainstorming")
-            logger.info("Brainstormed %d POIs", 0)
-            return BrainstormPOIResponse(items=[])
-
+    def _brainstorm_prompt(self, req: BrainstormPOIRequest) -> str:
         prompt_sections: list[str] = [
             "You are an expert travel planner. Brainstorm interesting points of interest for the traveler.",
         ]
@@ -139,56 +345,64 @@ class GPTClient:
                 f"Respond with at most {settings.brainstorm_poi_max_items} POIs."
             )
         )
+        return "\n".join(prompt_sections)
 
-        prompt = "\n".join(prompt_sections)
-        logger.debug("Brainstorm POI prompt: %s", prompt)
+    async def stream_brainstorm_poi(self, req: BrainstormPOIRequest) -> AsyncIterator[BrainstormedPOI]:
+        """Yield brainstormed POIs one by one as the model produces them.
 
-        response_format: dict[str, Any] = {
-            "type": "json_schema",
-            "json_schema": {
-                "name": "brainstorm_poi_response",
-                "schema": {
-                    "type": "object",
-                    "properties": {
-                        "items": {
-                            "type": "array",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "title": {"type": "string"},
-                                    "city": {"type": ["string", "null"]},
-                                    "country": {"type": ["string", "null"]},
-                                    "category": {"type": ["string", "null"]},
-                                    "description": {"type": ["string", "null"]},
-                                    "priority": {"type": ["number", "null"]},
-                                },
-                                "required": ["title"],
-                            },
-                        }
-                    },
-                    "required": ["items"],
-                },
-                "strict": True,
-            },
-        }
+        Malformed items are logged and skipped. Failures of the model call end
+        the stream early; items yielded before the failure stay valid, so
+        consumers may already have started working on them.
+        """
+
+        if not self.client:
+            logger.info("OpenAI not configured, skipping POI brainstorming")
+            logger.info("Brainstormed %d POIs", 0)
+            return
+
+        prompt = self._brainstorm_prompt(req)
+        logger.debug("Brainstorm POI prompt: %s", prompt)
+        messages = [{"role": "user", "content": prompt}]
+        limit = settings.brainstorm_poi_max_items
 
+        count = 0
         try:
-            data = await self._completion(
-                messages=[{"role": "user", "content": prompt}],
-                response_format=response_format,
-                model=self.brainstorm_model,
-            )
+            if settings.gpt_stream_brainstorm:
+                # Close the HTTP stream as soon as we stop reading, not on GC.
+                async with aclosing(
+                    self._stream_completion(
+                        messages,
+                        response_format=BRAINSTORM_RESPONSE_FORMAT,
+                        model=self.brainstorm_model,
+                    )
+                ) as chunks, aclosing(iter_array_items(chunks, key="items")) as items:
+                    async for item in items:
+                        if count >= limit:
+                            break
+                        poi = _validate_poi(item)
+                        if poi is not None:
+                            count += 1
+                            yield poi
+            else:
+                data = await self._completion(
+                    messages=messages,
+                    response_format=BRAINSTORM_RESPONSE_FORMAT,
+                    model=self.brainstorm_model,
+                )
+                for item in data.get("items") or []:
+                    if count >= limit:
+                        break
+                    poi = _validate_poi(item)
+                    if poi is not None:
+                        count += 1
+                        yield poi
         except Exception as exc:  # noqa: BLE001
             logger.exception("GPT brainstorming failed: %s", exc)
-            logger.info("Brainstormed %d POIs", 0)
-            return BrainstormPOIResponse(items=[])
 
-        raw_items = data.get("items") or []
-        limited_items = raw_items[: settings.brainstorm_poi_max_items]
-        pois = [BrainstormedPOI.model_validate(item) for item in limited_items]
-
-        logger.info("Brainstormed %d POIs", len(pois))
+        logger.info("Brainstormed %d POIs", count)
 
+    async def brainstorm_poi(self, req: BrainstormPOIRequest) -> BrainstormPOIResponse:
+        pois = [poi async for poi in self.stream_brainstorm_poi(req)]
         return BrainstormPOIResponse(items=pois)
 
 
@@ -0,0 +1,451 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..core.metrics import jobs_running
+from ..db import database
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+ACTIVE_STATUSES = frozenset({QUEUED, RUNNING})
+
+JobHandler = Callable[["Job"], Awaitable[Any]]
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass
+class Job:
+    id: uuid.UUID
+    kind: str
+    resource_id: str
+    payload: dict[str, Any]
+    status: str = QUEUED
+    error: str | None = None
+    attempts: int = 0
+    created_at: datetime = field(default_factory=_now)
+    updated_at: datetime = field(default_factory=_now)
+
+    @property
+    def active(self) -> bool:
+        return self.status in ACTIVE_STATUSES
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": str(self.id),
+            "kind": self.kind,
+            "status": self.status,
+            "error": self.error,
+            "attempts": self.attempts,
+            "createdAt": self.created_at.isoformat(),
+            "updatedAt": self.updated_at.isoformat(),
+        }
+
+
+class MemoryJobStore:
+    """Process-local job registry; finished jobs beyond ``max_finished`` are evicted."""
+
+    durable = False
+    lease_seconds = 0.0
+
+    def __init__(self, max_finished: int = 1000) -> None:
+        self._jobs: OrderedDict[uuid.UUID, Job] = OrderedDict()
+        self._latest: dict[str, uuid.UUID] = {}
+        self._max_finished = max_finished
+        self._lock = threading.Lock()
+
+    def add(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.id] = job
+            self._latest[job.resource_id] = job.id
+
+    def update(self, job: Job) -> None:
+        job.updated_at = _now()
+        with self._lock:
+            self._jobs[job.id] = job
+            self._jobs.move_to_end(job.id)
+            self._evict()
+
+    def claim(self, job: Job) -> bool:
+        with self._lock:
+            if job.status != QUEUED:
+                return False
+            job.status = RUNNING
+            job.attempts += 1
+            job.updated_at = _now()
+            return True
+
+    def heartbeat(self, job: Job) -> None:
+        job.updated_at = _now()
+
+    def get(self, job_id: uuid.UUID) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def latest_for(self, resource_id: str) -> Job | None:
+        with self._lock:
+            job_id = self._latest.get(resource_id)
+            return self._jobs.get(job_id) if job_id else None
+
+    def pending(self) -> list[Job]:
+        return []
+
+    def clear(self) -> None:
+        with self._lock:
+            self._jobs.clear()
+            self._latest.clear()
+
+    def _evict(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[: max(0, len(finished) - self._max_finished)]:
+            job = self._jobs.pop(job_id)
+            if self._latest.get(job.resource_id) == job_id:
+                del self._latest[job.resource_id]
+
+
+class DatabaseJobStore(MemoryJobStore):
+    """Write-through store persisting jobs in the ``background_jobs`` table.
+
+    Claiming is a conditional ``UPDATE`` so several workers sharing the table
+    never run a job twice. A running job holds a lease that its worker renews
+    through :meth:`heartbeat`; :meth:`pending` returns queued jobs plus running
+    jobs whose lease expired (their process is gone) so they can be re-enqueued.
+
+    Resources without any job are remembered for ``job_miss_cache_seconds``,
+    so polling a route that was never generated does not query the table on
+    every request. :meth:`add` forgets the miss for its own resource; jobs
+    added by other workers show up once the entry expires.
+    """
+
+    durable = True
+
+    def __init__(self, max_finished: int = 1000, lease_seconds: float | None = None) -> None:
+        super().__init__(max_finished)
+        self.lease_seconds = settings.job_lease_seconds if lease_seconds is None else lease_seconds
+        self._misses: TTLCache[str, bool] = TTLCache(
+            maxsize=max_finished, ttl=settings.job_miss_cache_seconds
+        )
+
+    def add(self, job: Job) -> None:
+        database.execute(
+            """
+            INSERT INTO background_jobs (
+                id, kind, resource_id, payload_json, status, error,
+                attempts, created_at, updated_at
+            ) VALUES (
+                :id, :kind, :resource_id, :payload_json, :status, :error,
+                :attempts, :created_at, :updated_at
+            )
+            """,
+            self._params(job),
+        )
+        self._misses.invalidate(job.resource_id)
+        super().add(job)
+
+    def update(self, job: Job) -> None:
+        super().update(job)
+        database.execute(
+            """
+            UPDATE background_jobs SET
+                status = :status, error = :error, attempts = :attempts, updated_at = :updated_at
+            WHERE id = :id
+            """,
+            {
+                "id": str(job.id),
+                "status": job.status,
+                "error": job.error,
+                "attempts": job.attempts,
+                "updated_at": job.updated_at.isoformat(),
+            },
+        )
+
+    def claim(self, job: Job) -> bool:
+        claimed = database.execute(
+            """
+            UPDATE background_jobs SET status = :running, attempts = attempts + 1, updated_at = :updated_at
+            WHERE id = :id AND status = :queued
+            """,
+            {"id": str(job.id), "running": RUNNING, "queued": QUEUED, "updated_at": _now().isoformat()},
+        )
+        if claimed != 1:
+            return False
+        return super().claim(job)
+
+    def heartbeat(self, job: Job) -> None:
+        super().heartbeat(job)
+        database.execute(
+            "UPDATE background_jobs SET updated_at = :updated_at WHERE id = :id AND status = :running",
+            {"id": str(job.id), "running": RUNNING, "updated_at": job.updated_at.isoformat()},
+        )
+
+    def latest_for(self, resource_id: str) -> Job | None:
+        job = super().latest_for(resource_id)
+        if job is not None or self._misses.get(resource_id):
+            return job
+        row = database.execute(
+            """
+            SELECT * FROM background_jobs WHERE resource_id = :resource_id
+            ORDER BY created_at DESC LIMIT 1
+            """,
+            {"resource_id": resource_id},
+            fetchone=True,
+        )
+        if row is None:
+            self._misses.put(resource_id, True)
+            return None
+        return self._row_to_job(row)
+
+    def clear(self) -> None:
+        super().clear()
+        self._misses.clear()
+
+    def pending(self) -> list[Job]:
+        rows = database.execute(
+            "SELECT * FROM background_jobs WHERE status IN (:queued, :running) ORDER BY created_at",
+            {"queued": QUEUED, "running": RUNNING},
+            fetchall=True,
+        )
+        expired = (_now() - timedelta(seconds=self.lease_seconds)).isoformat()
+        jobs: list[Job] = []
+        for row in rows:
+            job = self._row_to_job(row)
+            if job.status == RUNNING:
+                # Only take over jobs whose worker stopped renewing the lease;
+                # the conditional UPDATE loses against a concurrent heartbeat.
+                reclaimed = database.execute(
+                    """
+                    UPDATE background_jobs SET status = :queued
+                    WHERE id = :id AND status = :running AND updated_at < :expired
+                    """,
+                    {"id": str(job.id), "queued": QUEUED, "running": RUNNING, "expired": expired},
+                )
+                if reclaimed != 1:
+                    continue
+                job.status = QUEUED
+            super().add(job)
+            jobs.append(job)
+        return jobs
+
+    @staticmethod
+    def _params(job: Job) -> dict[str, Any]:
+        return {
+            "id": str(job.id),
+            "kind": job.kind,
+            "resource_id": job.resource_id,
+            "payload_json": json.dumps(job.payload),
+            "status": job.status,
+            "error": job.error,
+            "attempts": job.attempts,
+            "created_at": job.created_at.isoformat(),
+            "updated_at": job.updated_at.isoformat(),
+        }
+
+    @staticmethod
+    def _row_to_job(row: dict) -> Job:
+        payload = row.get("payload_json")
+        return Job(
+            id=uuid.UUID(str(row["id"])),
+            kind=row["kind"],
+            resource_id=row["resource_id"],
+            payload=payload if isinstance(payload, dict) else json.loads(payload or "{}"),
+            status=row["status"],
+            error=row.get("error"),
+            attempts=int(row.get("attempts") or 0),
+            created_at=datetime.fromisoformat(str(row["created_at"])),
+            updated_at=datetime.fromisoformat(str(row["updated_at"])),
+        )
+
+
+class JobQueue:
+    """In-process async worker pool for long-running background jobs.
+
+    Workers live on a dedicated event loop thread, so jobs keep running after
+    the request that enqueued them has been answered, regardless of which loop
+    served it. ``concurrency`` workers consume the queue, which caps how many
+    jobs run at the same time in this process.
+    """
+
+    def __init__(self, *, concurrency: int, store: MemoryJobStore) -> None:
+        self.concurrency = max(1, concurrency)
+        self.store = store
+        self._handlers: dict[str, JobHandler] = {}
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._done: dict[uuid.UUID, threading.Event] = {}
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        with self._lock:
+            if self.running:
+                return
+            ready = threading.Event()
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._run_loop, args=(ready,), name="job-queue", daemon=True
+            )
+            self._thread.start()
+            ready.wait()
+        for job in self.store.pending():
+            logger.info("Re-enqueueing pending job %s (%s)", job.id, job.kind)
+            self._submit(job)
+
+    def _run_loop(self, ready: threading.Event) -> None:
+        loop = self._loop
+        assert loop is not None
+        asyncio.set_event_loop(loop)
+        self._queue = asyncio.Queue()
+        self._workers = [loop.create_task(self._worker()) for _ in range(self.concurrency)]
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def enqueue(self, kind: str, resource_id: str, payload: dict[str, Any]) -> Job:
+        if kind not in self._handlers:
+            raise KeyError(f"No handler registered for job kind {kind!r}")
+        job = Job(id=uuid.uuid4(), kind=kind, resource_id=resource_id, payload=payload)
+        self.store.add(job)
+        self.start()
+        self._submit(job)
+        return job
+
+    def _submit(self, job: Job) -> None:
+        self._done.setdefault(job.id, threading.Event())
+        assert self._loop is not None and self._queue is not None
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, job)
+
+    def get(self, job_id: uuid.UUID) -> Job | None:
+        return self.store.get(job_id)
+
+    def latest_for(self, resource_id: str) -> Job | None:
+        return self.store.latest_for(resource_id)
+
+    def active_for(self, resource_id: str) -> Job | None:
+        job = self.latest_for(resource_id)
+        return job if job is not None and job.active else None
+
+    def wait(self, job_id: uuid.UUID, timeout: float | None = None) -> Job | None:
+        """Block the calling thread until the job finished (or ``timeout``)."""
+
+        event = self._done.get(job_id)
+        if event is not None:
+            event.wait(timeout)
+        return self.get(job_id)
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._execute(job)
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, job: Job) -> None:
+        if not self.store.claim(job):
+            return
+        handler = self._handlers[job.kind]
+        heartbeat = asyncio.ensure_future(self._heartbeat(job)) if self.store.durable else None
+        jobs_running.inc()
+        try:
+            await handler(job)
+        except asyncio.CancelledError:
+            if self.store.durable:
+                # Interrupted by shutdown: leave it for the next process.
+                job.status = QUEUED
+                job.error = None
+            else:
+                job.status = FAILED
+                job.error = "cancelled"
+            self.store.update(job)
+            raise
+        except Exception as exc:
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+            job.status = FAILED
+            job.error = str(exc) or exc.__class__.__name__
+        else:
+            job.status = SUCCEEDED
+            job.error = None
+        finally:
+            jobs_running.dec()
+            if heartbeat is not None:
+                heartbeat.cancel()
+        self.store.update(job)
+        event = self._done.pop(job.id, None)
+        if event is not None:
+            event.set()
+
+    async def _heartbeat(self, job: Job) -> None:
+        interval = max(self.store.lease_seconds / 3, 0.01)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.store.heartbeat(job)
+            except Exception:  # noqa: BLE001 - a missed beat only shortens the lease
+                logger.warning("Heartbeat for job %s failed", job.id)
+
+    def shutdown(self, timeout: float | None = 5.0) -> None:
+        """Cancel running jobs and stop the worker thread."""
+
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if loop is None or thread is None or not thread.is_alive():
+                return
+            future = asyncio.run_coroutine_threadsafe(self._stop_workers(), loop)
+            try:
+                future.result(timeout)
+            except Exception:  # noqa: BLE001 - best effort during shutdown
+                logger.warning("Job workers did not stop cleanly")
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            self._loop = None
+            self._thread = None
+            self._queue = None
+        for event in self._done.values():
+            event.set()
+        self._done.clear()
+
+    async def _stop_workers(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def reset(self) -> None:
+        self.shutdown()
+        self.store.clear()
+
+
+def _build_store() -> MemoryJobStore:
+    if settings.job_queue_durable:
+        return DatabaseJobStore()
+    return MemoryJobStore()
+
+
+job_queue = JobQueue(concurrency=settings.generation_max_concurrency, store=_build_store())
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+from typing import Any, AsyncIterable, AsyncIterator
+
+
+class IncrementalArrayParser:
+    """Extract complete elements of a JSON array while the document streams in.
+
+    With ``key="items"`` the parser looks for the array stored under that key of
+    the top-level object (``{"items": [{...}, {...}]}``); with ``key=None`` the
+    document itself is expected to be an array. Each call to :meth:`feed`
+    returns the elements that were completed by the new chunk, decoded with
+    :func:`json.loads`. Elements must be objects or arrays, which is what the
+    structured-output schemas produce. Only the text of the element currently
+    being read is buffered, so memory stays proportional to the largest
+    element.
+    """
+
+    def __init__(self, key: str | None = "items") -> None:
+        self._key = key
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start: int | None = None
+        self._string_parts: list[str] = []
+        self._last_string: str | None = None
+        self._current_key: str | None = None
+        self._array_depth: int | None = None
+        self._item_parts: list[str] = []
+        self._item_depth: int | None = None
+        self._done = False
+
+    @property
+    def done(self) -> bool:
+        """``True`` once the target array has been closed."""
+
+        return self._done
+
+    def feed(self, chunk: str) -> list[Any]:
+        items: list[Any] = []
+        if self._done or not chunk:
+            return items
+        item_start = 0 if self._item_depth is not None else None
+        for index, char in enumerate(chunk):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._track_keys():
+                        self._string_parts.append(chunk[self._string_start or 0 : index])
+                        self._last_string = "".join(self._string_parts)
+                        self._string_parts = []
+                        self._string_start = None
+                continue
+            if char == '"':
+                self._in_string = True
+                if self._track_keys():
+                    self._string_start = index + 1
+                    self._string_parts = []
+                continue
+            if char in "{[":
+                self._depth += 1
+                if self._array_depth is None and char == "[" and self._is_target_array():
+                    self._array_depth = self._depth
+                elif (
+                    self._array_depth is not None
+                    and self._item_depth is None
+                    and self._depth == self._array_depth + 1
+                ):
+                    self._item_depth = self._depth
+                    item_start = index
+            elif char in "}]":
+                if self._item_depth is not None and self._depth == self._item_depth:
+                    self._item_parts.append(chunk[item_start:index + 1])
+                    items.append(json.loads("".join(self._item_parts)))
+                    self._item_parts = []
+                    self._item_depth = None
+                    item_start = None
+                elif self._array_depth is not None and self._depth == self._array_depth:
+                    self._done = True
+                    self._depth -= 1
+                    return items
+                self._depth -= 1
+            elif char == ":" and self._depth == 1:
+                self._current_key = self._last_string
+            elif char == "," and self._depth == 1:
+                self._current_key = None
+        if self._in_string and self._string_start is not None and self._track_keys():
+            self._string_parts.append(chunk[self._string_start:])
+            self._string_start = 0
+        if self._item_depth is not None and item_start is not None:
+            self._item_parts.append(chunk[item_start:])
+        return items
+
+    def _track_keys(self) -> bool:
+        return self._key is not None and self._depth == 1 and self._array_depth is None
+
+    def _is_target_array(self) -> bool:
+        if self._key is None:
+            return self._depth == 1
+        return self._depth == 2 and self._current_key == self._key
+
+
+async def iter_array_items(
+    chunks: AsyncIterable[str],
+    key: str | None = "items",
+) -> AsyncIterator[Any]:
+    """Yield decoded array elements from an async stream of text chunks."""
+
+    parser = IncrementalArrayParser(key)
+    async for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield item
+        if parser.done:
+            break
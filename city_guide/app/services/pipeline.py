@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncIterable, AsyncIterator, Generic, TypeVar
+
+T = TypeVar("T")
+
+_CLOSED = object()
+
+
+class Channel(Generic[T]):
+    """Bounded async queue connecting two pipeline stages.
+
+    ``send`` blocks while the channel is full, giving the producer
+    backpressure; iterating the channel yields items until the producer calls
+    :meth:`close` and the buffer is drained. Closing never blocks, so it is
+    safe from ``finally`` blocks of cancelled stages.
+    """
+
+    def __init__(self, maxsize: int = 0) -> None:
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    async def send(self, item: T) -> None:
+        if self._closed:
+            raise RuntimeError("send on closed channel")
+        await self._queue.put(item)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if not self._queue.full():
+            self._queue.put_nowait(_CLOSED)
+
+    async def __aiter__(self) -> AsyncIterator[T]:
+        while True:
+            if self._closed and self._queue.empty():
+                return
+            item = await self._queue.get()
+            if item is _CLOSED:
+                return
+            yield item
+
+
+async def pump(source: AsyncIterable[T], channel: Channel[T]) -> None:
+    """Forward every item of ``source`` into ``channel`` and close it."""
+
+    try:
+        async for item in source:
+            await channel.send(item)
+    finally:
+        channel.close()
+
+
+async def cancel_tasks(*tasks: asyncio.Future) -> None:
+    """Cancel unfinished ``tasks`` and wait until they have unwound."""
+
+    pending = [task for task in tasks if not task.done()]
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,194 @@
+"""Latency and throughput of the HTTP API.
+
+Runs register/login, trip CRUD and trip generation (with stubbed GPT and
+Places) against a throwaway SQLite database and reports p50/p95/p99 and
+req/s per scenario. Run from the repository root::
+
+    python -m city_guide.benchmarks.bench_api                  # ASGI driver
+    python -m city_guide.benchmarks.bench_api --driver testclient
+    python -m city_guide.benchmarks.bench_api --save-baseline  # update baseline.json
+    python -m city_guide.benchmarks.bench_api --compare        # exit 1 on regression
+
+Baselines are only comparable on the machine that recorded them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+
+_DB_DIR = tempfile.mkdtemp(prefix="city-guide-bench-")
+os.environ.setdefault("CITY_GUIDE_TESTING", "1")
+os.environ.setdefault("REQUIRE_POSTGRES", "0")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_DIR}/bench.db")
+
+from city_guide.app.api.v1 import routes
+from city_guide.app.core import deps
+from city_guide.app.core.config import settings
+from city_guide.app.main import app
+from city_guide.app.schemas.poi import BrainstormedPOI, BrainstormPOIResponse
+from city_guide.app.services import google_poi
+from city_guide.app.services.jobs import job_queue
+
+from .harness import (
+    AsgiDriver,
+    Result,
+    TestClientDriver,
+    compare,
+    format_table,
+    measure,
+    save_baseline,
+)
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+_TRIP = {
+    "title": "Weekend in Vilnius",
+    "localityId": "vilnius",
+    "start": {"id": "start", "name": "Cathedral Square", "location": {"lat": 54.685, "lng": 25.287}},
+    "end": {"id": "end", "name": "Town Hall", "location": {"lat": 54.678, "lng": 25.286}},
+    "routeOptions": {"interests": ["history"], "duration": "180", "timeOfDay": "Morning"},
+}
+_POIS = [
+    ("MO Museum", 54.689, 25.279, "museum"),
+    ("Gediminas Tower", 54.686, 25.290, "viewpoint"),
+    ("Vilnius Cathedral", 54.685, 25.287, "church"),
+    ("Uzupis", 54.681, 25.295, "neighbourhood"),
+]
+
+
+class _StubGPTClient:
+    async def stream_brainstorm_poi(self, request):
+        for title, *_ in _POIS:
+            yield BrainstormedPOI(title=title, city="Vilnius", country="Lithuania", priority=0.9)
+
+    async def brainstorm_poi(self, request):
+        return BrainstormPOIResponse(items=[poi async for poi in self.stream_brainstorm_poi(request)])
+
+    async def select_poi(self, user_ctx, candidates, k):
+        return [candidate["poi_id"] for candidate in candidates[:k]]
+
+    async def order_route(self, user_ctx, nodes, matrix):
+        return [node["poi_id"] for node in nodes]
+
+
+def _install_stubs(places_latency: float) -> None:
+    settings.use_google_sources = True
+    settings.google_maps_api_key = "benchmark"
+    routes.get_gpt_client = _StubGPTClient
+
+    async def validate(*, items, on_candidate=None, **kwargs):
+        validated = []
+        async for poi in items:
+            await asyncio.sleep(places_latency)
+            title, lat, lng, category = next(entry for entry in _POIS if entry[0] == poi.title)
+            candidate = {"poi_id": title, "name": title, "lat": lat, "lng": lng, "category": category}
+            if on_candidate is not None:
+                await on_candidate(candidate)
+            validated.append(candidate)
+        return validated
+
+    google_poi.validate_brainstormed_poi = validate
+
+
+def _register(driver, email: str) -> dict[str, str]:
+    response = driver.request(
+        "POST", "/v1/register", json_body={"email": email, "password": "Benchmark123"}
+    )
+    assert response.status_code == 201, response.body
+    return {"authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def _check(response, status: int = 200):
+    assert response.status_code == status, (response.status_code, response.body)
+    return response
+
+
+def run(driver, iterations: int, trips: int) -> list[Result]:
+    run_id = uuid.uuid4().hex[:8]
+    headers = _register(driver, f"bench-{run_id}@example.com")
+    # Trips created by the create_trip scenario go to another user, so the
+    # listed collection stays at ``trips`` items.
+    writer_headers = _register(driver, f"bench-{run_id}-writer@example.com")
+    trip_ids = [
+        _check(driver.request("POST", "/v1/routes", json_body=_TRIP, headers=headers), 201).json()["id"]
+        for _ in range(trips)
+    ]
+
+    def register(idx: int) -> None:
+        _register(driver, f"bench-{run_id}-{idx}@example.com")
+
+    def login(idx: int) -> None:
+        body = {"email": f"bench-{run_id}@example.com", "password": "Benchmark123"}
+        _check(driver.request("POST", "/v1/login", json_body=body))
+
+    def create_trip(idx: int) -> None:
+        _check(driver.request("POST", "/v1/routes", json_body=_TRIP, headers=writer_headers), 201)
+
+    def list_trips(idx: int) -> None:
+        _check(driver.request("GET", "/v1/routes", headers=headers))
+
+    def get_trip(idx: int) -> None:
+        _check(driver.request("GET", f"/v1/routes/{trip_ids[idx % len(trip_ids)]}", headers=headers))
+
+    def generate(idx: int) -> None:
+        trip_id = trip_ids[idx % len(trip_ids)]
+        response = _check(driver.request("POST", f"/v1/routes/{trip_id}/generate", json_body={}, headers=headers))
+        job = job_queue.wait(uuid.UUID(response.json()["jobId"]), timeout=30)
+        assert job is not None and job.status == "succeeded", job
+
+    return [
+        measure("register", iterations, register),
+        measure("login", iterations, login),
+        measure("create_trip", iterations, create_trip),
+        measure("list_trips", iterations, list_trips),
+        measure("get_trip", iterations, get_trip),
+        # Enqueue plus waiting for the background job: end-to-end latency.
+        measure("generate", max(1, iterations // 4), generate),
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--driver", choices=("asgi", "testclient"), default="asgi")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--trips", type=int, default=20, help="trips owned by the benchmark user")
+    parser.add_argument("--places-latency-ms", type=float, default=0.0)
+    parser.add_argument("--save-baseline", nargs="?", const=BASELINE_PATH, type=Path)
+    parser.add_argument("--compare", nargs="?", const=BASELINE_PATH, type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    deps.reset_state()
+    _install_stubs(args.places_latency_ms / 1000)
+    job_queue.start()
+    driver = AsgiDriver(app) if args.driver == "asgi" else TestClientDriver(app)
+    try:
+        results = run(driver, args.iterations, args.trips)
+    finally:
+        driver.close()
+        job_queue.shutdown()
+
+    print(f"driver: {driver.name}")
+    print(format_table(results))
+    if args.save_baseline:
+        save_baseline(args.save_baseline, driver.name, results)
+        print(f"baseline written to {args.save_baseline}")
+    if args.compare:
+        regressions = compare(args.compare, results, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"no regressions beyond {args.tolerance:.0%} of {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
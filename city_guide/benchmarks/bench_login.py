@@ -0,0 +1,86 @@
+"""Login throughput, and event loop responsiveness while logins run.
+
+Concurrent logins go through ``Application.handle_request`` on one event
+loop while a probe requests ``/healthz`` every few milliseconds. With the
+key derivation inline the probe waits behind every hash; with the pool it
+keeps answering. Run from the repository root::
+
+    python -m city_guide.benchmarks.bench_login
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+_DB_DIR = tempfile.mkdtemp(prefix="city-guide-bench-")
+os.environ.setdefault("CITY_GUIDE_TESTING", "1")
+os.environ.setdefault("REQUIRE_POSTGRES", "0")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_DIR}/bench.db")
+
+from city_guide.app.core import deps
+from city_guide.app.core.passwords import password_hasher
+from city_guide.app.main import app
+
+from .harness import percentile
+
+_CREDENTIALS = {"email": "bench-login@example.com", "password": "Benchmark123"}
+
+
+async def _run(logins: int, concurrency: int) -> tuple[float, list[float]]:
+    remaining = logins
+    probes: list[float] = []
+    done = asyncio.Event()
+
+    async def login_worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            response = await app.handle_request("POST", "/v1/login", json_body=_CREDENTIALS)
+            assert response.status_code == 200, response.body
+
+    async def probe() -> None:
+        while not done.is_set():
+            started = time.perf_counter()
+            await app.handle_request("GET", "/healthz")
+            probes.append(time.perf_counter() - started)
+            await asyncio.sleep(0.005)
+
+    probe_task = asyncio.create_task(probe())
+    started = time.perf_counter()
+    await asyncio.gather(*(login_worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await probe_task
+    return elapsed, sorted(probes)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=password_hasher.workers or 4)
+    args = parser.parse_args()
+
+    deps.reset_state()
+    response = asyncio.run(app.handle_request("POST", "/v1/register", json_body=_CREDENTIALS))
+    assert response.status_code == 201, response.body
+    print(f"{password_hasher.algorithm} ({password_hasher.params()}), {os.cpu_count()} CPUs")
+    for label, workers in (("inline", 0), (f"pool x{args.workers}", args.workers)):
+        password_hasher.shutdown()
+        password_hasher.workers = workers
+        elapsed, probes = asyncio.run(_run(args.logins, args.concurrency))
+        print(
+            f"{label:<10} {args.logins / elapsed:7.1f} logins/s   "
+            f"healthz p50 {percentile(probes, 0.5) * 1000:7.2f} ms  "
+            f"p99 {percentile(probes, 0.99) * 1000:7.2f} ms  ({len(probes)} probes)"
+        )
+    password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
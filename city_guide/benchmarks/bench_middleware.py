@@ -0,0 +1,78 @@
+"""Per-request overhead of the middleware chain.
+
+Run from the repository root::
+
+    python -m city_guide.benchmarks.bench_middleware
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from city_guide.app.http import Application, Request, json_response
+from city_guide.app.middleware import (
+    CORSMiddleware,
+    ErrorMiddleware,
+    RequestIDMiddleware,
+    TimingMiddleware,
+)
+
+
+async def _passthrough(request: Request, call_next):
+    return await call_next(request)
+
+
+def _app(*middleware) -> Application:
+    app = Application()
+
+    @app.route("GET", "/ping")
+    def ping(_: Request):
+        return json_response({"ok": True})
+
+    for layer in middleware:
+        app.add_middleware(layer)
+    return app
+
+
+async def _per_request(app: Application, requests: int, repeats: int) -> float:
+    """Best per-request time over ``repeats`` runs; the minimum is least noisy."""
+
+    headers = {"origin": "https://example.com"}
+    for _ in range(1000):  # warm up
+        await app.handle_request("GET", "/ping", headers=headers)
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(requests):
+            await app.handle_request("GET", "/ping", headers=headers)
+        best = min(best, (time.perf_counter() - started) / requests)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    apps = {
+        "no middleware": _app(),
+        "4 pass-through": _app(*[_passthrough] * 4),
+        "built-in chain": _app(
+            RequestIDMiddleware(), TimingMiddleware(), CORSMiddleware(), ErrorMiddleware()
+        ),
+    }
+    timings = {
+        name: asyncio.run(_per_request(app, args.requests, args.repeats))
+        for name, app in apps.items()
+    }
+    bare = timings["no middleware"]
+    for name, seconds in timings.items():
+        overhead = (seconds - bare) * 1e6
+        print(f"{name:<16} {seconds * 1e6:8.2f} us/request  (+{overhead:.2f} us)")
+
+
+if __name__ == "__main__":
+    main()
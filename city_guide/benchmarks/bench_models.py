@@ -0,0 +1,143 @@
+"""Cost of validating brainstormed POIs with the bundled ``pydantic`` shim.
+
+Compares the compiled field plan against the shim's previous implementation,
+which walked ``__annotations__`` and resolved aliases on every instantiation,
+and per-item calls against the batch APIs. Run from the repository root::
+
+    python -m city_guide.benchmarks.bench_models
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from city_guide.app.schemas.poi import BrainstormedPOI
+from pydantic import UNSET, FieldInfo, ValidationError
+
+
+class _LegacyModel:
+    """The shim's ``BaseModel.__init__`` before field plans, kept for comparison."""
+
+    def __init__(self, **data: Any) -> None:
+        annotations = getattr(self.__class__, "__annotations__", {})
+        remaining = dict(data)
+        for name in annotations:
+            field_info = getattr(self.__class__, name, UNSET)
+            alias = None
+            default = UNSET
+            default_factory = None
+            if isinstance(field_info, FieldInfo):
+                alias = field_info.alias
+                default = field_info.default
+                default_factory = field_info.default_factory
+            else:
+                default = field_info
+
+            key = None
+            if alias and alias in remaining:
+                key = alias
+            elif name in remaining:
+                key = name
+
+            if key is not None:
+                value = remaining.pop(key)
+            else:
+                if default is not UNSET:
+                    value = default
+                elif default_factory is not None:
+                    value = default_factory()
+                else:
+                    raise ValidationError(f"Missing required field: {name}")
+
+            setattr(self, name, value)
+
+        for key, value in remaining.items():
+            setattr(self, key, value)
+
+    @classmethod
+    def model_validate(cls, data: Any) -> Any:
+        if isinstance(data, cls):
+            return data
+        if not isinstance(data, dict):
+            raise ValidationError("Model validation requires a mapping")
+        return cls(**data)
+
+
+class LegacyBrainstormedPOI(_LegacyModel):
+    title: str
+    city: str | None = None
+    country: str | None = None
+    category: str | None = None
+    description: str | None = None
+    priority: float | None = None
+
+
+def _items(count: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "title": f"Place {idx}",
+            "city": "Vilnius",
+            "country": "Lithuania",
+            "category": "museum",
+            "description": "A short description of the place.",
+            "priority": 0.5 + idx / (2 * count),
+        }
+        for idx in range(count)
+    ]
+
+
+def _per_batch(operation: Callable[[], object], batches: int, repeats: int) -> float:
+    """Best per-batch time over ``repeats`` runs; the minimum is least noisy."""
+
+    for _ in range(100):  # warm up
+        operation()
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(batches):
+            operation()
+        best = min(best, (time.perf_counter() - started) / batches)
+    return best
+
+
+def _bytes_per_instance(model: type, items: list[dict[str, Any]]) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [model.model_validate(item) for item in items]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return (used - 8 * len(instances)) / len(instances)  # minus the list's pointers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=30, help="POIs per brainstorm response")
+    parser.add_argument("--batches", type=int, default=2_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    items = _items(args.items)
+    print(f"{'model':<10} {'us/batch':>10} {'us/item':>9} {'bytes/item':>11}")
+    for name, model in (("legacy", LegacyBrainstormedPOI), ("compiled", BrainstormedPOI)):
+        seconds = _per_batch(lambda model=model: [model.model_validate(item) for item in items], args.batches, args.repeats)
+        size = _bytes_per_instance(model, _items(10_000))
+        print(f"{name:<10} {seconds * 1e6:10.2f} {seconds * 1e6 / len(items):9.3f} {size:11.0f}")
+
+    pois = BrainstormedPOI.model_validate_many(items)
+    batches = {
+        "validate per item": lambda: [BrainstormedPOI.model_validate(item) for item in items],
+        "model_validate_many": lambda: BrainstormedPOI.model_validate_many(items),
+        "dump per item": lambda: [poi.model_dump(by_alias=True) for poi in pois],
+        "model_dump_many": lambda: BrainstormedPOI.model_dump_many(pois, by_alias=True),
+    }
+    print()
+    print(f"{'batch of ' + str(len(items)):<20} {'us/batch':>10}")
+    for name, operation in batches.items():
+        print(f"{name:<20} {_per_batch(operation, args.batches, args.repeats) * 1e6:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Memory and serialization cost of loaded route points.
+
+Compares three in-memory forms of the same ``route_points`` rows: the plain
+dataclasses repositories used to build, the slotted ``RoutePoint`` and the
+columnar ``RoutePointBatch``. Run from the repository root::
+
+    python -m city_guide.benchmarks.bench_points
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import gc
+import json
+import os
+import time
+import tracemalloc
+import uuid
+from typing import Any, Callable
+
+# Importing the routes loads the settings; keep them off production services.
+os.environ.setdefault("CITY_GUIDE_TESTING", "1")
+os.environ.setdefault("REQUIRE_POSTGRES", "0")
+
+from city_guide.app.api.v1.routes import _serialize_point, _serialize_points
+from city_guide.app.db.entities import RoutePoint, RoutePointBatch
+
+LegacyRoutePoint = dataclasses.make_dataclass(
+    "LegacyRoutePoint", [(field.name, field.type) for field in dataclasses.fields(RoutePoint)]
+)
+
+
+def _rows(count: int) -> list[dict[str, Any]]:
+    route_id = str(uuid.uuid4())
+    categories = ("museum", "park", "church", "cafe")
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "route_id": route_id,
+            "poi_id": f"ChIJ{idx:023d}",
+            "name": f"Point of interest {idx}",
+            "lat": 54.68 + idx * 1e-5,
+            "lng": 25.28 + idx * 1e-5,
+            "category": categories[idx % len(categories)],
+            "order_index": idx,
+            "eta_min_walk": idx % 30,
+            "eta_min_drive": None,
+            "listen_sec": 90,
+            "source_poi_id": None,
+        }
+        for idx in range(count)
+    ]
+
+
+def _objects(model: type) -> Callable[[list[dict[str, Any]]], list[Any]]:
+    def build(rows: list[dict[str, Any]]) -> list[Any]:
+        return [
+            model(
+                id=uuid.UUID(row["id"]),
+                route_id=uuid.UUID(row["route_id"]),
+                poi_id=row["poi_id"],
+                name=row["name"],
+                lat=float(row["lat"]),
+                lng=float(row["lng"]),
+                category=row["category"],
+                order_index=int(row["order_index"]),
+                eta_min_walk=row.get("eta_min_walk"),
+                eta_min_drive=row.get("eta_min_drive"),
+                listen_sec=row.get("listen_sec"),
+                source_poi_id=row.get("source_poi_id"),
+            )
+            for row in rows
+        ]
+
+    return build
+
+
+def _retained_bytes(build: Callable[[list[dict[str, Any]]], Any], count: int) -> int:
+    """Memory still held once the rows the points came from are gone."""
+
+    gc.collect()
+    tracemalloc.start()
+    rows = _rows(count)
+    points = build(rows)
+    del rows
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del points
+    return retained
+
+
+def _best(operation: Callable[[], object], repeats: int) -> float:
+    operation()
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        operation()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    forms = {
+        "dataclass": (_objects(LegacyRoutePoint), lambda points: [_serialize_point(point) for point in points]),
+        "slots": (_objects(RoutePoint), lambda points: [_serialize_point(point) for point in points]),
+        "batch": (RoutePointBatch.from_rows, _serialize_points),
+    }
+    rows = _rows(args.points)
+    print(f"{args.points} points")
+    print(f"{'form':<10} {'bytes/point':>12} {'load ms':>8} {'dicts ms':>9} {'json ms':>8}")
+    for name, (build, serialize) in forms.items():
+        size = _retained_bytes(build, args.points) / args.points
+        load = _best(lambda build=build: build(rows), args.repeats)
+        points = build(rows)
+        dicts = _best(lambda serialize=serialize, points=points: serialize(points), args.repeats)
+        encoded = _best(lambda serialize=serialize, points=points: json.dumps(serialize(points)).encode(), args.repeats)
+        print(f"{name:<10} {size:12.0f} {load * 1e3:8.2f} {dicts * 1e3:9.2f} {encoded * 1e3:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Loading route points from SQLite: per-row dicts versus row mappers.
+
+Seeds one route with ``--points`` rows in a temporary SQLite file and times
+``Database.execute`` into the forms repositories build. Run from the
+repository root::
+
+    python -m city_guide.benchmarks.bench_rows
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+from typing import Any, Callable
+
+_DB_DIR = tempfile.mkdtemp(prefix="city-guide-bench-")
+os.environ.setdefault("CITY_GUIDE_TESTING", "1")
+os.environ.setdefault("REQUIRE_POSTGRES", "0")
+
+from city_guide.app.db.entities import RoutePoint, RoutePointBatch
+from city_guide.app.db.mapping import RowMapper
+from city_guide.app.db.storage import Database
+
+_SELECT = "SELECT * FROM route_points WHERE route_id = :route_id ORDER BY order_index"
+
+
+def _seed(database: Database, path: str, count: int) -> str:
+    database.reset()
+    route_id = str(uuid.uuid4())
+    rows = [
+        (
+            str(uuid.uuid4()),
+            route_id,
+            f"ChIJ{idx:023d}",
+            f"Point of interest {idx}",
+            54.68 + idx * 1e-5,
+            25.28 + idx * 1e-5,
+            ("museum", "park", "church")[idx % 3],
+            idx,
+            idx % 30,
+            None,
+            90,
+            None,
+        )
+        for idx in range(count)
+    ]
+    with sqlite3.connect(path) as connection:
+        connection.executemany("INSERT INTO route_points VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    return route_id
+
+
+def _dataclasses_from_dicts(rows: list[dict[str, Any]]) -> list[RoutePoint]:
+    """How repositories loaded points before batches and mappers."""
+
+    return [
+        RoutePoint(
+            id=uuid.UUID(row["id"]),
+            route_id=uuid.UUID(row["route_id"]),
+            poi_id=row["poi_id"],
+            name=row["name"],
+            lat=float(row["lat"]),
+            lng=float(row["lng"]),
+            category=row["category"],
+            order_index=int(row["order_index"]),
+            eta_min_walk=row.get("eta_min_walk"),
+            eta_min_drive=row.get("eta_min_drive"),
+            listen_sec=row.get("listen_sec"),
+            source_poi_id=row.get("source_poi_id"),
+        )
+        for row in rows
+    ]
+
+
+def _best(operation: Callable[[], object], repeats: int) -> float:
+    operation()
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        operation()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    path = os.path.join(_DB_DIR, "rows.db")
+    database = Database(f"sqlite:///{path}", testing=True)
+    params = {"route_id": _seed(database, path, args.points)}
+    point_mapper = RowMapper(RoutePoint)
+
+    def fetch(mapper: Any = None) -> Any:
+        return database.execute(_SELECT, params, fetchall=True, mapper=mapper)
+
+    loads = {
+        "dicts only": fetch,
+        "dicts -> dataclasses": lambda: _dataclasses_from_dicts(fetch()),
+        "dicts -> batch": lambda: RoutePointBatch.from_rows(fetch()),
+        "mapper -> dataclasses": lambda: fetch(point_mapper),
+        "mapper -> batch": lambda: fetch(RoutePointBatch.from_tuples),
+    }
+    print(f"{args.points} route points")
+    print(f"{'load':<24} {'ms':>8} {'us/row':>8}")
+    for name, load in loads.items():
+        seconds = _best(load, args.repeats)
+        print(f"{name:<24} {seconds * 1e3:8.2f} {seconds * 1e6 / args.points:8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Per-statement overhead of ``Database.execute`` with and without pooling.
+
+Runs the same indexed lookup repeatedly against a temporary SQLite file,
+once opening a connection per statement (pool size 0, as before pooling)
+and once reusing pooled connections whose statement cache stays warm. Run
+from the repository root::
+
+    python -m city_guide.benchmarks.bench_statements
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+import uuid
+
+_DB_DIR = tempfile.mkdtemp(prefix="city-guide-bench-")
+os.environ.setdefault("CITY_GUIDE_TESTING", "1")
+os.environ.setdefault("REQUIRE_POSTGRES", "0")
+
+from city_guide.app.db.storage import Database
+
+_SELECT = "SELECT * FROM users WHERE id = :id"
+
+
+def _per_statement(pool_size: int, statements: int, repeats: int) -> tuple[float, Database]:
+    database = Database(f"sqlite:///{_DB_DIR}/statements-{pool_size}.db", testing=True)
+    database._pool.size = pool_size
+    database.reset()
+    params = {"id": str(uuid.uuid4())}
+    database.execute(_SELECT, params, fetchone=True)
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(statements):
+            database.execute(_SELECT, params, fetchone=True)
+        best = min(best, (time.perf_counter() - started) / statements)
+    return best, database
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--statements", type=int, default=5_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'connections':<14} {'us/statement':>13} {'cache hits':>11} {'misses':>7}")
+    for name, size in (("per statement", 0), ("pooled", 8)):
+        seconds, database = _per_statement(size, args.statements, args.repeats)
+        stats = next(row for row in database.statements.stats() if row["sql"] == _SELECT)
+        print(f"{name:<14} {seconds * 1e6:13.2f} {stats['hits']:11d} {stats['misses']:7d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Cost of issuing and verifying signed access tokens.
+
+Run from the repository root::
+
+    python -m city_guide.benchmarks.bench_tokens
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import uuid
+from typing import Callable
+
+from city_guide.app.core import security
+
+
+def _per_call(operation: Callable[[], object], calls: int, repeats: int) -> float:
+    """Best per-call time over ``repeats`` runs; the minimum is least noisy."""
+
+    for _ in range(1000):  # warm up
+        operation()
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(calls):
+            operation()
+        best = min(best, (time.perf_counter() - started) / calls)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=50_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    user_id = uuid.uuid4()
+    token = security.create_access_token(user_id)
+    operations = {
+        "issue": lambda: security.create_access_token(user_id),
+        "verify": lambda: security.decode_access_token(token),
+    }
+    for name, operation in operations.items():
+        seconds = _per_call(operation, args.calls, args.repeats)
+        print(f"{name:<8} {seconds * 1e6:8.2f} us/token")
+
+
+if __name__ == "__main__":
+    main()
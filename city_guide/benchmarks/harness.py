@@ -0,0 +1,221 @@
+"""Drivers, latency statistics and baseline comparison for the benchmarks."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import urlencode
+
+from city_guide.app.http import Application, TestClient
+
+
+@dataclass
+class Reply:
+    status_code: int
+    body: Any
+
+    def json(self) -> Any:
+        return self.body
+
+
+class AsgiDriver:
+    """Drive ``Application.__call__`` like an ASGI server would.
+
+    Requests go through header decoding, body parsing, compression and
+    streaming exactly as under uvicorn, minus the sockets. All requests share
+    one event loop, as they would in a worker.
+    """
+
+    name = "asgi"
+
+    def __init__(self, app: Application) -> None:
+        self.app = app
+        self.loop = asyncio.new_event_loop()
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        json_body: Any = None,
+        headers: dict[str, str] | None = None,
+        params: dict[str, Any] | None = None,
+    ) -> Reply:
+        return self.loop.run_until_complete(self._request(method, path, json_body, headers, params))
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        json_body: Any,
+        headers: dict[str, str] | None,
+        params: dict[str, Any] | None,
+    ) -> Reply:
+        body = json.dumps(json_body).encode() if json_body is not None else b""
+        raw_headers = [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()]
+        if body:
+            raw_headers.append((b"content-type", b"application/json"))
+        scope = {
+            "type": "http",
+            "method": method,
+            "path": path,
+            "headers": raw_headers,
+            "query_string": urlencode(params or {}).encode(),
+        }
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        never = asyncio.Event()
+
+        async def receive() -> dict[str, Any]:
+            if messages:
+                return messages.pop()
+            await never.wait()  # the client stays connected
+            return {"type": "http.disconnect"}
+
+        status = 0
+        chunks: list[bytes] = []
+        content_type = ""
+
+        async def send(message: dict[str, Any]) -> None:
+            nonlocal status, content_type
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                content_type = dict(message["headers"]).get(b"content-type", b"").decode()
+            else:
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        payload: Any = b"".join(chunks)
+        if content_type.startswith("application/json") and payload:
+            payload = json.loads(payload)
+        return Reply(status, payload)
+
+    def close(self) -> None:
+        self.loop.close()
+
+
+class TestClientDriver:
+    """Drive the app through :class:`TestClient` (``handle_request``)."""
+
+    __test__ = False  # not a pytest test class
+    name = "testclient"
+
+    def __init__(self, app: Application) -> None:
+        self.client = TestClient(app)
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        json_body: Any = None,
+        headers: dict[str, str] | None = None,
+        params: dict[str, Any] | None = None,
+    ) -> Reply:
+        response = self.client.request(method, path, json=json_body, headers=headers, params=params)
+        return Reply(response.status_code, response.body)
+
+    def close(self) -> None:
+        pass
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted ``samples``."""
+
+    if not samples:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(samples)))
+    return samples[rank - 1]
+
+
+@dataclass
+class Result:
+    name: str
+    requests: int
+    seconds: float
+    p50: float
+    p95: float
+    p99: float
+
+    @property
+    def rps(self) -> float:
+        return self.requests / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> dict[str, float]:
+        return {
+            "requests": self.requests,
+            "p50_ms": round(self.p50 * 1000, 3),
+            "p95_ms": round(self.p95 * 1000, 3),
+            "p99_ms": round(self.p99 * 1000, 3),
+            "rps": round(self.rps, 1),
+        }
+
+
+def measure(name: str, iterations: int, operation: Callable[[int], None], warmup: int = 5) -> Result:
+    """Run ``operation(i)`` ``iterations`` times and summarize its latency."""
+
+    for idx in range(warmup):
+        operation(-1 - idx)
+    latencies: list[float] = []
+    started = time.perf_counter()
+    for idx in range(iterations):
+        begin = time.perf_counter()
+        operation(idx)
+        latencies.append(time.perf_counter() - begin)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return Result(
+        name,
+        iterations,
+        elapsed,
+        percentile(latencies, 0.50),
+        percentile(latencies, 0.95),
+        percentile(latencies, 0.99),
+    )
+
+
+def format_table(results: list[Result]) -> str:
+    lines = [f"{'scenario':<24}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}"]
+    for result in results:
+        lines.append(
+            f"{result.name:<24}{result.p50 * 1000:>10.2f}{result.p95 * 1000:>10.2f}"
+            f"{result.p99 * 1000:>10.2f}{result.rps:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def save_baseline(path: Path, driver: str, results: list[Result]) -> None:
+    data = {
+        "driver": driver,
+        "scenarios": {result.name: result.to_dict() for result in results},
+    }
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+
+
+def compare(path: Path, results: list[Result], tolerance: float) -> list[str]:
+    """Scenarios slower than the baseline by more than ``tolerance``.
+
+    A scenario regresses when its p95 latency grew, or its throughput
+    dropped, by more than the given fraction.
+    """
+
+    baseline = json.loads(path.read_text())["scenarios"]
+    regressions: list[str] = []
+    for result in results:
+        reference = baseline.get(result.name)
+        if reference is None:
+            continue
+        current = result.to_dict()
+        if current["p95_ms"] > reference["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{result.name}: p95 {current['p95_ms']:.2f} ms vs {reference['p95_ms']:.2f} ms"
+            )
+        if current["rps"] < reference["rps"] * (1 - tolerance):
+            regressions.append(
+                f"{result.name}: {current['rps']:.1f} req/s vs {reference['rps']:.1f} req/s"
+            )
+    return regressions
@@ -7,6 +7,8 @@ import pytest
 os.environ.setdefault("CITY_GUIDE_TESTING", "1")
 os.environ.setdefault("REQUIRE_POSTGRES", "0")
 os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+# Production KDF cost would make every registration in the suite slow.
+os.environ.setdefault("PASSWORD_SCRYPT_N", "1024")
 
 from city_guide.app.core import deps
 from city_guide.app.http import TestClient
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from city_guide.app.core.config import settings
+
+ADMIN = {"x-admin-token": "admin-secret"}
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", ADMIN["x-admin-token"])
+
+
+def test_admin_endpoints_require_the_token(monkeypatch, client):
+    monkeypatch.setattr(settings, "admin_token", None)
+    assert client.get("/v1/admin/sql", headers=ADMIN).status_code == 404
+    monkeypatch.setattr(settings, "admin_token", "other")
+    assert client.get("/v1/admin/sql", headers=ADMIN).status_code == 403
+
+
+def _busy_loop_for_sampling(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_stack_sampler_returns_collapsed_stacks(admin_token, client):
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_loop_for_sampling, args=(stop,), name="busy-worker")
+    worker.start()
+    try:
+        response = client.post("/v1/admin/profile/stacks", params={"seconds": 0.2}, headers=ADMIN)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    lines = response.body.splitlines()
+    busy = [line for line in lines if line.startswith("busy-worker;")]
+    assert busy and "test_admin.py:_busy_loop_for_sampling" in busy[0]
+    _, count = busy[0].rsplit(" ", 1)
+    assert int(count) > 0
+
+
+def test_request_profile_is_captured_for_armed_request_id(admin_token, client):
+    response = client.post("/v1/admin/profile/requests", json={"requestId": "slow-1"}, headers=ADMIN)
+    assert response.status_code == 202
+    assert client.get("/v1/admin/profile/requests/slow-1", headers=ADMIN).status_code == 404
+
+    client.get("/healthz", headers={"x-request-id": "other"})
+    client.get("/healthz", headers={"x-request-id": "slow-1"})
+
+    response = client.get("/v1/admin/profile/requests/slow-1", headers=ADMIN)
+    assert response.status_code == 200
+    assert "cumulative" in response.body and "healthcheck" in response.body
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from city_guide.app.core.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    get_breaker,
+)
+from city_guide.app.schemas.poi import BrainstormedPOI
+from city_guide.app.services import google_poi
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _breaker(clock: _Clock) -> CircuitBreaker:
+    return CircuitBreaker(
+        "test",
+        failure_rate_threshold=0.5,
+        window_size=4,
+        minimum_calls=4,
+        open_seconds=10.0,
+        clock=clock,
+    )
+
+
+def test_breaker_opens_on_failure_rate_and_recovers():
+    clock = _Clock()
+    breaker = _breaker(clock)
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now = 10.0
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_failure_reopens():
+    clock = _Clock()
+    breaker = _breaker(clock)
+    for _ in range(4):
+        breaker.record_failure()
+    clock.now = 10.0
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+
+def test_cancelled_trial_call_releases_half_open_slot():
+    clock = _Clock()
+    breaker = _breaker(clock)
+    for _ in range(4):
+        breaker.record_failure()
+    clock.now = 10.0
+
+    async def trial() -> None:
+        task = asyncio.ensure_future(breaker.call(asyncio.sleep, 10))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(trial())
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_ignored_errors_do_not_trip_breaker():
+    breaker = _breaker(_Clock())
+
+    async def broken():
+        raise ValueError("bad payload")
+
+    for _ in range(4):
+        with pytest.raises(ValueError):
+            asyncio.run(breaker.call(broken, is_failure=lambda exc: False))
+    assert breaker.state == CLOSED
+
+
+def test_open_places_circuit_skips_lookups(monkeypatch):
+    monkeypatch.setattr(google_poi.settings, "use_google_sources", True)
+    calls = []
+
+    class _Client:
+        async def get(self, *args, **kwargs):
+            calls.append(kwargs)
+            return SimpleNamespace(raise_for_status=lambda: None, json=lambda: {"status": "OK"})
+
+    breaker = get_breaker(google_poi.PLACES_BREAKER)
+    for _ in range(breaker.window_size):
+        breaker.record_failure()
+    items = [BrainstormedPOI(title="MO Museum"), BrainstormedPOI(title="Gediminas Tower")]
+
+    result = asyncio.run(
+        google_poi.validate_brainstormed_poi(client=_Client(), api_key="key", items=items)
+    )
+    assert result == []
+    assert calls == []
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import tenacity
+from city_guide.app.core.circuit_breaker import CLOSED, OPEN, CircuitBreaker
+from city_guide.app.core.config import settings
+from city_guide.app.schemas.poi import BrainstormedPOI, BrainstormPOIRequest
+from city_guide.app.services import google_poi
+from city_guide.app.services.gpt_client import GPTClient, is_transient_error
+from openai import APIConnectionError, APIStatusError
+
+
+def _text_response(text: str):
+    content = SimpleNamespace(text=text)
+    return SimpleNamespace(output=[SimpleNamespace(content=[content])])
+
+
+class _ScriptedResponses:
+    def __init__(self, outcomes):
+        self._outcomes = list(outcomes)
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        outcome = self._outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        if isinstance(outcome, float):
+            await asyncio.sleep(outcome)
+            return _text_response("{}")
+        return _text_response(outcome)
+
+
+def _client_with(outcomes) -> tuple[GPTClient, _ScriptedResponses]:
+    gpt = GPTClient()
+    responses = _ScriptedResponses(outcomes)
+    gpt.client = SimpleNamespace(responses=responses)
+    return gpt, responses
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "gpt_retry_initial_wait_sec", 0.0)
+    monkeypatch.setattr(settings, "gpt_retry_max_wait_sec", 0.0)
+    monkeypatch.setattr(settings, "gpt_retry_jitter_sec", 0.0)
+    monkeypatch.setattr(settings, "gpt_max_attempts", 3)
+    monkeypatch.setattr(settings, "gpt_latency_budget_sec", 5.0)
+
+
+def test_completion_retries_transient_errors():
+    gpt, responses = _client_with(
+        [APIConnectionError("reset"), APIStatusError("busy", status_code=503), json.dumps({"ok": 1})]
+    )
+    data = asyncio.run(gpt._completion([{"role": "user", "content": "hi"}]))
+    assert data == {"ok": 1}
+    assert responses.calls == 3
+
+
+def test_completion_does_not_retry_decode_errors():
+    gpt, responses = _client_with(["not json", json.dumps({"ok": 1})])
+    with pytest.raises(json.JSONDecodeError):
+        asyncio.run(gpt._completion([{"role": "user", "content": "hi"}]))
+    assert responses.calls == 1
+
+
+def test_completion_respects_latency_budget(monkeypatch):
+    monkeypatch.setattr(settings, "gpt_latency_budget_sec", 0.05)
+    gpt, responses = _client_with([1.0, 1.0, 1.0])
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(gpt._completion([{"role": "user", "content": "hi"}]))
+    assert responses.calls == 1
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _run_failing(retrying: tenacity.AsyncRetrying, clock: _FakeClock) -> int:
+    attempts = 0
+
+    async def run() -> None:
+        nonlocal attempts
+        async for attempt in retrying:
+            with attempt:
+                attempts += 1
+                clock.now += 0.1  # the call itself takes time too
+                raise APIConnectionError("reset")
+
+    with pytest.raises(APIConnectionError):
+        asyncio.run(run())
+    return attempts
+
+
+def test_retrying_sleeps_with_exponential_backoff_and_jitter(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(tenacity, "time", clock)
+    retrying = tenacity.AsyncRetrying(
+        stop=tenacity.stop_after_attempt(6),
+        wait=tenacity.wait_exponential_jitter(initial=0.5, max=8, jitter=1),
+        reraise=True,
+        sleep=clock.sleep,
+    )
+    assert _run_failing(retrying, clock) == 6
+    assert len(clock.sleeps) == 5
+    for idx, slept in enumerate(clock.sleeps):
+        base = 0.5 * 2**idx
+        assert base <= slept <= min(base + 1, 8)
+
+    # With the jitter pinned to its upper bound the sequence is exact.
+    monkeypatch.setattr(tenacity.random, "uniform", lambda low, high: high)
+    clock.sleeps.clear()
+    assert _run_failing(retrying, clock) == 6
+    assert clock.sleeps == [1.5, 2.0, 3.0, 5.0, 8.0]
+
+
+def test_retrying_stops_before_crossing_the_deadline(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(tenacity, "time", clock)
+    retrying = tenacity.AsyncRetrying(
+        stop=tenacity.stop_after_attempt(10) | tenacity.stop_before_delay(2.5),
+        wait=tenacity.wait_fixed(1),
+        reraise=True,
+        sleep=clock.sleep,
+    )
+    # 0.1 + 1 + 0.1 + 1 + 0.1 = 2.3s spent; another 1s sleep would cross 2.5s.
+    assert _run_failing(retrying, clock) == 3
+    assert clock.sleeps == [1, 1]
+    assert clock.now < 2.5
+
+
+def test_transient_error_classification():
+    assert is_transient_error(asyncio.TimeoutError())
+    assert is_transient_error(APIStatusError("throttled", status_code=429))
+    assert not is_transient_error(APIStatusError("bad request", status_code=400))
+    assert not is_transient_error(ValueError("bug"))
+
+
+class _StreamingResponses:
+    def __init__(self, chunks, log, final_event="response.completed"):
+        self._chunks = chunks
+        self._log = log
+        self._final_event = final_event
+
+    async def create(self, **kwargs):
+        assert kwargs.get("stream") is True
+        return self._events()
+
+    async def _events(self):
+        try:
+            for chunk in self._chunks:
+                self._log.append(("delta", chunk))
+                await asyncio.sleep(0)
+                yield SimpleNamespace(type="response.output_text.delta", delta=chunk)
+            yield SimpleNamespace(type=self._final_event)
+        finally:
+            self._log.append(("closed", None))
+
+
+def test_stream_brainstorm_yields_items_incrementally():
+    document = json.dumps(
+        {"items": [{"title": "MO Museum", "priority": 0.9}, {"title": "Gediminas Tower"}]}
+    )
+    chunks = [document[i : i + 7] for i in range(0, len(document), 7)]
+    log: list = []
+    gpt = GPTClient()
+    gpt.client = SimpleNamespace(responses=_StreamingResponses(chunks, log))
+
+    async def consume():
+        received = []
+        async for poi in gpt.stream_brainstorm_poi(BrainstormPOIRequest()):
+            received.append((poi.title, len(log)))
+        return received
+
+    received = asyncio.run(consume())
+    assert [title for title, _ in received] == ["MO Museum", "Gediminas Tower"]
+    # The first item is handed out before the model finished streaming.
+    assert received[0][1] < len(chunks)
+
+
+def test_stream_brainstorm_closes_stream_when_limit_reached(monkeypatch):
+    monkeypatch.setattr(settings, "brainstorm_poi_max_items", 1)
+    document = json.dumps({"items": [{"title": f"POI {idx}"} for idx in range(20)]})
+    chunks = [document[i : i + 5] for i in range(0, len(document), 5)]
+    log: list = []
+    gpt = GPTClient()
+    gpt.client = SimpleNamespace(responses=_StreamingResponses(chunks, log))
+
+    async def consume():
+        titles = [poi.title async for poi in gpt.stream_brainstorm_poi(BrainstormPOIRequest())]
+        return titles, list(log)
+
+    titles, log_at_return = asyncio.run(consume())
+    assert titles == ["POI 0"]
+    assert log_at_return[-1] == ("closed", None)
+    assert len(log_at_return) - 1 < len(chunks)
+
+
+@pytest.mark.parametrize("streamed", [True, False])
+def test_malformed_brainstorm_items_are_skipped(monkeypatch, streamed):
+    monkeypatch.setattr(settings, "gpt_stream_brainstorm", streamed)
+    items = [{"title": "MO Museum"}, {"city": "Vilnius"}, "junk", {"title": "Tower"}]
+    document = json.dumps({"items": items})
+    if streamed:
+        gpt = GPTClient()
+        gpt.client = SimpleNamespace(responses=_StreamingResponses([document], []))
+    else:
+        gpt, _ = _client_with([document])
+
+    async def consume():
+        return [poi.title async for poi in gpt.stream_brainstorm_poi(BrainstormPOIRequest())]
+
+    assert asyncio.run(consume()) == ["MO Museum", "Tower"]
+
+
+def test_stream_failures_count_against_circuit():
+    gpt = GPTClient()
+    gpt.breaker = CircuitBreaker("openai-test", window_size=2, minimum_calls=2)
+    log: list = []
+    gpt.client = SimpleNamespace(
+        responses=_StreamingResponses(['{"items": [{"title": "A"}'], log, "response.failed")
+    )
+
+    async def consume():
+        return [poi.title async for poi in gpt.stream_brainstorm_poi(BrainstormPOIRequest())]
+
+    assert asyncio.run(consume()) == ["A"]
+    assert gpt.breaker.state == CLOSED
+    assert asyncio.run(consume()) == ["A"]
+    assert gpt.breaker.state == OPEN
+
+
+def test_places_lookups_overlap_brainstorm_stream(monkeypatch):
+    monkeypatch.setattr(settings, "use_google_sources", True)
+    events: list[str] = []
+
+    async def brainstorm():
+        for title in ("MO Museum", "Gediminas Tower"):
+            events.append(f"brainstorm:{title}")
+            yield BrainstormedPOI(title=title)
+            await asyncio.sleep(0.01)
+        events.append("brainstorm:done")
+
+    class _Client:
+        async def get(self, url, params):
+            events.append(f"lookup:{params['query']}")
+            place = {"place_id": params["query"], "geometry": {"location": {"lat": 1, "lng": 2}}}
+            return SimpleNamespace(
+                raise_for_status=lambda: None,
+                json=lambda: {"status": "OK", "results": [place]},
+            )
+
+    result = asyncio.run(
+        google_poi.validate_brainstormed_poi(client=_Client(), api_key="key", items=brainstorm())
+    )
+    assert [candidate["poi_id"] for candidate in result] == ["MO Museum", "Gediminas Tower"]
+    assert events.index("lookup:MO Museum") < events.index("brainstorm:done")
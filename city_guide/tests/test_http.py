@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import time
+import zlib
+
+from city_guide.app import compression
+from city_guide.app.http import (
+    Application,
+    Response,
+    StreamingResponse,
+    TestClient,
+    json_response,
+    json_stream_response,
+)
+from city_guide.app.middleware import (
+    CORSMiddleware,
+    ErrorMiddleware,
+    RequestIDMiddleware,
+    TimingMiddleware,
+    current_request_id,
+)
+
+
+def _scope(path: str, method: str = "GET") -> dict:
+    return {"type": "http", "method": method, "path": path, "headers": [], "query_string": b""}
+
+
+def test_streaming_response_is_sent_in_chunks():
+    app = Application()
+
+    @app.route("GET", "/stream")
+    def stream(request):
+        async def body():
+            for idx in range(3):
+                yield f"chunk-{idx}\n".encode()
+
+        return StreamingResponse(body(), media_type="text/plain")
+
+    async def run() -> list[dict]:
+        sent: list[dict] = []
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.Event().wait()  # client stays connected
+
+        async def send(message):
+            sent.append(message)
+
+        await app(_scope("/stream"), receive, send)
+        return sent
+
+    sent = asyncio.run(run())
+    start, *chunks, last = sent
+    assert start["type"] == "http.response.start" and start["status"] == 200
+    assert (b"content-type", b"text/plain") in start["headers"]
+    assert [message["body"] for message in chunks] == [b"chunk-0\n", b"chunk-1\n", b"chunk-2\n"]
+    assert all(message["more_body"] for message in chunks)
+    assert last == {"type": "http.response.body", "body": b"", "more_body": False}
+
+
+def test_streaming_response_stops_on_client_disconnect():
+    app = Application()
+    produced: list[int] = []
+    state = {"closed": False}
+
+    @app.route("GET", "/stream")
+    def stream(request):
+        async def body():
+            try:
+                idx = 0
+                while True:
+                    produced.append(idx)
+                    yield b"tick\n"
+                    idx += 1
+                    await asyncio.sleep(0.01)
+            finally:
+                state["closed"] = True
+
+        return StreamingResponse(body(), media_type="text/plain")
+
+    async def run() -> list[dict]:
+        sent: list[dict] = []
+        messages = asyncio.Queue()
+        messages.put_nowait({"type": "http.request", "body": b"", "more_body": False})
+
+        async def send(message):
+            sent.append(message)
+            if len(sent) == 3:
+                messages.put_nowait({"type": "http.disconnect"})
+
+        await asyncio.wait_for(app(_scope("/stream"), messages.get, send), 2)
+        return sent
+
+    sent = asyncio.run(run())
+    assert state["closed"]
+    assert all(message.get("more_body", True) for message in sent[1:])
+    assert len(produced) <= 4
+
+
+def test_json_stream_response_serializes_items_one_by_one():
+    app = Application()
+    closed: list[bool] = []
+
+    def rows():
+        try:
+            for idx in range(3):
+                yield {"id": idx}
+        finally:
+            closed.append(True)
+
+    @app.route("GET", "/items")
+    def items(request):
+        return json_stream_response(rows(), serialize=lambda row: {**row, "seen": True})
+
+    async def run() -> list[dict]:
+        sent: list[dict] = []
+        messages = asyncio.Queue()
+        messages.put_nowait({"type": "http.request", "body": b"", "more_body": False})
+
+        async def send(message):
+            sent.append(message)
+
+        await asyncio.wait_for(app(_scope("/items"), messages.get, send), 2)
+        return sent
+
+    sent = asyncio.run(run())
+    bodies = [message["body"] for message in sent[1:]]
+    assert len(bodies) == 6  # "[", three items, "]" and the final empty body
+    assert json.loads(b"".join(bodies)) == [{"id": idx, "seen": True} for idx in range(3)]
+    assert closed == [True]
+
+
+def test_sync_stream_is_closed_when_client_disconnects():
+    app = Application()
+    state = {"closed": False, "produced": 0}
+
+    def rows():
+        try:
+            while True:
+                state["produced"] += 1
+                time.sleep(0.005)
+                yield {"n": state["produced"]}
+        finally:
+            state["closed"] = True
+
+    @app.route("GET", "/items")
+    def items(request):
+        return json_stream_response(rows())
+
+    async def run() -> None:
+        messages = asyncio.Queue()
+        messages.put_nowait({"type": "http.request", "body": b"", "more_body": False})
+        sent: list[dict] = []
+
+        async def send(message):
+            sent.append(message)
+            if len(sent) == 4:
+                messages.put_nowait({"type": "http.disconnect"})
+
+        await asyncio.wait_for(app(_scope("/items"), messages.get, send), 2)
+
+    asyncio.run(run())
+    assert state["closed"]
+    assert state["produced"] < 10
+
+
+def _request(app: Application, path: str, headers: list[tuple[bytes, bytes]]) -> list[dict]:
+    async def run() -> list[dict]:
+        sent: list[dict] = []
+        messages = asyncio.Queue()
+        messages.put_nowait({"type": "http.request", "body": b"", "more_body": False})
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {**_scope(path), "headers": headers}
+        await asyncio.wait_for(app(scope, messages.get, send), 2)
+        return sent
+
+    return asyncio.run(run())
+
+
+def test_accept_encoding_negotiation():
+    assert compression.negotiate("gzip, deflate", ("br", "gzip")) == "gzip"
+    assert compression.negotiate("gzip;q=0.5, br", ("br", "gzip")) == "br"
+    assert compression.negotiate("br;q=0, *;q=0.1", ("br", "gzip")) == "gzip"
+    assert compression.negotiate("identity", ("br", "gzip")) is None
+    assert compression.negotiate(None) is None
+    assert not compression.is_compressible("image/png")
+    assert compression.is_compressible("application/json; charset=utf-8")
+
+
+def test_large_json_bodies_are_gzipped_above_threshold():
+    app = Application()
+    app.enable_compression(min_size=100, offload_size=1024)
+    payload = [{"name": f"Point {idx}", "lat": 54.68, "lng": 25.28} for idx in range(100)]
+
+    @app.route("GET", "/big")
+    def big(request):
+        return json_response(payload)
+
+    @app.route("GET", "/small")
+    def small(request):
+        return json_response({"ok": True})
+
+    start, body = _request(app, "/big", [(b"accept-encoding", b"gzip;q=0.8, identity")])
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"accept-encoding"
+    # Large enough to be compressed in a worker thread; the output is the same.
+    assert json.loads(gzip.decompress(body["body"])) == payload
+
+    start, body = _request(app, "/small", [(b"accept-encoding", b"gzip")])
+    assert b"content-encoding" not in dict(start["headers"])
+    assert json.loads(body["body"]) == {"ok": True}
+
+    start, body = _request(app, "/big", [])
+    assert b"content-encoding" not in dict(start["headers"])
+
+
+def test_streaming_responses_are_compressed_per_chunk():
+    app = Application()
+    app.enable_compression(min_size=100)
+
+    @app.route("GET", "/items")
+    def items(request):
+        return json_stream_response({"n": idx} for idx in range(50))
+
+    @app.route("GET", "/events")
+    def events(request):
+        async def body():
+            yield b"event: ping\ndata: {}\n\n"
+
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+    start, *chunks = _request(app, "/items", [(b"accept-encoding", b"gzip")])
+    assert dict(start["headers"])[b"content-encoding"] == b"gzip"
+    data = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    # Every chunk is flushed, so each one decodes on its own as it arrives.
+    assert data.decompress(chunks[0]["body"]) == b"["
+    assert data.decompress(chunks[1]["body"]) == b'{"n": 0}'
+    rest = b"".join(chunk["body"] for chunk in chunks[2:])
+    assert json.loads(b'[{"n": 0}' + data.decompress(rest)) == [{"n": idx} for idx in range(50)]
+
+    start, chunk, _ = _request(app, "/events", [(b"accept-encoding", b"gzip")])
+    assert b"content-encoding" not in dict(start["headers"])
+    assert chunk["body"].startswith(b"event: ping")
+
+
+def test_middleware_runs_in_order_and_can_short_circuit():
+    app = Application()
+    calls: list[str] = []
+
+    def layer(name):
+        async def middleware(request, call_next):
+            calls.append(f"{name}:in")
+            if request.path == "/blocked" and name == "outer":
+                return Response(403, {"detail": "blocked"})
+            response = await call_next(request)
+            calls.append(f"{name}:out")
+            return response
+
+        return middleware
+
+    @app.route("GET", "/ok")
+    def ok(request):
+        calls.append("handler")
+        return json_response({"ok": True})
+
+    app.add_middleware(layer("outer"))
+    app.add_middleware(layer("inner"))
+    client = TestClient(app)
+
+    assert client.get("/ok").status_code == 200
+    assert calls == ["outer:in", "inner:in", "handler", "inner:out", "outer:out"]
+    calls.clear()
+    assert client.get("/blocked").status_code == 403
+    assert calls == ["outer:in"]
+
+
+def test_builtin_middlewares():
+    app = Application()
+    seen: dict = {}
+
+    @app.route("GET", "/ok")
+    def ok(request):
+        seen["request_id"] = current_request_id()
+        return json_response({"ok": True})
+
+    @app.route("GET", "/missing")
+    def missing(request):
+        raise KeyError("no such thing")
+
+    @app.route("GET", "/boom")
+    def boom(request):
+        raise RuntimeError("bug")
+
+    timings: list[float] = []
+    app.add_middleware(RequestIDMiddleware())
+    app.add_middleware(TimingMiddleware(on_timing=lambda req, resp, elapsed: timings.append(elapsed)))
+    app.add_middleware(CORSMiddleware(allow_origins=["https://app.example"]))
+    app.add_middleware(ErrorMiddleware({LookupError: 404}))
+    client = TestClient(app)
+
+    response = client.get("/ok", headers={"x-request-id": "abc-123", "origin": "https://app.example"})
+    assert response.headers["x-request-id"] == seen["request_id"] == "abc-123"
+    assert response.headers["access-control-allow-origin"] == "https://app.example"
+    assert response.headers["server-timing"].startswith("app;dur=")
+    assert len(timings) == 1
+
+    response = client.get("/ok", headers={"x-request-id": "bad id\n", "origin": "https://evil.example"})
+    assert len(response.headers["x-request-id"]) == 32
+    assert "access-control-allow-origin" not in response.headers
+
+    preflight = client.request("OPTIONS", "/ok", headers={"origin": "https://app.example"})
+    assert preflight.status_code == 204
+    assert "OPTIONS" in preflight.headers["access-control-allow-methods"]
+
+    assert client.get("/missing").status_code == 404
+    response = client.get("/boom")
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Internal Server Error"}
+    assert "x-request-id" in response.headers
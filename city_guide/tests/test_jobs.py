@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import uuid
+
+from city_guide.app.services.jobs import (
+    FAILED,
+    QUEUED,
+    SUCCEEDED,
+    DatabaseJobStore,
+    Job,
+    JobQueue,
+    MemoryJobStore,
+)
+
+
+def test_job_queue_runs_handlers_with_bounded_concurrency():
+    queue = JobQueue(concurrency=2, store=MemoryJobStore())
+    running = 0
+    peak = 0
+
+    async def handler(job: Job) -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        if job.payload.get("fail"):
+            raise ValueError("boom")
+
+    queue.register("work", handler)
+    try:
+        jobs = [queue.enqueue("work", f"res-{idx}", {"fail": idx == 0}) for idx in range(5)]
+        finished = [queue.wait(job.id, timeout=5) for job in jobs]
+    finally:
+        queue.shutdown()
+
+    assert [job.status for job in finished] == [FAILED] + [SUCCEEDED] * 4
+    assert finished[0].error == "boom"
+    assert peak == 2
+    assert queue.latest_for("res-1").status == SUCCEEDED
+
+
+def test_database_store_recovers_only_jobs_with_expired_lease():
+    store = DatabaseJobStore(lease_seconds=60)
+    job = Job(id=uuid.uuid4(), kind="work", resource_id="route-1", payload={"n": 1})
+    store.add(job)
+    assert store.claim(job)
+
+    # Another worker starting up must not steal a job whose lease is alive.
+    assert DatabaseJobStore(lease_seconds=60).pending() == []
+
+    restarted = DatabaseJobStore(lease_seconds=0)
+    pending = restarted.pending()
+    assert [(item.id, item.status, item.payload) for item in pending] == [(job.id, QUEUED, {"n": 1})]
+    assert restarted.claim(pending[0])
+    assert not DatabaseJobStore().claim(pending[0])
+
+
+def test_database_store_remembers_resources_without_jobs():
+    store = DatabaseJobStore()
+    assert store.latest_for("route-1") is None
+
+    # A job another worker adds shows up only once the remembered miss expires.
+    other = Job(id=uuid.uuid4(), kind="work", resource_id="route-1", payload={})
+    DatabaseJobStore().add(other)
+    assert store.latest_for("route-1") is None
+    store.clear()
+    assert store.latest_for("route-1").id == other.id
+
+    assert store.latest_for("route-2") is None
+    own = Job(id=uuid.uuid4(), kind="work", resource_id="route-2", payload={})
+    store.add(own)
+    assert store.latest_for("route-2") is own
+
+
+def test_durable_queue_requeues_jobs_interrupted_by_shutdown():
+    store = DatabaseJobStore(lease_seconds=0.03)
+    queue = JobQueue(concurrency=1, store=store)
+    started = threading.Event()
+    beats: list[str] = []
+
+    async def handler(job: Job) -> None:
+        started.set()
+        await asyncio.sleep(10)
+
+    original_heartbeat = store.heartbeat
+
+    def heartbeat(job: Job) -> None:
+        beats.append(str(job.id))
+        original_heartbeat(job)
+
+    store.heartbeat = heartbeat
+    queue.register("work", handler)
+    job = queue.enqueue("work", "route-1", {})
+    assert started.wait(5)
+    time.sleep(0.05)
+    queue.shutdown()
+
+    assert beats
+    assert job.status == QUEUED
+    assert [item.id for item in DatabaseJobStore().pending()] == [job.id]
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import threading
+
+from city_guide.app.core.metrics import MetricsRegistry
+
+
+def test_counter_shards_sum_across_threads():
+    metrics = MetricsRegistry()
+    counter = metrics.counter("work_total", "Units of work.", ("kind",))
+
+    def work():
+        for _ in range(1000):
+            counter.labels("a").inc()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.labels("b").inc(2.5)
+
+    assert counter.labels("a").value() == 4000
+    rendered = metrics.render()
+    assert "# TYPE work_total counter" in rendered
+    assert 'work_total{kind="a"} 4000' in rendered
+    assert 'work_total{kind="b"} 2.5' in rendered
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = MetricsRegistry()
+    histogram = metrics.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    gauge = metrics.gauge("depth", "Depth.")
+    gauge.set(5)
+    gauge.dec()
+
+    lines = metrics.render().splitlines()
+    assert 'latency_seconds_bucket{le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{le="1"} 3' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert "latency_seconds_sum 3.65" in lines
+    assert "latency_seconds_count 4" in lines
+    assert "depth 4" in lines
+
+
+def test_metrics_endpoint_reports_routes_and_statements(client, registered_user):
+    client.get("/v1/profile", headers=registered_user["headers"])
+    client.get("/v1/does-not-exist")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.body
+    assert 'http_requests_total{method="GET",route="/v1/profile",status="200"} 1' in body
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/v1/profile"} 1' in body
+    assert 'db_statement_duration_seconds_count{operation="SELECT"}' in body
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import threading
+
+import pytest
+
+from city_guide.app.core.passwords import (
+    PBKDF2,
+    SCRYPT,
+    PasswordHasher,
+    password_hasher,
+)
+from city_guide.app.db.repo import UserRepository
+
+
+@pytest.mark.parametrize("algorithm", [SCRYPT, PBKDF2])
+def test_hashes_are_salted_and_self_describing(algorithm):
+    hasher = PasswordHasher(algorithm, scrypt_n=1024, pbkdf2_iterations=1000)
+    first, second = hasher.hash("secret"), hasher.hash("secret")
+
+    assert first != second
+    assert first.startswith(f"{algorithm}$")
+    assert hasher.verify("secret", first) and hasher.verify("secret", second)
+    assert not hasher.verify("wrong", first)
+    assert not hasher.needs_rehash(first)
+    assert not hasher.verify("secret", hasher.dummy_hash)
+
+
+def test_cost_changes_and_legacy_hashes_need_rehash():
+    legacy = hashlib.sha256(b"secret").hexdigest()
+    old = PasswordHasher(scrypt_n=1024).hash("secret")
+    hasher = PasswordHasher(scrypt_n=2048)
+
+    assert hasher.verify("secret", legacy) and hasher.needs_rehash(legacy)
+    assert hasher.verify("secret", old) and hasher.needs_rehash(old)
+    assert PasswordHasher(PBKDF2).needs_rehash(old)
+
+
+@pytest.mark.parametrize("encoded", ["", "scrypt$n=x$AA$AA", "bcrypt$12$AA$AA", "scrypt$AA", "not a hash"])
+def test_malformed_hashes_do_not_verify(encoded):
+    assert not PasswordHasher(scrypt_n=1024).verify("secret", encoded)
+
+
+def test_async_derivation_runs_in_the_pool():
+    hasher = PasswordHasher(scrypt_n=1024, workers=2)
+    loop_thread = threading.get_ident()
+    seen: list[int] = []
+    derive = hasher.hash
+
+    def recording(password: str) -> str:
+        seen.append(threading.get_ident())
+        return derive(password)
+
+    hasher.hash = recording  # type: ignore[method-assign]
+    try:
+        encoded = asyncio.run(hasher.hash_async("secret"))
+        assert asyncio.run(hasher.verify_async("secret", encoded))
+    finally:
+        hasher.shutdown()
+    assert seen and loop_thread not in seen
+
+
+def test_login_upgrades_legacy_hashes(client):
+    repo = UserRepository()
+    user = repo.create_user(email="legacy@example.com", password_hash=hashlib.sha256(b"OldPass1").hexdigest())
+
+    response = client.post("/v1/login", json={"email": "legacy@example.com", "password": "OldPass1"})
+    assert response.status_code == 200
+    upgraded = repo.get_by_id(user.id).password_hash
+    assert upgraded.startswith(f"{SCRYPT}$") and not password_hasher.needs_rehash(upgraded)
+
+    again = client.post("/v1/login", json={"email": "legacy@example.com", "password": "OldPass1"})
+    assert again.status_code == 200
+
+
+def test_unknown_email_is_rejected_like_a_wrong_password(client, registered_user):
+    unknown = client.post("/v1/login", json={"email": "nobody@example.com", "password": "x"})
+    wrong = client.post("/v1/login", json={"email": registered_user["email"], "password": "x"})
+    assert unknown.status_code == wrong.status_code == 401
+    assert unknown.json() == wrong.json()
@@ -30,6 +30,20 @@ def test_profile_returns_default_and_allows_updates(client, registered_user):
     assert response.json() == data
 
 
+def test_profile_supports_conditional_get(client, registered_user):
+    headers = registered_user["headers"]
+    first = client.get("/v1/profile", headers=headers)
+    etag = first.headers["etag"]
+    response = client.get("/v1/profile", headers={**headers, "if-none-match": etag})
+    assert response.status_code == 304
+
+    client.put("/v1/profile", json={"city": "Kaunas"}, headers=headers)
+    response = client.get("/v1/profile", headers={**headers, "if-none-match": etag})
+    assert response.status_code == 200
+    assert response.json()["city"] == "Kaunas"
+    assert response.headers["etag"] != etag
+
+
 def test_profile_context_roundtrip(client):
     user_id = uuid.uuid4()
     payload = {
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import pytest
+
+from city_guide.app.schemas.poi import BrainstormedPOI, BrainstormPOIRequest
+from city_guide.app.schemas.trip import GenerateTripOptions
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+
+def test_numbers_are_coerced_and_extra_keys_kept():
+    poi = BrainstormedPOI.model_validate({"title": "MO Museum", "priority": "0.8", "unknown": 1})
+
+    assert poi.priority == 0.8
+    assert poi.unknown == 1
+    assert "unknown" not in poi.model_dump()
+
+
+def test_str_fields_store_values_as_given():
+    poi = BrainstormedPOI.model_validate({"title": None, "city": 7})
+    assert (poi.title, poi.city) == (None, 7)
+
+
+def test_defaults_stay_on_the_class_and_instances_take_attributes():
+    assert BrainstormedPOI.city is None
+    assert BrainstormPOIRequest.locality_id.alias == "localityId"
+
+    poi = BrainstormedPOI(title="MO Museum")
+    poi.visited = True
+    assert poi.visited is True
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [{}, {"city": "Vilnius"}, {"title": "MO", "priority": "high"}, {"title": "MO", "priority": [1]}],
+)
+def test_invalid_payloads_are_rejected(payload):
+    with pytest.raises(ValidationError):
+        BrainstormedPOI.model_validate(payload)
+
+
+def test_aliases_defaults_and_factories():
+    request = BrainstormPOIRequest(localityId="vilnius", user_context={"age": 30})
+    assert request.model_dump(by_alias=True) == {
+        "localityId": "vilnius",
+        "startLocation": None,
+        "userContext": {"age": 30},
+        "routeOptions": None,
+    }
+
+    first, second = GenerateTripOptions(), GenerateTripOptions(places=("a", "b"))
+    assert first.waypoints == [] and first.waypoints is not GenerateTripOptions().waypoints
+    assert second.places == ["a", "b"]
+
+
+def test_subclasses_extend_the_field_plan():
+    class Base(BaseModel):
+        model_config = ConfigDict(extra="allow")
+
+        count: int = 0
+
+    class Child(Base):
+        scores: list[float] = Field(default_factory=list)
+
+    child = Child(count=2.0, scores=["1.5", 2], note="kept")
+    assert (child.count, child.scores, child.note) == (2, [1.5, 2.0], "kept")
+    assert child.model_dump() == {"count": 2, "scores": [1.5, 2.0]}
+
+
+def test_batches_validate_and_dump_like_single_items():
+    items = [{"title": "MO Museum", "priority": 1}, {"title": "Gediminas Tower", "city": "Vilnius"}]
+    pois = BrainstormedPOI.model_validate_many(items)
+
+    assert [poi.priority for poi in pois] == [1.0, None]
+    assert BrainstormedPOI.model_dump_many(pois) == [poi.model_dump() for poi in pois]
+    requests = [BrainstormPOIRequest(localityId="vilnius"), BrainstormPOIRequest()]
+    assert BrainstormPOIRequest.model_dump_many(requests, by_alias=True)[0]["localityId"] == "vilnius"
+
+    with pytest.raises(ValidationError, match="Item 1: Missing required field: title"):
+        BrainstormedPOI.model_validate_many([items[0], {"city": "Vilnius"}])
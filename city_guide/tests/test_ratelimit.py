@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from city_guide.app.core import metrics, ratelimit
+from city_guide.app.core.ratelimit import (
+    SqliteTokenBucketLimiter,
+    TokenBucketLimiter,
+    parse_routes,
+)
+from city_guide.app.http import Application, Request, json_response
+from city_guide.app.middleware import RateLimitMiddleware
+
+
+def test_token_bucket_allows_bursts_then_refills(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    limiter = TokenBucketLimiter(rate=1.0, burst=3)
+
+    assert [limiter.acquire("k") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("k") == 1.0
+    assert limiter.acquire("other") == 0.0
+    now[0] += 1.5
+    assert limiter.acquire("k") == 0.0
+    assert 0 < limiter.acquire("k") <= 0.5
+
+
+def test_token_bucket_keeps_only_recent_keys():
+    limiter = TokenBucketLimiter(rate=1.0, burst=1, max_keys=2)
+    limiter.acquire("a")
+    limiter.acquire("b")
+    limiter.acquire("a")
+    limiter.acquire("c")
+
+    assert len(limiter) == 2
+    assert limiter.acquire("b") == 0.0  # evicted, so full again
+
+
+def test_sqlite_buckets_are_shared_between_workers(tmp_path):
+    first = SqliteTokenBucketLimiter(tmp_path / "limits.sqlite3", rate=0.01, burst=2, prune_every=1)
+    second = SqliteTokenBucketLimiter(tmp_path / "limits.sqlite3", rate=0.01, burst=2)
+
+    assert first.acquire("k") == 0.0
+    assert second.acquire("k") == 0.0
+    assert first.acquire("k") > 0
+    second.reset()
+    assert first.acquire("k") == 0.0
+
+
+def test_sqlite_acquire_runs_off_the_event_loop(tmp_path):
+    limiter = SqliteTokenBucketLimiter(tmp_path / "limits.sqlite3", rate=0.01, burst=1)
+
+    async def acquire_twice() -> list[float]:
+        return [await limiter.acquire_async("k"), await limiter.acquire_async("k")]
+
+    first, second = asyncio.run(acquire_twice())
+    assert first == 0.0
+    assert second > 0
+
+
+@pytest.mark.parametrize("rate", [0, -1.0])
+def test_limiters_reject_non_positive_rates(tmp_path, rate):
+    with pytest.raises(ValueError, match="must be positive"):
+        TokenBucketLimiter(rate=rate, burst=1)
+    with pytest.raises(ValueError, match="must be positive"):
+        SqliteTokenBucketLimiter(tmp_path / "limits.sqlite3", rate=rate, burst=1)
+
+
+def test_parse_routes():
+    assert parse_routes("post /v1/login, GET /v1/routes,") == {("POST", "/v1/login"), ("GET", "/v1/routes")}
+
+
+def _limited_app(**options) -> Application:
+    app = Application()
+
+    @app.route("POST", "/login")
+    def login(_: Request):
+        return json_response({"ok": True})
+
+    @app.route("GET", "/open")
+    def open_route(_: Request):
+        return json_response({"ok": True})
+
+    app.add_middleware(
+        RateLimitMiddleware(
+            {("POST", "/login")},
+            ip_limiter=TokenBucketLimiter(rate=0.1, burst=3),
+            email_limiter=TokenBucketLimiter(rate=0.1, burst=2),
+            **options,
+        )
+    )
+    return app
+
+
+def _statuses(app: Application, count: int, **kwargs) -> list[int]:
+    async def run() -> list[int]:
+        responses = [await app.handle_request(**kwargs) for _ in range(count)]
+        return [response.status_code for response in responses]
+
+    return asyncio.run(run())
+
+
+def test_middleware_limits_per_email_and_per_ip():
+    app = _limited_app()
+    by_email = _statuses(app, 3, method="POST", path="/login", json_body={"email": "A@example.com"})
+    assert by_email == [200, 200, 429]
+
+    spread = [
+        _statuses(app, 1, method="POST", path="/login", json_body={"email": f"{idx}@example.com"}, client="10.0.0.1")[0]
+        for idx in range(4)
+    ]
+    assert spread == [200, 200, 200, 429]
+    assert _statuses(app, 2, method="GET", path="/open", client="10.0.0.1") == [200, 200]
+
+
+def test_rejections_carry_retry_after_and_are_counted():
+    app = _limited_app(trust_forwarded=True)
+    headers = {"x-forwarded-for": "203.0.113.9, 10.0.0.1"}
+    for _ in range(4):
+        response = asyncio.run(app.handle_request("POST", "/login", json_body={}, headers=headers, client="10.0.0.1"))
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "10"
+    assert 'http_rate_limited_total{method="POST",route="/login"} 1' in metrics.registry.render()
+    other_client = asyncio.run(app.handle_request("POST", "/login", json_body={}, client="10.0.0.1"))
+    assert other_client.status_code == 200
+
+
+def test_login_is_rate_limited_per_email(client, registered_user):
+    payload = {"email": registered_user["email"], "password": "wrong"}
+    statuses = [client.post("/v1/login", json=payload).status_code for _ in range(11)]
+    assert statuses == [401] * 10 + [429]
+
+
+def test_failing_limiter_is_answered_by_error_middleware(monkeypatch, client):
+    async def broken(key: str) -> float:
+        raise OSError("limiter storage unavailable")
+
+    monkeypatch.setattr(ratelimit.email_limiter, "acquire_async", broken)
+    response = client.post("/v1/login", json={"email": "a@example.com", "password": "x"})
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Internal Server Error"}
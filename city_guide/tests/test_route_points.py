@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import uuid
+
+from city_guide.app.api.v1 import routes
+from city_guide.app.db.entities import RoutePoint, RoutePointBatch
+from city_guide.app.db.repo import RouteDraftRepository
+
+ROUTE_ID = uuid.uuid4()
+
+
+def _rows() -> list[dict]:
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "route_id": str(ROUTE_ID),
+            "poi_id": f"poi-{idx}",
+            "name": f"Point {idx}",
+            "lat": 54.68 + idx / 100,
+            "lng": 25.28,
+            "category": "museum",
+            "order_index": idx,
+            "eta_min_walk": idx * 5 if idx else None,
+            "eta_min_drive": None,
+            "listen_sec": 0,
+            "source_poi_id": None if idx else "google-1",
+        }
+        for idx in range(3)
+    ]
+
+
+def test_batch_round_trips_points_and_shares_repeated_strings():
+    rows = _rows()
+    batch = RoutePointBatch.from_rows(rows)
+
+    assert len(batch) == 3 and batch.strings == [str(ROUTE_ID), "museum", "google-1"]
+    points = list(batch)
+    assert all(isinstance(point, RoutePoint) for point in points)
+    assert points[0].id == uuid.UUID(rows[0]["id"]) and points[0].route_id == ROUTE_ID
+    assert [point.eta_min_walk for point in points] == [None, 5, 10]
+    assert [point.source_poi_id for point in points] == ["google-1", None, None]
+
+
+def test_batch_serializes_like_single_points():
+    batch = RoutePointBatch.from_rows(_rows())
+    assert routes._serialize_points(batch) == [routes._serialize_point(point) for point in batch]
+    assert routes._serialize_points(list(batch)) == routes._serialize_points(batch)
+
+
+def test_repository_returns_batches_for_drafts(registered_user):
+    repo = RouteDraftRepository()
+    user_id = uuid.UUID(registered_user["user"]["id"])
+    draft = repo.create_draft(
+        user_id=user_id,
+        city="vilnius",
+        language="en",
+        duration_min=120,
+        transport_mode="walking",
+        status="created",
+        payload_json={},
+        points=[{"poi_id": "a", "name": "A", "lat": 1, "lng": 2}, {"poi_id": "b", "name": "B", "lat": 3, "lng": 4}],
+    )
+
+    assert isinstance(draft.points, RoutePointBatch)
+    assert [point.name for point in draft.points] == ["A", "B"]
+    assert [point.lat for point in repo.list_points(draft.id)] == [1.0, 3.0]
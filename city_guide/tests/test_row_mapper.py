@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from city_guide.app.db import database
+from city_guide.app.db.entities import RoutePointBatch, User
+from city_guide.app.db.mapping import RowMapper
+from city_guide.app.db.repo import UserRepository
+
+COLUMNS = ("id", "email", "password_hash", "is_active", "created_at", "updated_at")
+
+
+def _row(user_id: uuid.UUID) -> tuple:
+    now = datetime(2024, 5, 1, tzinfo=timezone.utc).isoformat()
+    return (str(user_id), "a@example.com", "hash", 1, now, now)
+
+
+def test_uuid_and_datetime_columns_are_parsed_on_first_access():
+    user_id = uuid.uuid4()
+    user = RowMapper(User)(COLUMNS, [_row(user_id)])[0]
+    raw = User.__dict__["id"]
+
+    assert isinstance(user, User) and type(user).__name__ == "User"
+    assert raw.__get__(user) == str(user_id)
+    assert user.id == user_id and isinstance(user.id, uuid.UUID)
+    assert raw.__get__(user) is user.id
+    assert user.created_at == datetime(2024, 5, 1, tzinfo=timezone.utc)
+    assert user.is_active is True and user.language == "en" and user.city is None
+
+
+def test_lazy_mapping_leaves_the_entity_class_alone():
+    RowMapper(User)(COLUMNS, [_row(uuid.uuid4())])
+    assert all(type(User.__dict__[name]).__name__ == "member_descriptor" for name in ("id", "created_at"))
+
+    mapped = RowMapper(User)(COLUMNS, [_row(uuid.uuid4())])[0]
+    assert type(mapped) is type(RowMapper(User)(COLUMNS, [_row(uuid.uuid4())])[0])
+    twin = User(**{name: getattr(mapped, name) for name in User.__dataclass_fields__})
+    assert mapped == twin and twin == mapped
+    twin.email = "b@example.com"
+    assert mapped != twin
+
+
+def test_plans_are_compiled_once_per_column_list():
+    mapper = RowMapper(User, lazy=False)
+    mapper(COLUMNS, [_row(uuid.uuid4())])
+    mapper(COLUMNS, [_row(uuid.uuid4())])
+    assert len(mapper._plans) == 1
+
+    with pytest.raises(ValueError, match="User.email"):
+        mapper(("id", "password_hash"), [("x", "y")])
+
+
+def test_database_hands_cursor_tuples_to_the_mapper(registered_user):
+    seen: list[tuple] = []
+
+    def mapper(columns, rows):
+        seen.extend(rows)
+        return RowMapper(User)(columns, rows)
+
+    user = database.execute(
+        "SELECT * FROM users WHERE email = :email", {"email": registered_user["email"]}, fetchone=True, mapper=mapper
+    )
+    assert type(seen[0]) is tuple
+    assert user == UserRepository().get_by_email(registered_user["email"])
+    assert database.execute("SELECT * FROM route_points", fetchall=True, mapper=RoutePointBatch.from_tuples).ids == []
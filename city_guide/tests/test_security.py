@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+import uuid
+
+import pytest
+
+from city_guide.app.core import security
+from city_guide.app.core.security import InvalidToken, TokenSigner, parse_keys
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _claims(**overrides) -> dict:
+    return {"sub": "user-1", "type": "access", "exp": int(time.time()) + 60} | overrides
+
+
+def test_tokens_round_trip_and_are_standard_hs256_jwts():
+    signer = TokenSigner({"k1": "secret"}, "k1")
+    token = signer.encode(_claims())
+
+    header, payload, signature = token.split(".")
+    assert json.loads(base64.urlsafe_b64decode(header + "==")) == {"alg": "HS256", "typ": "JWT", "kid": "k1"}
+    expected = hmac.new(b"secret", f"{header}.{payload}".encode(), hashlib.sha256).digest()
+    assert signature == _b64(expected)
+    assert signer.decode(token, token_type="access")["sub"] == "user-1"
+
+
+def test_foreign_header_without_kid_verifies_with_active_key():
+    signer = TokenSigner({"k1": "secret"}, "k1")
+    header = _b64(json.dumps({"typ": "JWT", "alg": "HS256"}).encode())
+    payload = _b64(json.dumps(_claims()).encode())
+    signature = _b64(hmac.new(b"secret", f"{header}.{payload}".encode(), hashlib.sha256).digest())
+
+    assert signer.decode(f"{header}.{payload}.{signature}")["sub"] == "user-1"
+
+
+@pytest.mark.parametrize(
+    "mutate",
+    [
+        lambda token: token[:-2] + ("AA" if not token.endswith("AA") else "BB"),
+        lambda token: token.rsplit(".", 1)[0],
+        lambda token: token + "é",
+        lambda token: _b64(b'{"alg":"none"}') + token[token.index("."):],
+    ],
+)
+def test_tampered_tokens_are_rejected(mutate):
+    signer = TokenSigner({"k1": "secret"}, "k1")
+    with pytest.raises(InvalidToken):
+        signer.decode(mutate(signer.encode(_claims())))
+
+
+def test_expiry_type_and_leeway_are_enforced():
+    signer = TokenSigner({"k1": "secret"}, "k1", leeway=5)
+    with pytest.raises(InvalidToken):
+        signer.decode(signer.encode(_claims(exp=int(time.time()) - 10)))
+    assert signer.decode(signer.encode(_claims(exp=int(time.time()) - 2)))
+    with pytest.raises(InvalidToken):
+        signer.decode(signer.encode(_claims(type="refresh")), token_type="access")
+
+
+def test_key_rotation_keeps_old_tokens_valid_until_the_key_is_dropped():
+    old = TokenSigner({"k1": "old-secret"}, "k1")
+    token = old.encode(_claims())
+
+    rotated = TokenSigner({"k1": "old-secret", "k2": "new-secret"}, "k2")
+    assert rotated.decode(token)["sub"] == "user-1"
+    assert rotated.encode(_claims()).split(".")[0] != token.split(".")[0]
+
+    retired = TokenSigner({"k2": "new-secret"}, "k2")
+    with pytest.raises(InvalidToken):
+        retired.decode(token)
+
+
+def test_parse_keys():
+    assert parse_keys(" a=one, b = two ,") == {"a": "one", "b": "two"}
+    with pytest.raises(ValueError):
+        parse_keys("broken")
+
+
+def test_access_and_refresh_tokens_are_not_interchangeable():
+    user_id = uuid.uuid4()
+    access = security.create_access_token(user_id)
+    refresh = security.create_refresh_token(user_id)
+
+    assert security.decode_access_token(access)["sub"] == str(user_id)
+    assert security.decode_refresh_token(refresh)["sub"] == str(user_id)
+    with pytest.raises(InvalidToken):
+        security.decode_access_token(refresh)
+    with pytest.raises(InvalidToken):
+        security.decode_refresh_token(access)
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import fnmatch
+import socketserver
+import threading
+import time
+from typing import ClassVar
+
+import pytest
+
+from city_guide.app.core.sessions import (
+    DatabaseSessionStore,
+    MemorySessionStore,
+    RedisSessionStore,
+    RespClient,
+)
+
+
+def test_memory_store_purges_only_elapsed_wheel_buckets():
+    store = MemorySessionStore(slots=8)
+    now = time.time()
+    store.add("soon", "user-1", now + 2)
+    store.add("later", "user-1", now + 2 + 8)  # same bucket, one turn later
+    store.add("other", "user-2", now + 100)
+
+    assert store.get("soon") == "user-1"
+    assert store.purge(now + 3) == 1
+    assert store.get("soon") is None
+    assert len(store) == 2
+    assert store.purge(now + 11) == 1
+    assert store.get("other") == "user-2"
+
+
+def test_memory_store_revokes_and_stays_bounded():
+    store = MemorySessionStore(max_sessions=3)
+    expires = time.time() + 60
+    for idx in range(5):
+        store.add(f"s{idx}", "user-1" if idx % 2 else "user-2", expires)
+
+    assert len(store) == 3
+    assert store.get("s0") is None and store.get("s1") is None
+    assert store.revoke("s4") is True
+    assert store.revoke("s4") is False
+    assert store.revoke_user("user-1") == 1
+    assert len(store) == 1 and store.get("s2") == "user-2"
+
+
+def test_expired_sessions_are_not_returned_before_purge():
+    store = MemorySessionStore()
+    store.add("gone", "user-1", time.time() - 1)
+    assert store.get("gone") is None
+
+
+def test_database_store_purges_expired_rows_in_batches():
+    store = DatabaseSessionStore(batch_size=2)
+    now = time.time()
+    for idx in range(5):
+        store.add(f"old-{idx}", "user-1", now - 10)
+    store.add("live", "user-1", now + 60)
+    store.add("mine", "user-2", now + 60)
+
+    assert store.get("old-0") is None
+    assert store.get("live") == "user-1"
+    assert store.purge() == 5
+    assert store.revoke_user("user-1") == 1
+    assert store.revoke("mine") is True
+    assert store.get("mine") is None
+
+
+class _FakeRedis(socketserver.StreamRequestHandler):
+    """Just enough of the Redis protocol for the session store."""
+
+    data: ClassVar[dict[str, object]] = {}
+
+    def handle(self) -> None:
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            args = []
+            for _ in range(int(line[1:])):
+                size = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(size + 2)[:-2].decode())
+            self.wfile.write(self._reply(args[0].upper(), args[1:]))
+
+    def _reply(self, command: str, args: list[str]) -> bytes:
+        data = self.data
+        if command == "SET":
+            data[args[0]] = args[1]
+            return b"+OK\r\n"
+        if command == "GET":
+            value = data.get(args[0])
+            return b"$-1\r\n" if value is None else _bulk(value)
+        if command == "DEL":
+            return b":%d\r\n" % sum(data.pop(key, None) is not None for key in args)
+        if command == "SADD":
+            data.setdefault(args[0], set()).update(args[1:])
+            return b":1\r\n"
+        if command == "SREM":
+            data.get(args[0], set()).difference_update(args[1:])
+            return b":1\r\n"
+        if command == "SMEMBERS":
+            return _array(sorted(data.get(args[0], set())))
+        if command == "PEXPIRE":
+            return b":1\r\n"
+        if command == "SCAN":
+            keys = [key for key in data if fnmatch.fnmatch(key, args[2])]
+            return b"*2\r\n" + _bulk("0") + _array(keys)
+        return b"-ERR unknown command\r\n"
+
+
+def _bulk(value: str) -> bytes:
+    return b"$%d\r\n%s\r\n" % (len(value), value.encode())
+
+
+def _array(values: list[str]) -> bytes:
+    return b"*%d\r\n" % len(values) + b"".join(_bulk(value) for value in values)
+
+
+@pytest.fixture()
+def resp_client():
+    _FakeRedis.data = {}
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _FakeRedis)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = RespClient(f"redis://127.0.0.1:{server.server_address[1]}/0")
+    yield client
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+
+def test_redis_store_speaks_resp(resp_client):
+    store = RedisSessionStore(resp_client)
+    expires = time.time() + 60
+    store.add("a", "user-1", expires)
+    store.add("b", "user-1", expires)
+    store.add("c", "user-2", expires)
+
+    assert store.get("a") == "user-1"
+    assert store.revoke("a") is True
+    assert store.get("a") is None
+    assert store.revoke_user("user-1") == 1
+    assert store.get("c") == "user-2"
+    store.clear()
+    assert store.get("c") is None
+
+
+def test_refresh_tokens_are_single_use_and_revoked_on_logout(client, registered_user):
+    refresh_token = registered_user["tokens"]["refresh_token"]
+
+    rotated = client.post("/v1/refresh", json={"refreshToken": refresh_token})
+    assert rotated.status_code == 200
+    reused = client.post("/v1/refresh", json={"refreshToken": refresh_token})
+    assert reused.status_code == 401
+
+    new_token = rotated.json()["refresh_token"]
+    assert client.post("/v1/logout", json={"refreshToken": new_token}).status_code == 204
+    assert client.post("/v1/refresh", json={"refreshToken": new_token}).status_code == 401
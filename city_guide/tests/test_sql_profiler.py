@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import logging
+import uuid
+
+from city_guide.app.db import database
+from city_guide.app.db.profiler import normalize_sql, params_shape, sql_profiler
+from city_guide.app.db.repo import RouteDraftRepository
+from city_guide.app.http import Application, TestClient, json_stream_response
+from city_guide.app.middleware import SQLProfilerMiddleware
+
+
+def _trip_payload() -> dict:
+    return {
+        "title": "Weekend in Vilnius",
+        "localityId": "vilnius",
+        "start": {"name": "Cathedral Square", "lat": 54.6858, "lng": 25.2877},
+        "durationMinutes": 120,
+    }
+
+
+def test_statements_are_normalized():
+    sql = "SELECT *\n  FROM route_points WHERE route_id = :route_id AND lat > 54.6 AND name = 'x''y'"
+    assert normalize_sql(sql) == "SELECT * FROM route_points WHERE route_id = :route_id AND lat > ? AND name = ?"
+    assert params_shape({"route_id": "abc", "limit": 3}) == "limit:int, route_id:str"
+
+
+def test_repeated_statements_in_a_request_are_reported(monkeypatch, caplog, client, registered_user):
+    for _ in range(3):
+        client.post("/v1/routes", json=_trip_payload(), headers=registered_user["headers"])
+    monkeypatch.setattr(sql_profiler, "enabled", True)
+    monkeypatch.setattr(sql_profiler, "n_plus_one_threshold", 3)
+    user_id = uuid.UUID(registered_user["user"]["id"])
+    seen = {}
+
+    app = Application()
+    app.add_middleware(SQLProfilerMiddleware())
+
+    @app.route("GET", "/drafts")
+    def drafts(request):
+        seen["scope"] = request.state["sql"]
+        return json_stream_response(RouteDraftRepository().iter_drafts_for_user(user_id), serialize=str)
+
+    with caplog.at_level(logging.WARNING, logger="city_guide.app.db.profiler"):
+        response = TestClient(app).get("/drafts")
+
+    assert len(response.json()) == 3
+    # One query for the drafts, then one per draft for its points -- counted
+    # even though they run while the body streams.
+    assert seen["scope"].count == 4
+    assert "Possible N+1 in GET /drafts: 3 executions of SELECT * FROM route_points" in caplog.text
+    top = sql_profiler.stats(limit=1)[0]
+    assert top["sql"].startswith("SELECT") and top["count"] >= 1
+
+
+def test_slow_selects_are_logged_with_their_plan(monkeypatch, caplog):
+    monkeypatch.setattr(sql_profiler, "enabled", True)
+    monkeypatch.setattr(sql_profiler, "slow_ms", 0.0)
+    with caplog.at_level(logging.WARNING, logger="city_guide.app.db.profiler"):
+        database.execute("SELECT * FROM users WHERE email = :email", {"email": "a@b.c"}, fetchone=True)
+        database.execute("SELECT * FROM users WHERE email = :email", {"email": "d@e.f"}, fetchone=True)
+
+    assert "Slow SQL" in caplog.text and "[email:str]" in caplog.text
+    # The plan is logged once per statement and shows the index being used.
+    assert caplog.text.count("Query plan for") == 1
+    assert "ix_users_email" in caplog.text or "sqlite_autoindex_users" in caplog.text
+    assert sql_profiler.recent[-1].rows == 0
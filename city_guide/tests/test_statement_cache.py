@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from city_guide.app.core.config import settings
+from city_guide.app.db.connections import ConnectionPool
+from city_guide.app.db.storage import Database
+
+
+def _sqlite(tmp_path) -> Database:
+    database = Database(f"sqlite:///{tmp_path}/cache.db", testing=True)
+    database.reset()
+    return database
+
+
+def test_connections_are_pooled_and_statement_reuse_is_counted(tmp_path):
+    database = _sqlite(tmp_path)
+    sql = "SELECT COUNT(*) AS total FROM users WHERE email = :email"
+    for _ in range(3):
+        assert database.execute(sql, {"email": "a@example.com"}, fetchone=True) == {"total": 0}
+
+    assert len(database._pool) == 1
+    assert [row for row in database.statements.stats() if row["sql"] == sql] == [{"sql": sql, "hits": 2, "misses": 1}]
+
+
+def test_failed_statements_roll_back_and_keep_the_connection(tmp_path):
+    database = _sqlite(tmp_path)
+    with pytest.raises(sqlite3.OperationalError):
+        database.execute("INSERT INTO missing_table VALUES (1)")
+    assert len(database._pool) == 1
+    assert database.execute("SELECT 1 AS one", fetchone=True) == {"one": 1}
+
+
+def test_pool_keeps_at_most_size_idle_connections():
+    closed = []
+    pool = ConnectionPool(lambda: SimpleNamespace(close=lambda: closed.append(1)), size=1)
+    first, second = pool.acquire(), pool.acquire()
+    pool.release(first)
+    pool.release(second)
+
+    assert len(pool) == 1 and closed == [1]
+    assert pool.acquire() is first
+
+
+class _RecordingCursor:
+    def __init__(self, calls: list) -> None:
+        self.calls = calls
+        self.rowcount = 1
+
+    def execute(self, sql, params, **kwargs):
+        self.calls.append((sql, kwargs))
+
+    def close(self) -> None:
+        pass
+
+
+def test_postgres_statements_are_rewritten_once_and_prepared_server_side(monkeypatch):
+    calls: list = []
+    connection = SimpleNamespace(
+        cursor=lambda **kwargs: _RecordingCursor(calls), commit=lambda: None, rollback=lambda: None, close=lambda: None
+    )
+    driver = SimpleNamespace(__name__="psycopg", rows=SimpleNamespace(dict_row=None, tuple_row=None))
+    driver.connect = lambda *args, **kwargs: connection
+    database = Database("postgresql://localhost/test", testing=False)
+    database._postgres_driver = driver
+    monkeypatch.setattr(settings, "db_prepare_statements", True)
+
+    sql = "UPDATE users SET city = :city WHERE id = :id"
+    database.execute(sql, {"city": "Vilnius", "id": "1"})
+    database.execute(sql, {"city": "Kaunas", "id": "1"})
+
+    assert calls == [("UPDATE users SET city = %(city)s WHERE id = %(id)s", {"prepare": True})] * 2
+    assert database._prepare_sql(sql) is database._prepare_sql(sql)
+    assert database.statements.stats() == [{"sql": sql, "hits": 1, "misses": 1}]
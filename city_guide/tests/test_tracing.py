@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from city_guide.app.core.tracing import (
+    NOOP_SPAN,
+    JsonLinesExporter,
+    Tracer,
+    otlp_payload,
+    set_span_attributes,
+)
+
+
+class _ListExporter:
+    def __init__(self) -> None:
+        self.spans: list = []
+
+    def export(self, spans) -> None:
+        self.spans.extend(spans)
+
+
+def test_spans_nest_across_tasks_and_record_errors():
+    exporter = _ListExporter()
+    tracer = Tracer(1.0, exporter)
+
+    async def lookup(idx: int) -> None:
+        with tracer.start_span("lookup", idx=idx):
+            await asyncio.sleep(0)
+
+    async def run() -> None:
+        with tracer.start_trace("root"):
+            await asyncio.gather(lookup(0), lookup(1))
+            with pytest.raises(ValueError), tracer.start_span("failing"):
+                raise ValueError("bad input")
+            set_span_attributes(done=True)
+
+    asyncio.run(run())
+    assert tracer.flush()
+    by_name: dict[str, list] = {}
+    for span in exporter.spans:
+        by_name.setdefault(span.name, []).append(span)
+    (root,) = by_name["root"]
+    assert root.attributes == {"done": True}
+    assert [span.parent_id for span in by_name["lookup"]] == [root.span_id, root.span_id]
+    assert by_name["failing"][0].error == "ValueError: bad input"
+    assert len({span.trace_id for span in exporter.spans}) == 1
+
+
+def test_unsampled_traces_are_noops():
+    exporter = _ListExporter()
+    tracer = Tracer(0.0, exporter)
+    with tracer.start_trace("root") as root:
+        assert root is NOOP_SPAN
+        assert tracer.start_span("child") is NOOP_SPAN
+    # Without a trace, spans are never recorded regardless of the rate.
+    assert Tracer(1.0, exporter).start_span("orphan") is NOOP_SPAN
+    assert tracer.flush() and exporter.spans == []
+
+
+def test_exporters_encode_spans(tmp_path):
+    path = tmp_path / "traces" / "spans.jsonl"
+    tracer = Tracer(1.0, JsonLinesExporter(path))
+    with tracer.start_trace("root", route_id="abc"), tracer.start_span("child", count=2):
+        pass
+    assert tracer.flush()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["child", "root"]
+    assert lines[0]["parent_id"] == lines[1]["span_id"]
+
+    collected = _ListExporter()
+    tracer = Tracer(1.0, collected)
+    with tracer.start_trace("root", route_id="abc", retried=False):
+        pass
+    tracer.flush()
+    (span,) = otlp_payload(collected.spans)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert span["name"] == "root" and "parentSpanId" not in span
+    assert {"key": "route_id", "value": {"stringValue": "abc"}} in span["attributes"]
+    assert {"key": "retried", "value": {"boolValue": False}} in span["attributes"]
+    assert int(span["endTimeUnixNano"]) >= int(span["startTimeUnixNano"])
@@ -1,10 +1,20 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import threading
 import uuid
+from types import SimpleNamespace
 
+from city_guide.app.api.v1 import routes
+from city_guide.app.core import tracing
+from city_guide.app.core.circuit_breaker import OPEN, get_breaker
 from city_guide.app.core.config import settings
 from city_guide.app.db.repo import RouteDraftRepository
 from city_guide.app.schemas.poi import BrainstormPOIResponse, BrainstormedPOI
+from city_guide.app.services import google_poi
+from city_guide.app.services.events import generation_events
+from city_guide.app.services.jobs import job_queue
 
 
 def _sample_trip_payload() -> dict:
@@ -32,6 +42,16 @@ def _sample_trip_payload() -> dict:
     }
 
 
+def _generate_and_wait(client, trip_id: str, headers: dict):
+    response = client.post(
+        f"/v1/routes/{trip_id}/generate", json={"waypoints": [], "places": []}, headers=headers
+    )
+    assert response.status_code == 200
+    job = job_queue.wait(uuid.UUID(response.json()["jobId"]), timeout=5)
+    assert job is not None and not job.active
+    return response
+
+
 def test_create_trip_returns_trip_response(client, registered_user):
     payload = _sample_trip_payload()
     response = client.post("/v1/routes", json=payload, headers=registered_user["headers"])
@@ -61,6 +81,30 @@ def test_list_and_get_trip(client, registered_user):
     assert detail_response.json()["id"] == trip_id
 
 
+def test_trip_detail_and_list_support_conditional_get(client, registered_user):
+    headers = registered_user["headers"]
+    created = client.post("/v1/routes", json=_sample_trip_payload(), headers=headers)
+    trip_id = created.json()["id"]
+
+    detail = client.get(f"/v1/routes/{trip_id}", headers=headers)
+    etag = detail.headers["etag"]
+    cached = client.get(f"/v1/routes/{trip_id}", headers={**headers, "if-none-match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    since = {**headers, "if-modified-since": detail.headers["last-modified"]}
+    assert client.get(f"/v1/routes/{trip_id}", headers=since).status_code == 304
+    stale = {**headers, "if-none-match": '"stale"'}
+    assert client.get(f"/v1/routes/{trip_id}", headers=stale).status_code == 200
+
+    listing = client.get("/v1/routes", headers=headers)
+    list_etag = listing.headers["etag"]
+    assert client.get("/v1/routes", headers={**headers, "if-none-match": list_etag}).status_code == 304
+    client.post("/v1/routes", json=_sample_trip_payload(), headers=headers)
+    refreshed = client.get("/v1/routes", headers={**headers, "if-none-match": list_etag})
+    assert refreshed.status_code == 200
+    assert len(refreshed.json()) == 2
+
+
 _SAMPLE_BRAINSTORMED = [
     BrainstormedPOI(
         title="MO Museum",
@@ -109,7 +153,10 @@ def _mock_generation_dependencies(
         lambda: _StubGPTClient(brainstorm_items),
     )
 
-    async def fake_validate_brainstormed_poi(*args, **kwargs):
+    async def fake_validate_brainstormed_poi(*args, items, **kwargs):
+        # Read the whole brainstorm, as the real lookups do.
+        async for _ in items:
+            pass
         return validated_candidates
 
     monkeypatch.setattr(
@@ -154,16 +201,14 @@ def test_generate_trip_updates_draft(monkeypatch, client, registered_user):
 
     _mock_generation_dependencies(monkeypatch, _SAMPLE_BRAINSTORMED, validated_candidates)
 
-    response = client.post(
-        f"/v1/routes/{trip_id}/generate", json={"waypoints": [], "places": []}, headers=registered_user["headers"]
-    )
-    assert response.status_code == 200
+    _generate_and_wait(client, trip_id, registered_user["headers"])
 
     detail_response = client.get(
         f"/v1/routes/{trip_id}", headers=registered_user["headers"]
     )
     data = detail_response.json()
-    assert data["status"] == "draft"
+    assert data["status"] == "success"
+    assert data["job"]["status"] == "succeeded"
     assert len(data["waypoints"]) == len(validated_candidates)
 
     for waypoint, candidate in zip(data["waypoints"], validated_candidates):
@@ -177,6 +222,101 @@ def test_generate_trip_updates_draft(monkeypatch, client, registered_user):
     assert len(draft.points) == len(data["waypoints"])
 
 
+class _CollectingExporter:
+    def __init__(self) -> None:
+        self.spans: list = []
+
+    def export(self, spans) -> None:
+        self.spans.extend(spans)
+
+
+def test_generation_stages_are_traced(monkeypatch, client, registered_user):
+    exporter = _CollectingExporter()
+    monkeypatch.setattr(tracing.tracer, "exporter", exporter)
+    monkeypatch.setattr(tracing.tracer, "sample_rate", 1.0)
+    created = client.post("/v1/routes", json=_sample_trip_payload(), headers=registered_user["headers"])
+    trip_id = created.json()["id"]
+    candidates = [
+        {"poi_id": "place-museum", "name": "MO Museum", "lat": 54.689, "lng": 25.279, "category": "museum"}
+    ]
+    _mock_generation_dependencies(monkeypatch, _SAMPLE_BRAINSTORMED, candidates)
+
+    _generate_and_wait(client, trip_id, registered_user["headers"])
+    assert tracing.tracer.flush()
+
+    spans = {span.name: span for span in exporter.spans}
+    root = spans["generate_trip"]
+    assert root.parent_id is None and root.attributes["route_id"] == trip_id
+    for name in ("brainstorm_candidates", "select_and_order", "RouteDraftRepository.replace_points"):
+        assert spans[name].trace_id == root.trace_id
+        assert spans[name].parent_id == root.span_id
+    assert spans["brainstorm_candidates"].attributes["validated"] == 1
+    assert all(span.end_ns >= span.start_ns for span in exporter.spans)
+    # Repository calls made by HTTP handlers are outside any trace.
+    assert {span.trace_id for span in exporter.spans} == {root.trace_id}
+
+
+def _parse_sse(body: bytes) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.decode().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "event" in lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_generation_events_stream_progress(monkeypatch, client, registered_user):
+    payload = _sample_trip_payload()
+    created = client.post("/v1/routes", json=payload, headers=registered_user["headers"])
+    trip_id = created.json()["id"]
+    validated_candidates = [
+        {"poi_id": "place-museum", "name": "MO Museum", "lat": 54.689, "lng": 25.279, "priority": 0.9},
+        {"poi_id": "place-tower", "name": "Gediminas Tower", "lat": 54.686, "lng": 25.29, "priority": 0.8},
+    ]
+    _mock_generation_dependencies(monkeypatch, _SAMPLE_BRAINSTORMED, validated_candidates)
+
+    snapshot_taken = threading.Event()
+    status_event = routes._status_event
+
+    def _status_then_release(route_id):
+        event = status_event(route_id)
+        snapshot_taken.set()
+        return event
+
+    def _gpt_after_snapshot():
+        # Hold the job until the events client below has taken its snapshot.
+        assert snapshot_taken.wait(5)
+        return _StubGPTClient(_SAMPLE_BRAINSTORMED)
+
+    monkeypatch.setattr(routes, "_status_event", _status_then_release)
+    monkeypatch.setattr(routes, "get_gpt_client", _gpt_after_snapshot)
+
+    started = client.post(
+        f"/v1/routes/{trip_id}/generate", json={}, headers=registered_user["headers"]
+    )
+    response = client.get(f"/v1/routes/{trip_id}/events", headers=registered_user["headers"])
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/event-stream"
+    events = _parse_sse(response.body)
+    assert events[0] == ("status", {"status": "inProgress", "job": events[0][1]["job"]})
+    assert events[0][1]["job"]["id"] == started.json()["jobId"]
+    stages = [data["stage"] for name, data in events if name == "stage"]
+    assert stages == ["brainstorm", "select", "persist"]
+    partial = [data["waypoint"]["poi_id"] for name, data in events if name == "candidate"]
+    assert partial == ["place-museum", "place-tower"]
+    name, final = events[-1]
+    assert name == "status" and final["status"] == "success"
+    assert [point["poi_id"] for point in final["waypoints"]] == partial
+
+    # Once generation has finished the stream only replays the final state.
+    replay = _parse_sse(
+        client.get(f"/v1/routes/{trip_id}/events", headers=registered_user["headers"]).body
+    )
+    assert len(replay) == 1 and replay[0][1]["status"] == "success"
+    assert generation_events.subscriber_count(trip_id) == 0
+
+
 def test_generate_trip_falls_back_to_legacy_candidates(monkeypatch, client, registered_user):
     payload = _sample_trip_payload()
     created = client.post("/v1/routes", json=payload, headers=registered_user["headers"])
@@ -208,18 +348,207 @@ def test_generate_trip_falls_back_to_legacy_candidates(monkeypatch, client, regi
         fallback_candidates=fallback_candidates,
     )
 
-    response = client.post(
-        f"/v1/routes/{trip_id}/generate", json={"waypoints": [], "places": []}, headers=registered_user["headers"]
-    )
-    assert response.status_code == 200
+    _generate_and_wait(client, trip_id, registered_user["headers"])
 
     detail_response = client.get(
         f"/v1/routes/{trip_id}", headers=registered_user["headers"]
     )
     data = detail_response.json()
-    assert data["status"] == "draft"
+    assert data["status"] == "success"
+    assert data["job"]["status"] == "succeeded"
     assert len(data["waypoints"]) == len(fallback_candidates)
     for waypoint, candidate in zip(data["waypoints"], fallback_candidates):
         assert waypoint["poi_id"] == candidate["poi_id"]
         assert waypoint["lat"] == candidate["lat"]
         assert waypoint["lng"] == candidate["lng"]
+
+
+def test_generation_pipeline_stops_early_when_selection_satisfied(monkeypatch):
+    monkeypatch.setattr(settings, "use_google_sources", True)
+    monkeypatch.setattr(settings, "google_maps_api_key", "fake-test-key")
+    titles = [f"Sight {idx}" for idx in range(20)]
+    lookups: list[str] = []
+
+    class _StreamingGPT:
+        async def stream_brainstorm_poi(self, req):
+            for title in titles:
+                yield BrainstormedPOI(title=title, priority=0.9)
+                await asyncio.sleep(0)
+
+    class _PlacesClient:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def get(self, url, params):
+            lookups.append(params["query"])
+            await asyncio.sleep(0.01)
+            place = {
+                "place_id": params["query"],
+                "geometry": {"location": {"lat": 54.686, "lng": 25.287}},
+            }
+            return SimpleNamespace(
+                raise_for_status=lambda: None,
+                json=lambda: {"status": "OK", "results": [place]},
+            )
+
+    monkeypatch.setattr(
+        "city_guide.app.services.google_poi.httpx.AsyncClient", _PlacesClient
+    )
+    draft = SimpleNamespace(
+        id=uuid.uuid4(),
+        city="vilnius",
+        language="en",
+        duration_min=240,
+        transport_mode="walking",
+    )
+    payload = _sample_trip_payload()
+
+    candidates, _, validated_count = asyncio.run(
+        routes._brainstorm_candidates(draft, payload, None, _StreamingGPT())
+    )
+    assert validated_count == len(candidates)
+    assert len(candidates) >= routes.EARLY_STOP_CANDIDATES
+    assert len(lookups) < len(titles)
+
+
+def test_generation_pipeline_finishes_when_places_circuit_opens_mid_stream(monkeypatch):
+    monkeypatch.setattr(settings, "use_google_sources", True)
+    monkeypatch.setattr(settings, "google_maps_api_key", "fake-test-key")
+    breaker = get_breaker(google_poi.PLACES_BREAKER)
+
+    class _StreamingGPT:
+        async def stream_brainstorm_poi(self, req):
+            # Far more items than the channels hold, so the brainstorm blocks
+            # once validation stops reading.
+            for idx in range(4 * routes.PIPELINE_QUEUE_SIZE):
+                yield BrainstormedPOI(title=f"Sight {idx}", priority=0.1)
+
+    class _PlacesClient:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def get(self, url, params):
+            while breaker.state != OPEN:
+                breaker.record_failure()
+            place = {
+                "place_id": params["query"],
+                "geometry": {"location": {"lat": 54.686, "lng": 25.287}},
+            }
+            return SimpleNamespace(
+                raise_for_status=lambda: None,
+                json=lambda: {"status": "OK", "results": [place]},
+            )
+
+    monkeypatch.setattr(
+        "city_guide.app.services.google_poi.httpx.AsyncClient", _PlacesClient
+    )
+    draft = SimpleNamespace(
+        id=uuid.uuid4(), city="vilnius", language="en", duration_min=240, transport_mode="walking"
+    )
+
+    async def generate():
+        return await asyncio.wait_for(
+            routes._brainstorm_candidates(draft, _sample_trip_payload(), None, _StreamingGPT()),
+            timeout=5,
+        )
+
+    candidates, brainstormed, validated_count = asyncio.run(generate())
+    assert breaker.state == OPEN
+    assert 0 < validated_count == len(candidates)
+    assert brainstormed < 4 * routes.PIPELINE_QUEUE_SIZE
+
+
+def test_generation_pipeline_ranks_high_priority_picks_first(monkeypatch):
+    monkeypatch.setattr(settings, "use_google_sources", True)
+    monkeypatch.setattr(settings, "google_maps_api_key", "fake-test-key")
+    brainstormed = [BrainstormedPOI(title=f"High {idx}", priority=0.9) for idx in range(3)]
+    brainstormed += [BrainstormedPOI(title=f"Low {idx}", priority=0.2) for idx in range(3)]
+
+    class _StreamingGPT:
+        async def stream_brainstorm_poi(self, req):
+            for poi in brainstormed:
+                yield poi
+
+    class _PlacesClient:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def get(self, url, params):
+            # High-priority lookups resolve last.
+            await asyncio.sleep(0.03 if params["query"].startswith("High") else 0)
+            place = {
+                "place_id": params["query"],
+                "geometry": {"location": {"lat": 54.686, "lng": 25.287}},
+            }
+            return SimpleNamespace(
+                raise_for_status=lambda: None,
+                json=lambda: {"status": "OK", "results": [place]},
+            )
+
+    monkeypatch.setattr(
+        "city_guide.app.services.google_poi.httpx.AsyncClient", _PlacesClient
+    )
+    draft = SimpleNamespace(
+        id=uuid.uuid4(), city="vilnius", language="en", duration_min=240, transport_mode="walking"
+    )
+
+    candidates, _, _ = asyncio.run(
+        routes._brainstorm_candidates(draft, _sample_trip_payload(), None, _StreamingGPT())
+    )
+    ordered = asyncio.run(routes._select_and_order(SimpleNamespace(), None, candidates))
+    assert {candidate["poi_id"] for candidate in ordered} == {"High 0", "High 1", "High 2"}
+
+
+def test_shutdown_mid_generation_fails_the_draft(monkeypatch, client, registered_user):
+    created = client.post("/v1/routes", json=_sample_trip_payload(), headers=registered_user["headers"])
+    trip_id = created.json()["id"]
+    started = threading.Event()
+
+    class _HangingGPT(_StubGPTClient):
+        async def brainstorm_poi(self, req):
+            started.set()
+            await asyncio.sleep(10)
+
+    _mock_generation_dependencies(monkeypatch, [], [])
+    monkeypatch.setattr(routes, "get_gpt_client", lambda: _HangingGPT([]))
+
+    response = client.post(f"/v1/routes/{trip_id}/generate", json={}, headers=registered_user["headers"])
+    assert started.wait(5)
+    job_queue.shutdown()
+
+    data = client.get(f"/v1/routes/{trip_id}", headers=registered_user["headers"]).json()
+    assert data["status"] == "failed"
+    assert data["job"] == {**data["job"], "id": response.json()["jobId"], "status": "failed"}
+
+
+def test_generate_rolls_back_status_when_enqueue_fails(monkeypatch, client, registered_user):
+    created = client.post("/v1/routes", json=_sample_trip_payload(), headers=registered_user["headers"])
+    trip_id = created.json()["id"]
+
+    def broken_enqueue(*args, **kwargs):
+        raise RuntimeError("queue unavailable")
+
+    monkeypatch.setattr(job_queue, "enqueue", broken_enqueue)
+    response = client.post(f"/v1/routes/{trip_id}/generate", json={}, headers=registered_user["headers"])
+    assert response.status_code == 500
+
+    data = client.get(f"/v1/routes/{trip_id}", headers=registered_user["headers"]).json()
+    assert data["status"] == "created"
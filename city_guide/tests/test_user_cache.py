@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import time
+
+from city_guide.app.core import deps
+from city_guide.app.core.cache import TTLCache
+from city_guide.app.db import database
+from city_guide.app.db.repo import UserRepository, user_cache
+from city_guide.app.http import Request
+
+
+def _record_statements(monkeypatch) -> list[str]:
+    statements: list[str] = []
+    execute = database.execute
+
+    def counting(sql, params=None, **kwargs):
+        statements.append(sql)
+        return execute(sql, params, **kwargs)
+
+    monkeypatch.setattr(database, "execute", counting)
+    return statements
+
+
+def test_authenticated_requests_reuse_the_cached_user(monkeypatch, client, registered_user):
+    statements = _record_statements(monkeypatch)
+    headers = registered_user["headers"]
+
+    assert client.get("/v1/routes", headers=headers).status_code == 200
+    first = len(statements)
+    assert client.get("/v1/routes", headers=headers).status_code == 200
+
+    assert len(statements) - first == first - 1
+    assert not any("FROM users" in sql for sql in statements[first:])
+
+
+def test_save_user_invalidates_the_cache(client, registered_user):
+    headers = registered_user["headers"]
+    assert client.get("/v1/routes", headers=headers).status_code == 200
+
+    repo = UserRepository()
+    user = repo.get_by_email(registered_user["email"])
+    user.is_active = False
+    repo.save_user(user)
+
+    response = client.get("/v1/routes", headers=headers)
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Inactive user"}
+
+
+def test_cached_users_are_copies(registered_user):
+    repo = UserRepository()
+    user_id = repo.get_by_email(registered_user["email"]).id
+    repo.get_by_id_cached(user_id).city = "Changed"
+    assert repo.get_by_id_cached(user_id).city == "Vilnius"
+
+
+def test_request_loads_its_user_once_without_the_cache(monkeypatch, registered_user):
+    monkeypatch.setattr(user_cache, "ttl", 0)
+    statements = _record_statements(monkeypatch)
+    request = Request("GET", "/v1/routes", registered_user["headers"], {}, None, {})
+
+    assert deps.get_request_user(request) is deps.get_request_user(request)
+    assert sum("FROM users" in sql for sql in statements) == 1
+
+
+def test_ttl_cache_expires_and_evicts_least_recently_used(monkeypatch):
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=10)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None and len(cache) == 2
+
+    later = time.monotonic() + 11
+    monkeypatch.setattr(time, "monotonic", lambda: later)
+    assert cache.get("a") is None
@@ -2,14 +2,53 @@
 
 The real ``openai`` package is not available in the execution environment.
 Only a tiny subset is required for the unit tests — enough for the module to be
-imported and for ``AsyncOpenAI`` to expose a ``responses.create`` coroutine.
+imported, for ``AsyncOpenAI`` to expose a ``responses.create`` coroutine and
+for the SDK's error hierarchy to be caught by name.
 """
 
 from __future__ import annotations
 
 from typing import Any
 
-__all__ = ["AsyncOpenAI"]
+__all__ = [
+    "APIConnectionError",
+    "APIError",
+    "APIStatusError",
+    "APITimeoutError",
+    "AsyncOpenAI",
+    "InternalServerError",
+    "RateLimitError",
+]
+
+
+class APIError(Exception):
+    def __init__(self, message: str = "", *args: Any, **kwargs: Any) -> None:
+        super().__init__(message)
+        self.message = message
+
+
+class APIConnectionError(APIError):
+    pass
+
+
+class APITimeoutError(APIConnectionError):
+    pass
+
+
+class APIStatusError(APIError):
+    def __init__(self, message: str = "", *args: Any, status_code: int = 500, **kwargs: Any) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class RateLimitError(APIStatusError):
+    def __init__(self, message: str = "", *args: Any, **kwargs: Any) -> None:
+        kwargs.setdefault("status_code", 429)
+        super().__init__(message, *args, **kwargs)
+
+
+class InternalServerError(APIStatusError):
+    pass
 
 
 class _Responses:
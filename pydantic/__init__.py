@@ -10,14 +10,23 @@ heavy-weight, but the application only relies on a handful of features:
 * ``EmailStr`` type hints.
 
 The stub implemented below is intentionally tiny yet compatible with the
-application code.  It performs basic required-field validation and provides a
-``model_validate`` helper so GPT responses can still be parsed in tests.
+application code.  It performs required-field validation, lax coercion of
+``float``/``int``/``list`` fields and provides a ``model_validate`` helper so
+GPT responses can still be parsed in tests.
+
+Everything that can be derived from a model's annotations is worked out once
+per class: subclasses get a field plan when they are created, so
+instantiation is a single loop over the plan.
 """
 
 from __future__ import annotations
 
+import inspect
+import operator
+import re
+import types
 from dataclasses import dataclass
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Iterable, Union, get_args, get_origin
 
 __all__ = [
     "BaseModel",
@@ -29,7 +38,7 @@ __all__ = [
 
 
 class ValidationError(Exception):
-    """Raised when instantiating a model with missing required fields."""
+    """Raised when a model is given missing or mistyped fields."""
 
 
 class _UnsetType:
@@ -76,46 +85,200 @@ class EmailStr(str):
     """Simple alias used for type annotations."""
 
 
+def _to_float(value: Any) -> float:
+    if isinstance(value, float):
+        return value
+    if isinstance(value, (int, str)):
+        return float(value)
+    raise TypeError(f"expected a number, got {type(value).__name__}")
+
+
+def _to_int(value: Any) -> int:
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        return int(value)
+    raise TypeError(f"expected an integer, got {type(value).__name__}")
+
+
+def _to_list(value: Any) -> list[Any]:
+    if isinstance(value, list):
+        return value
+    if isinstance(value, (tuple, set, frozenset)):
+        return list(value)
+    raise TypeError(f"expected a list, got {type(value).__name__}")
+
+
+# ``str`` fields have no coercer: values are stored as given, as they
+# always were.
+_SCALARS: dict[Any, Callable[[Any], Any]] = {
+    "float": _to_float,
+    "int": _to_int,
+    float: _to_float,
+    int: _to_int,
+}
+_NONE = ("None", "NoneType", None, type(None))
+_GENERIC = re.compile(r"(?:typing\.)?(\w+)(?:\[(.*)\])?", re.DOTALL)
+
+
+def _split_top_level(annotation: str, separator: str) -> list[str]:
+    parts, depth, start = [], 0, 0
+    for index, char in enumerate(annotation):
+        if char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(annotation[start:index].strip())
+            start = index + 1
+    parts.append(annotation[start:].strip())
+    return parts
+
+
+def _union_members(annotation: Any) -> list[Any]:
+    if isinstance(annotation, str):
+        members = _split_top_level(annotation, "|")
+        match = _GENERIC.fullmatch(members[0]) if len(members) == 1 else None
+        if match and match[1] == "Optional":
+            return [match[2].strip(), "None"]
+        if match and match[1] == "Union":
+            return _split_top_level(match[2], ",")
+        return members
+    if get_origin(annotation) in (Union, types.UnionType):
+        return list(get_args(annotation))
+    return [annotation]
+
+
+def _compile_coercer(annotation: Any) -> Callable[[Any], Any] | None:
+    """Build a converter for ``float``/``int``/``list`` annotations.
+
+    Annotations may be strings (``from __future__ import annotations``) or
+    types. Anything else -- nested models, enums, datetimes -- is stored as
+    given, as it always was.
+    """
+
+    members = _union_members(annotation)
+    optional = any(member in _NONE for member in members)
+    members = [member for member in members if member not in _NONE]
+    if len(members) != 1:
+        return None
+    member = members[0]
+
+    coerce = _SCALARS.get(member)
+    if coerce is None:
+        if isinstance(member, str):
+            match = _GENERIC.fullmatch(member)
+            origin, item = (match[1], match[2]) if match else (None, None)
+        else:
+            origin = get_origin(member) or member
+            item = next(iter(get_args(member)), None)
+        if origin not in ("list", "List", list):
+            return None
+        item_coerce = _SCALARS.get(item.strip() if isinstance(item, str) else item)
+        if item_coerce is None:
+            coerce = _to_list
+        else:
+
+            def coerce(value: Any) -> list[Any]:
+                return [item_coerce(element) for element in _to_list(value)]
+
+    if not optional:
+        return coerce
+    inner = coerce
+    return lambda value: None if value is None else inner(value)
+
+
+def _values_getter(names: tuple[str, ...]) -> Callable[[Any], tuple[Any, ...]]:
+    if len(names) > 1:
+        return operator.attrgetter(*names)
+    if names:
+        getter = operator.attrgetter(names[0])
+        return lambda instance: (getter(instance),)
+    return lambda instance: ()
+
+
+def _declared_fields(cls: type) -> dict[str, Any]:
+    """Annotation per field declared in ``cls`` itself."""
+
+    return {
+        name: annotation
+        for name, annotation in inspect.get_annotations(cls).items()
+        if not name.startswith("_") and name != "model_config" and "ClassVar" not in str(annotation)
+    }
+
+
 class BaseModel:
-    """Extremely small subset of Pydantic's ``BaseModel`` implementation."""
+    """Extremely small subset of Pydantic's ``BaseModel`` implementation.
 
-    model_config: dict[str, Any] = {}
+    ``__field_plan__`` holds one ``(name, alias, default, default_factory,
+    coercer)`` tuple per field, inherited fields first. Defaults and ``Field``
+    declarations stay on the class; keys that are no field are kept as
+    attributes.
 
-    def __init__(self, **data: Any) -> None:
-        annotations = getattr(self.__class__, "__annotations__", {})
-        remaining = dict(data)
-        for name in annotations:
-            field_info = getattr(self.__class__, name, UNSET)
-            alias = None
-            default = UNSET
-            default_factory = None
-            if isinstance(field_info, FieldInfo):
-                alias = field_info.alias
-                default = field_info.default
-                default_factory = field_info.default_factory
-            else:
-                default = field_info
+    Dumps reuse per-class key tuples, one by name and one by alias, and read
+    all field values with a single :func:`operator.attrgetter` call.
+    """
 
-            key = None
-            if alias and alias in remaining:
-                key = alias
-            elif name in remaining:
-                key = name
+    model_config: dict[str, Any] = {}
 
-            if key is not None:
-                value = remaining.pop(key)
+    __field_plan__: tuple[tuple[str, str | None, Any, Callable[[], Any] | None, Callable[[Any], Any] | None], ...] = ()
+    # Field names and aliases; every other key of the input is an extra.
+    __field_keys__: frozenset[str] = frozenset()
+    # Indexed by ``by_alias``: field names first, then aliases.
+    __dump_keys__: tuple[tuple[str, ...], tuple[str, ...]] = ((), ())
+    __field_values__: Callable[[Any], tuple[Any, ...]] = staticmethod(_values_getter(()))
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        plan = {entry[0]: entry for entry in cls.__field_plan__}
+        for name, annotation in _declared_fields(cls).items():
+            declared = cls.__dict__.get(name, UNSET)
+            if isinstance(declared, FieldInfo):
+                alias, default, factory = declared.alias, declared.default, declared.default_factory
             else:
-                if default is not UNSET:
-                    value = default
-                elif default_factory is not None:
-                    value = default_factory()
-                else:
-                    raise ValidationError(f"Missing required field: {name}")
+                alias, default, factory = None, declared, None
+            plan[name] = (name, alias, default, factory, _compile_coercer(annotation))
+        cls.__field_plan__ = tuple(plan.values())
+        names = tuple(plan)
+        cls.__field_keys__ = frozenset(key for entry in cls.__field_plan__ for key in entry[:2] if key)
+        cls.__dump_keys__ = (names, tuple(entry[1] or entry[0] for entry in cls.__field_plan__))
+        cls.__field_values__ = staticmethod(_values_getter(names))
 
+    def __init__(self, **data: Any) -> None:
+        self._populate(data)
+
+    def _populate(self, data: dict[str, Any]) -> None:
+        # Attributes are set one by one, in plan order, so instances of a
+        # class share one key table for their ``__dict__``.
+        used = 0
+        for name, alias, default, factory, coerce in self.__field_plan__:
+            if alias is not None and alias in data:
+                value = data[alias]
+            elif name in data:
+                value = data[name]
+            elif default is not UNSET:
+                setattr(self, name, default)
+                continue
+            elif factory is not None:
+                setattr(self, name, factory())
+                continue
+            else:
+                raise ValidationError(f"Missing required field: {name}")
+            used += 1
+            if coerce is not None:
+                try:
+                    value = coerce(value)
+                except (TypeError, ValueError) as exc:
+                    raise ValidationError(f"Invalid value for field {name}: {exc}") from None
             setattr(self, name, value)
 
-        for key, value in remaining.items():
-            setattr(self, key, value)
+        if used < len(data):
+            known = self.__field_keys__
+            for key, value in data.items():
+                if key not in known:
+                    setattr(self, key, value)
 
     @classmethod
     def model_validate(cls, data: Any) -> "BaseModel":
@@ -123,19 +286,40 @@ class BaseModel:
             return data
         if not isinstance(data, dict):
             raise ValidationError("Model validation requires a mapping")
-        return cls(**data)
+        instance = cls.__new__(cls)
+        instance._populate(data)
+        return instance
 
-    def model_dump(self, *, by_alias: bool = False) -> dict[str, Any]:
-        annotations = getattr(self.__class__, "__annotations__", {})
-        result: dict[str, Any] = {}
-        for name in annotations:
-            field_info = getattr(self.__class__, name, UNSET)
-            alias = field_info.alias if isinstance(field_info, FieldInfo) else None
-            key = alias if alias and by_alias else name
-            result[key] = getattr(self, name)
+    @classmethod
+    def model_validate_many(cls, items: Iterable[Any]) -> list[Any]:
+        """Validate a batch of mappings, reporting the index of a bad item."""
+
+        result = []
+        new, populate = cls.__new__, cls._populate
+        for index, data in enumerate(items):
+            if isinstance(data, cls):
+                result.append(data)
+                continue
+            if not isinstance(data, dict):
+                raise ValidationError(f"Item {index}: model validation requires a mapping")
+            instance = new(cls)
+            try:
+                populate(instance, data)
+            except ValidationError as exc:
+                raise ValidationError(f"Item {index}: {exc}") from None
+            result.append(instance)
         return result
 
+    def model_dump(self, *, by_alias: bool = False) -> dict[str, Any]:
+        return dict(zip(self.__dump_keys__[by_alias], self.__field_values__(self), strict=True))
+
+    @classmethod
+    def model_dump_many(cls, instances: Iterable[BaseModel], *, by_alias: bool = False) -> list[dict[str, Any]]:
+        """Dump a batch of ``cls`` instances; fields only subclasses declare are left out."""
+
+        keys, values = cls.__dump_keys__[by_alias], cls.__field_values__
+        return [dict(zip(keys, values(instance), strict=True)) for instance in instances]
+
     def __repr__(self) -> str:  # pragma: no cover - debugging helper
-        fields = getattr(self.__class__, "__annotations__", {})
-        parts = ", ".join(f"{name}={getattr(self, name)!r}" for name in fields)
+        parts = ", ".join(f"{entry[0]}={getattr(self, entry[0])!r}" for entry in self.__field_plan__)
         return f"{self.__class__.__name__}({parts})"
@@ -1,58 +1,327 @@
-"""Minimal subset of :mod:`tenacity` used in tests."""
+"""Minimal subset of :mod:`tenacity` used by the application.
+
+Only the asynchronous retry loop is implemented, but the pieces that are
+present behave like the real library: waits actually sleep (with optional
+jitter), ``retry`` predicates decide which failures are retried and stop
+conditions can be combined with ``|`` to express an overall deadline.
+"""
 
 from __future__ import annotations
 
+import asyncio
+import random
+import time
 from dataclasses import dataclass
-from typing import Any, Tuple, Type
+from typing import Any, Awaitable, Callable, Tuple, Type
 
 __all__ = [
     "AsyncRetrying",
+    "RetryCallState",
+    "RetryError",
+    "retry_if_exception",
     "retry_if_exception_type",
     "stop_after_attempt",
+    "stop_after_delay",
+    "stop_before_delay",
     "wait_exponential",
+    "wait_exponential_jitter",
+    "wait_fixed",
+    "wait_none",
+    "wait_random_exponential",
 ]
 
 
+class RetryCallState:
+    """State of the retry loop passed to stop, wait and retry strategies."""
+
+    __slots__ = ("attempt_number", "start_time", "outcome", "idle_for", "upcoming_sleep")
+
+    def __init__(self) -> None:
+        self.attempt_number = 0
+        self.start_time = time.monotonic()
+        self.outcome: BaseException | None = None
+        self.idle_for = 0.0
+        self.upcoming_sleep = 0.0
+
+    @property
+    def seconds_since_start(self) -> float:
+        return time.monotonic() - self.start_time
+
+
+class RetryError(Exception):
+    """Raised when retrying stops and ``reraise`` is disabled."""
+
+    def __init__(self, last_attempt: RetryCallState) -> None:
+        super().__init__(f"RetryError after {last_attempt.attempt_number} attempts")
+        self.last_attempt = last_attempt
+
+    def reraise(self) -> None:
+        if self.last_attempt.outcome is not None:
+            raise self.last_attempt.outcome
+        raise self
+
+
+# --------------------------------------------------------------------------- stop
+
+
+class _StopBase:
+    def __call__(self, state: RetryCallState) -> bool:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+    def __or__(self, other: "_StopBase") -> "_StopAny":
+        return _StopAny(self, other)
+
+
+class _StopAny(_StopBase):
+    def __init__(self, *stops: _StopBase) -> None:
+        self.stops = stops
+
+    def __call__(self, state: RetryCallState) -> bool:
+        return any(stop(state) for stop in self.stops)
+
+
 @dataclass(slots=True)
-class _StopAfterAttempt:
+class _StopAfterAttempt(_StopBase):
     max_attempt_number: int
 
+    def __call__(self, state: RetryCallState) -> bool:
+        return state.attempt_number >= self.max_attempt_number
+
+
+@dataclass(slots=True)
+class _StopAfterDelay(_StopBase):
+    max_delay: float
+
+    def __call__(self, state: RetryCallState) -> bool:
+        return state.seconds_since_start >= self.max_delay
+
+
+@dataclass(slots=True)
+class _StopBeforeDelay(_StopBase):
+    max_delay: float
+
+    def __call__(self, state: RetryCallState) -> bool:
+        return state.seconds_since_start + state.upcoming_sleep >= self.max_delay
+
 
 def stop_after_attempt(attempt_number: int) -> _StopAfterAttempt:
     return _StopAfterAttempt(max_attempt_number=attempt_number)
 
 
-def wait_exponential(**_: Any) -> None:  # pragma: no cover - placeholder
-    return None
+def stop_after_delay(max_delay: float) -> _StopAfterDelay:
+    return _StopAfterDelay(max_delay=max_delay)
 
 
-@dataclass(slots=True)
-class retry_if_exception_type:  # noqa: N801 - mimic tenacity's naming
+def stop_before_delay(max_delay: float) -> _StopBeforeDelay:
+    """Stop when the next sleep would cross ``max_delay`` seconds since start."""
+
+    return _StopBeforeDelay(max_delay=max_delay)
+
+
+# --------------------------------------------------------------------------- wait
+
+
+class _WaitBase:
+    def __call__(self, state: RetryCallState) -> float:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+    def __add__(self, other: "_WaitBase") -> "_WaitCombine":
+        return _WaitCombine(self, other)
+
+
+class _WaitCombine(_WaitBase):
+    def __init__(self, *waits: _WaitBase) -> None:
+        self.waits = waits
+
+    def __call__(self, state: RetryCallState) -> float:
+        return sum(wait(state) for wait in self.waits)
+
+
+class wait_none(_WaitBase):  # noqa: N801 - mimic tenacity's naming
+    def __call__(self, state: RetryCallState) -> float:
+        return 0.0
+
+
+class wait_fixed(_WaitBase):  # noqa: N801 - mimic tenacity's naming
+    def __init__(self, wait: float) -> None:
+        self.wait = wait
+
+    def __call__(self, state: RetryCallState) -> float:
+        return self.wait
+
+
+class wait_exponential(_WaitBase):  # noqa: N801 - mimic tenacity's naming
+    """``multiplier * exp_base ** (attempt - 1)`` clamped to ``[min, max]``."""
+
+    def __init__(
+        self,
+        multiplier: float = 1,
+        max: float = float("inf"),  # noqa: A002 - tenacity's argument name
+        exp_base: float = 2,
+        min: float = 0,  # noqa: A002 - tenacity's argument name
+    ) -> None:
+        self.multiplier = multiplier
+        self.max = max
+        self.exp_base = exp_base
+        self.min = min
+
+    def _raw(self, state: RetryCallState) -> float:
+        try:
+            return self.multiplier * (self.exp_base ** (state.attempt_number - 1))
+        except OverflowError:
+            return self.max
+
+    def __call__(self, state: RetryCallState) -> float:
+        return max(max(0, self.min), min(self._raw(state), self.max))
+
+
+class wait_random_exponential(wait_exponential):  # noqa: N801 - mimic tenacity's naming
+    """Full jitter: a uniformly random wait between 0 and the exponential bound."""
+
+    def __call__(self, state: RetryCallState) -> float:
+        upper = super().__call__(state)
+        return random.uniform(0, upper)
+
+
+class wait_exponential_jitter(_WaitBase):  # noqa: N801 - mimic tenacity's naming
+    """``initial * exp_base ** (attempt - 1) + random(0, jitter)`` capped at ``max``."""
+
+    def __init__(
+        self,
+        initial: float = 1,
+        max: float = float("inf"),  # noqa: A002 - tenacity's argument name
+        exp_base: float = 2,
+        jitter: float = 1,
+    ) -> None:
+        self.initial = initial
+        self.max = max
+        self.exp_base = exp_base
+        self.jitter = jitter
+
+    def __call__(self, state: RetryCallState) -> float:
+        jitter = random.uniform(0, self.jitter)
+        try:
+            result = self.initial * (self.exp_base ** (state.attempt_number - 1)) + jitter
+        except OverflowError:
+            result = self.max
+        return max(0.0, min(result, self.max))
+
+
+# -------------------------------------------------------------------------- retry
+
+
+class _RetryBase:
+    def __call__(self, state: RetryCallState) -> bool:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+    def __or__(self, other: "_RetryBase") -> "_RetryAny":
+        return _RetryAny(self, other)
+
+    def __and__(self, other: "_RetryBase") -> "_RetryAll":
+        return _RetryAll(self, other)
+
+
+class _RetryAny(_RetryBase):
+    def __init__(self, *retries: _RetryBase) -> None:
+        self.retries = retries
+
+    def __call__(self, state: RetryCallState) -> bool:
+        return any(retry(state) for retry in self.retries)
+
+
+class _RetryAll(_RetryBase):
+    def __init__(self, *retries: _RetryBase) -> None:
+        self.retries = retries
+
+    def __call__(self, state: RetryCallState) -> bool:
+        return all(retry(state) for retry in self.retries)
+
+
+class retry_if_exception(_RetryBase):  # noqa: N801 - mimic tenacity's naming
+    def __init__(self, predicate: Callable[[BaseException], bool]) -> None:
+        self.predicate = predicate
+
+    def __call__(self, state: RetryCallState) -> bool:
+        if state.outcome is None:
+            return False
+        return self.predicate(state.outcome)
+
+
+class retry_if_exception_type(retry_if_exception):  # noqa: N801 - mimic tenacity's naming
     exceptions: Tuple[Type[BaseException], ...]
 
     def __init__(self, *exceptions: Type[BaseException]):
         self.exceptions = exceptions or (Exception,)
+        super().__init__(lambda exc: isinstance(exc, self.exceptions))
+
+
+# -------------------------------------------------------------------------- loop
 
 
-class _AttemptContext:
-    async def __aenter__(self) -> "_AttemptContext":  # pragma: no cover - trivial
+class _AttemptManager:
+    """Context manager capturing the outcome of a single attempt."""
+
+    def __init__(self, state: RetryCallState) -> None:
+        self._state = state
+
+    def __enter__(self) -> "_AttemptManager":
         return self
 
-    async def __aexit__(self, exc_type, exc, tb) -> bool:  # pragma: no cover - propagate
-        return False
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc is None or not isinstance(exc, Exception):
+            return False
+        self._state.outcome = exc
+        return True
+
+    async def __aenter__(self) -> "_AttemptManager":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        return self.__exit__(exc_type, exc, tb)
 
 
 class AsyncRetrying:
-    def __init__(self, *, stop: _StopAfterAttempt | None = None, **_: Any) -> None:
-        self.max_attempts = (stop.max_attempt_number if stop else 1) or 1
-        self._yielded = 0
+    def __init__(
+        self,
+        *,
+        stop: _StopBase | None = None,
+        wait: _WaitBase | None = None,
+        retry: _RetryBase | None = None,
+        reraise: bool = False,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        before_sleep: Callable[[RetryCallState], Any] | None = None,
+    ) -> None:
+        self.stop = stop or stop_after_attempt(1)
+        self.wait = wait or wait_none()
+        self.retry = retry or retry_if_exception_type()
+        self.reraise = reraise
+        self.sleep = sleep
+        self.before_sleep = before_sleep
+        self.state = RetryCallState()
 
     def __aiter__(self) -> "AsyncRetrying":
-        self._yielded = 0
+        self.state = RetryCallState()
         return self
 
-    async def __anext__(self) -> _AttemptContext:
-        if self._yielded >= self.max_attempts:
-            raise StopAsyncIteration
-        self._yielded += 1
-        return _AttemptContext()
+    async def __anext__(self) -> _AttemptManager:
+        state = self.state
+        if state.attempt_number:
+            if state.outcome is None:
+                # The previous attempt finished without raising.
+                raise StopAsyncIteration
+            if not self.retry(state):
+                raise state.outcome
+            state.upcoming_sleep = self.wait(state)
+            if self.stop(state):
+                if self.reraise:
+                    raise state.outcome
+                raise RetryError(state) from state.outcome
+            if self.before_sleep is not None:
+                self.before_sleep(state)
+            if state.upcoming_sleep > 0:
+                await self.sleep(state.upcoming_sleep)
+            state.idle_for += state.upcoming_sleep
+            state.upcoming_sleep = 0.0
+        state.attempt_number += 1
+        state.outcome = None
+        return _AttemptManager(state)